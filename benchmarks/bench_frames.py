@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Frame benchmarks for Flappy Adventure
+
+This script drives GameManager.update() and GameManager.draw() through
+scripted scenarios with the SDL dummy video and audio drivers, and
+reports per-frame timings, allocations and entity counts as JSON so
+runs from different versions can be compared.
+
+Scenarios:
+- menu: the idle main menu
+- enemies: level 3 with the enemy pool kept full
+- invincible: permanent invincibility (pulse tint and scaled sprite)
+- power_ups: level 1 with the power-up pool kept full
+- endless: an endless run (track chunks streamed from the worker thread)
+
+Usage:
+    python benchmarks/bench_frames.py -o results.json
+    python benchmarks/bench_frames.py --scenarios menu enemies --frames 2000
+    python benchmarks/bench_frames.py --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# Run the game headless from its own directory (assets use relative paths)
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'flappy_adventure')
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, GAME_DIR)
+
+import pygame
+from game_manager import GameManager, GameState
+from power_up import PowerUpType
+
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# Frames played before measuring, and frames traced for allocations
+WARMUP_FRAMES = 60
+TRACED_FRAMES = 200
+
+def hover(game_manager):
+    """Flap whenever the bird sinks below the middle of the next gap"""
+    sim = game_manager.sim
+    pipe = sim.pipes.next_unscored() or sim.pipes.first
+    bird = sim.bird
+    game_manager.flap_requested = bird.y > pipe.gap_y + pipe.gap_size / 2 and bird.velocity > 0
+
+def keep_playing(game_manager):
+    """Keep the run going forever (no game over, no level completion)"""
+    sim = game_manager.sim
+    sim.bird.lives = 1000
+    sim.score = 0
+
+class Scenario:
+    """Scripted setup plus a hook run before every update"""
+
+    def __init__(self, name, level=None, before_update=None, endless=False):
+        """Initialize a scenario (level None stays on the menu)"""
+        self.name = name
+        self.level = level
+        self.before_update = before_update
+        self.endless = endless
+
+    def start(self, game_manager):
+        """Put the game into the scenario's starting state"""
+        if self.level is not None:
+            game_manager.current_level = self.level
+            game_manager.endless = self.endless
+            game_manager.state = GameState.PLAYING
+            game_manager.reset_game()
+
+    def prepare(self, game_manager, frame):
+        """Script the frame's input and world before it is updated"""
+        if self.level is not None:
+            keep_playing(game_manager)
+            hover(game_manager)
+        if self.before_update is not None:
+            self.before_update(game_manager, frame)
+
+def fill_enemies(game_manager, frame):
+    """Top the enemy pool up with enemies entering from the right"""
+    sim = game_manager.sim
+    if frame % 8 == 0:
+        y = random.randint(100, SCREEN_HEIGHT - 100)
+        sim.enemies.acquire(SCREEN_WIDTH, y, SCREEN_WIDTH, SCREEN_HEIGHT, sim.level, sim.enemy_rng)
+
+def stay_invincible(game_manager, frame):
+    """Refresh invincibility so the tinted sprite is drawn every frame"""
+    game_manager.sim.bird.apply_invincibility()
+
+def fill_power_ups(game_manager, frame):
+    """Top the power-up pool up with power-ups entering from the right"""
+    sim = game_manager.sim
+    if frame % 10 == 0:
+        y = random.randint(100, SCREEN_HEIGHT - 100)
+        sim.power_ups.acquire(SCREEN_WIDTH, y, random.choice(list(PowerUpType)))
+
+SCENARIOS = {
+    'menu': Scenario('menu'),
+    'enemies': Scenario('enemies', 3, fill_enemies),
+    'invincible': Scenario('invincible', 1, stay_invincible),
+    'power_ups': Scenario('power_ups', 1, fill_power_ups),
+    'endless': Scenario('endless', 1, endless=True),
+}
+
+def percentiles(samples):
+    """Return p50/p95/p99/mean/max of a list of milliseconds"""
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def rank(p):
+        return ordered[min(count - 1, int(p / 100.0 * count))]
+
+    return {
+        'p50': round(rank(50), 4),
+        'p95': round(rank(95), 4),
+        'p99': round(rank(99), 4),
+        'mean': round(sum(ordered) / count, 4),
+        'max': round(ordered[-1], 4),
+    }
+
+def run_frame(game_manager, scenario, frame):
+    """Play one frame and return (update ns, draw ns)"""
+    scenario.prepare(game_manager, frame)
+    game_manager.profiler.begin_frame()
+    start = time.perf_counter_ns()
+    game_manager.update()
+    middle = time.perf_counter_ns()
+    dirty = game_manager.draw()
+    end = time.perf_counter_ns()
+    if dirty is None:
+        pygame.display.flip()
+    else:
+        pygame.display.update(dirty)
+    game_manager.profiler.end_frame()
+    return middle - start, end - middle
+
+def run_scenario(scenario, frames, dirty_rects=False, seed=0):
+    """Run a scenario and return its results as a dict"""
+    random.seed(seed)
+    screen = pygame.display.get_surface()
+    game_manager = GameManager(screen, SCREEN_WIDTH, SCREEN_HEIGHT, dirty_rects=dirty_rects, seed=seed)
+    scenario.start(game_manager)
+
+    for frame in range(WARMUP_FRAMES):
+        run_frame(game_manager, scenario, frame)
+
+    # Timed pass
+    update_ms = []
+    draw_ms = []
+    frame_ms = []
+    enemies = []
+    power_ups = []
+    drawables = []
+    for frame in range(WARMUP_FRAMES, WARMUP_FRAMES + frames):
+        update_ns, draw_ns = run_frame(game_manager, scenario, frame)
+        update_ms.append(update_ns / 1e6)
+        draw_ms.append(draw_ns / 1e6)
+        frame_ms.append((update_ns + draw_ns) / 1e6)
+        enemies.append(len(game_manager.enemies))
+        power_ups.append(len(game_manager.power_ups))
+        drawables.append(len(game_manager.get_drawables()))
+
+    # Traced pass (tracemalloc slows everything down, so it is kept separate)
+    allocated = []
+    retained = []
+    tracemalloc.start()
+    for frame in range(WARMUP_FRAMES + frames, WARMUP_FRAMES + frames + TRACED_FRAMES):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        run_frame(game_manager, scenario, frame)
+        after, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - before)
+        retained.append(after - before)
+    tracemalloc.stop()
+
+    return {
+        'frames': frames,
+        'update_ms': percentiles(update_ms),
+        'draw_ms': percentiles(draw_ms),
+        'frame_ms': percentiles(frame_ms),
+        'allocations': {
+            'peak_bytes_per_frame': round(sum(allocated) / len(allocated), 1),
+            'retained_bytes_per_frame': round(sum(retained) / len(retained), 1),
+        },
+        'entities': {
+            'enemies_mean': round(sum(enemies) / frames, 2),
+            'enemies_max': max(enemies),
+            'power_ups_mean': round(sum(power_ups) / frames, 2),
+            'power_ups_max': max(power_ups),
+            'drawables_mean': round(sum(drawables) / frames, 2),
+        },
+    }
+
+def compare(results, baseline):
+    """Print the frame time change of every scenario against a baseline file"""
+    print(f"{'scenario':<12} {'metric':<10} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if old is None:
+            continue
+        for metric in ('p50', 'p95', 'p99'):
+            before = old['frame_ms'][metric]
+            after = result['frame_ms'][metric]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"{name:<12} {metric:<10} {before:>10.3f} {after:>10.3f} {change:>+7.1f}%")
+
+def main(argv=None):
+    """Run the selected scenarios and report the results"""
+    parser = argparse.ArgumentParser(description="Benchmark Flappy Adventure update and draw")
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--frames', type=int, default=1000, help="timed frames per scenario")
+    parser.add_argument('--dirty-rects', action='store_true', help="benchmark the dirty-rectangle renderer")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', metavar='JSON', help="compare against an earlier results file")
+    args = parser.parse_args(argv)
+
+    # Resolve file arguments before moving into the game directory
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    os.chdir(GAME_DIR)
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'dirty_rects': args.dirty_rects,
+        'scenarios': {},
+    }
+    for name in args.scenarios:
+        result = run_scenario(SCENARIOS[name], args.frames, args.dirty_rects, args.seed)
+        results['scenarios'][name] = result
+        frame = result['frame_ms']
+        print(f"{name:<12} p50 {frame['p50']:.3f} ms  p95 {frame['p95']:.3f} ms  p99 {frame['p99']:.3f} ms  "
+              f"alloc {result['allocations']['peak_bytes_per_frame']:.0f} B/frame  "
+              f"enemies {result['entities']['enemies_mean']:.1f}  "
+              f"power-ups {result['entities']['power_ups_mean']:.1f}")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if baseline:
+        with open(baseline) as f:
+            compare(results, json.load(f))
+
+    pygame.quit()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Assets module for Flappy Adventure
+
+This module keeps a process-wide registry of loaded and transformed
+surfaces so that every sprite is read from disk exactly once. Sprites
+packed into the atlas (see build_atlas.py) are views into one shared
+surface; anything else is loaded from its own file. Files can be decoded
+ahead of time on loader threads; whoever needs one first only waits for
+that file.
+"""
+
+import pygame
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Shared surfaces keyed by (filename, size, flip, palette)
+_surfaces = {}
+
+# Decoded files keyed by path (a Future while a loader thread works on it)
+_files = {}
+
+# Sprite atlas written by build_atlas.py, and its index of sprite rects
+ATLAS_IMAGE = os.path.join('assets', 'atlas.png')
+ATLAS_INDEX = os.path.join('assets', 'atlas.json')
+_atlas_index = None
+
+# Threads decoding files in the background (pygame releases the GIL while
+# SDL reads and decodes)
+LOADER_THREADS = 4
+_executor = None
+
+# Preferred sound formats: the OGG copies are a tenth of the size of the
+# WAVs, and their slower decode happens on a loader thread
+SOUND_FORMATS = ('.ogg', '.wav')
+
+def get_executor():
+    """Return the shared loader thread pool, starting it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(LOADER_THREADS, thread_name_prefix='assets')
+    return _executor
+
+def get_sound_path(filename):
+    """Return the path of the preferred copy of a sound, or None if there is none"""
+    stem = os.path.splitext(filename)[0]
+    for extension in SOUND_FORMATS:
+        path = os.path.join('assets', stem + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+def get_atlas_index():
+    """Return the atlas rect of every packed sprite by filename ({} without an atlas)"""
+    global _atlas_index
+    if _atlas_index is None:
+        _atlas_index = {}
+        if os.path.exists(ATLAS_IMAGE) and os.path.exists(ATLAS_INDEX):
+            with open(ATLAS_INDEX) as f:
+                sprites = json.load(f)['sprites']
+            _atlas_index = {name: pygame.Rect(rect) for name, rect in sprites.items()}
+    return _atlas_index
+
+def get_atlas():
+    """Return the atlas surface, converted for the display"""
+    return get_surface('atlas', lambda: load_file(ATLAS_IMAGE, pygame.image.load).convert_alpha())
+
+def get_image_path(filename):
+    """Return the file an image is decoded from (the atlas for packed sprites)"""
+    if filename in get_atlas_index():
+        return ATLAS_IMAGE
+    return os.path.join('assets', filename)
+
+def preload(image_filenames=(), sound_filenames=()):
+    """Start decoding asset files on the loader threads"""
+    jobs = [(get_image_path(filename), pygame.image.load) for filename in image_filenames]
+    jobs.extend((get_sound_path(filename), pygame.mixer.Sound) for filename in sound_filenames)
+    for path, loader in jobs:
+        if path is not None and path not in _files and os.path.exists(path):
+            _files[path] = get_executor().submit(loader, path)
+
+def load_file(path, loader):
+    """Return a decoded file, waiting for its loader thread if it was preloaded"""
+    data = _files.get(path)
+    if data is None:
+        data = _files[path] = loader(path)
+    elif isinstance(data, Future):
+        data = _files[path] = data.result()
+    return data
+
+def get_sound(filename):
+    """Return a Sound for an asset (preferring OGG), or None if it is missing
+
+    The file is decoded once; every call gets its own copy of the samples
+    so callers can set different volumes.
+    """
+    path = get_sound_path(filename)
+    if path is None:
+        return None
+    return pygame.mixer.Sound(buffer=load_file(path, pygame.mixer.Sound).get_raw())
+
+def get_image(filename, size=None, flip_y=False, palette=None, alpha=True, fallback=None):
+    """Return a shared surface for an asset, loading it on first use
+
+    The image is scaled to ``size`` and flipped vertically when ``flip_y``
+    is set. If the file is missing, ``fallback`` is called to build a
+    replacement surface. ``palette`` only distinguishes cache entries whose
+    fallback artwork differs (e.g. per-level colors).
+    """
+    key = (filename, size, flip_y, palette)
+    surface = _surfaces.get(key)
+    if surface is not None:
+        return surface
+
+    rect = get_atlas_index().get(filename)
+    path = os.path.join('assets', filename)
+    exists = rect is not None or os.path.exists(path)
+    if exists and flip_y:
+        # Reuse the unflipped surface instead of decoding the file again
+        surface = get_image(filename, size, False, palette, alpha)
+        surface = pygame.transform.flip(surface, False, True)
+    elif exists:
+        if rect is not None:
+            # A view into the shared atlas (scaling or dropping alpha copies it)
+            surface = get_atlas().subsurface(rect)
+            if not alpha:
+                surface = surface.convert()
+        else:
+            # Conversion needs the display, so it stays on the main thread
+            surface = load_file(path, pygame.image.load)
+            surface = surface.convert_alpha() if alpha else surface.convert()
+        if size is not None:
+            surface = pygame.transform.scale(surface, size)
+    elif fallback is not None:
+        surface = fallback()
+    else:
+        return None
+
+    _surfaces[key] = surface
+    return surface
+
+def get_raw_image(filename):
+    """Return the decoded, unconverted image of an asset, or None if it is missing
+
+    Unlike get_image() this works without a display.
+    """
+    rect = get_atlas_index().get(filename)
+    if rect is not None:
+        return load_file(ATLAS_IMAGE, pygame.image.load).subsurface(rect)
+    path = os.path.join('assets', filename)
+    if os.path.exists(path):
+        return load_file(path, pygame.image.load)
+    return None
+
+def get_mask(filename, size=None, flip_y=False, fallback=None):
+    """Return the collision mask of an asset as get_image() would draw it
+
+    Opaque pixels (or pixels that are not the color key) are set. Works
+    without a display, so the headless simulation can use it; ``fallback``
+    builds a replacement surface when the file is missing.
+    """
+    surface = get_raw_image(filename)
+    if surface is None:
+        if fallback is None:
+            return None
+        surface = fallback()
+    mask = pygame.mask.from_surface(surface)
+    if size is not None:
+        mask = mask.scale(size)
+    if flip_y:
+        # Masks cannot be flipped in place; go through a black and white surface
+        flipped = pygame.transform.flip(mask.to_surface(), False, True)
+        mask = pygame.mask.from_threshold(flipped, (255, 255, 255, 255), (1, 1, 1, 255))
+    return mask
+
+def get_surface(key, factory):
+    """Return a shared procedurally built surface (or list of baked frames or masks)
+
+    ``factory`` is only called the first time a key is requested.
+    """
+    surface = _surfaces.get(key)
+    if surface is None:
+        surface = factory()
+        _surfaces[key] = surface
+    return surface
@@ -0,0 +1,350 @@
+"""
+Autopilot module for Flappy Adventure
+
+This module defines a lookahead bot that flies the bird. It replays the
+bird's deterministic physics over every flap / no-flap sequence up to a
+horizon reaching past the enemies in view and through the next gaps,
+keeping the reachable heights of each velocity as a bitset, and follows a
+plan picked from them until the world stops matching it. Collisions are
+tested with the same pixel rounding the game uses, in both collision
+modes. It runs headless far above real time, so it doubles as a load
+generator and a level checker; note that with pixel-perfect collisions
+an enemy can close a gap for the whole time the bird needs to cross it,
+so a failed run does not always mean a bad plan.
+"""
+
+import argparse
+import math
+import sys
+import time
+import pygame
+from bird import Bird
+from simulation import SimState, step
+
+# Shortest plan, in ticks (a new one is made once half of it is used)
+HORIZON = 36
+
+# Longest plan, enough to see an enemy cross the screen
+MAX_HORIZON = 180
+
+# Pipes ahead whose gaps every plan must get through
+PIPES_AHEAD = 3
+
+# Pixels of distance from the target worth one unit of final velocity
+VELOCITY_WEIGHT = 4.0
+
+# Pixels per tick a chasing enemy may drift from its expected row, and the
+# fractions of that allowance tried while it leaves no way through
+CHASE_DRIFT = 0.1
+CAUTION_LEVELS = (1.0, 0.5, 0.0)
+
+# Synthetic input fed to GameManager.handle_event when the bot flaps
+FLAP_EVENT = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+
+class Autopilot:
+    """Plans flaps by searching the bird's reachable states"""
+
+    def __init__(self, horizon=HORIZON):
+        """Initialize the bot"""
+        self.horizon = horizon
+
+        # Current plan and what the world looked like when it was made
+        self.plan = []
+        self.predicted = []  # (y, velocity) expected after each planned step
+        self.expected = None  # (y, velocity) the bird should have now
+        self.signature = None
+
+        # Statistics
+        self.plans = 0
+        self.sets = 0  # (velocity, heights) sets reached by the searches
+
+    def get_events(self, state, dt=1.0):
+        """Return the input events for the next step (an input source for GameManager)"""
+        return [FLAP_EVENT] if self.decide(state, dt) else []
+
+    def decide(self, state, dt=1.0):
+        """Return the action (1 = flap) for the next step of state"""
+        bird = state.bird
+        signature = (
+            state.pipes.head, len(state.enemies), len(state.power_ups),
+            bird.invincible, bird.flap_strength, bird.lives, dt,
+            tuple(enemy.y for enemy in state.enemies if enemy.pattern == 'chase'),
+        )
+
+        # Keep following the plan while the bird is exactly where it was
+        # expected, nothing new appeared and enough of the plan is left
+        if (signature != self.signature or len(self.plan) <= self.horizon // 2
+                or self.expected != (bird.y, bird.velocity)):
+            self.signature = signature
+            self.plan, self.predicted = self.search(state, dt)
+            if not self.plan:
+                # No branch survives a single tick; let the bird fall
+                self.expected = None
+                return 0
+
+        self.expected = self.predicted.pop(0)
+        return self.plan.pop(0)
+
+    def search(self, state, dt):
+        """Return (actions, predicted states) of the best plan over the horizon"""
+        self.plans += 1
+        bird = state.bird
+        gravity = bird.gravity * dt
+        terminal = bird.terminal_velocity
+
+        # Heights are bits of a grid with one bit per gravity * dt * dt pixels,
+        # which every move of the bird lands on exactly (bird.y is bit offset)
+        step_size = gravity * dt
+        if step_size <= 0:
+            return [], []
+        quantum = step_size * dt
+        offset = math.ceil(bird.y / quantum)
+
+        # Allow for chasers wandering off their expected rows, less and less
+        # while that leaves the bird doomed (a nudge triggers a new plan anyway)
+        layers = []
+        chasing = any(enemy.pattern == 'chase' for enemy in state.enemies)
+        for caution in CAUTION_LEVELS if chasing else CAUTION_LEVELS[:1]:
+            limits = self.get_limits(state, dt, caution)
+            found = self.get_layers(bird, dt, limits, quantum, offset)
+            if len(found) > len(layers):
+                layers = found
+            if len(layers) > len(limits):
+                break
+        if len(layers) == 1:
+            return [], []
+
+        # End the plan near the middle of the next gap and not moving too
+        # fast to stay there
+        target = self.get_target(state, dt, len(layers) - 1)
+        target_bit = max(round((target - bird.y) / quantum) + offset, 0)
+        best = None
+        for velocity, heights in layers[-1].items():
+            bit = get_nearest_bit(heights, target_bit)
+            score = abs(bit - target_bit) * quantum + VELOCITY_WEIGHT * abs(velocity)
+            if best is None or score < best[0]:
+                best = (score, velocity, bit)
+        velocity, bit = best[1], best[2]
+
+        # Walk back through the layers for a path to that state (every state
+        # in a layer is reachable from the start, so one always exists)
+        actions = []
+        for layer in reversed(layers[:-1]):
+            bit -= round(velocity / step_size)
+            for previous, heights in layer.items():
+                if min(previous + gravity, terminal) == velocity and heights >> bit & 1:
+                    actions.append(0)
+                    velocity = previous
+                    break
+            else:
+                actions.append(1)
+                velocity = next(v for v, heights in layer.items() if heights >> bit & 1)
+        actions.reverse()
+
+        # Replay the plan with the bird's own arithmetic for the states to expect
+        predicted = []
+        y, velocity = bird.y, bird.velocity
+        for tick, action in enumerate(actions, 1):
+            if action:
+                velocity = self.get_flap_strength(bird, dt, tick)
+            velocity = min(velocity + gravity, terminal)
+            y += velocity * dt
+            predicted.append((y, velocity))
+        return actions, predicted
+
+    def get_layers(self, bird, dt, limits, quantum, offset):
+        """Return the states reachable after each tick, until the first tick none are"""
+        gravity = bird.gravity * dt
+        step_size = gravity * dt
+        terminal = bird.terminal_velocity
+
+        # Breadth-first over ticks; a layer maps each velocity reached to the
+        # bitset of heights reachable with it after that tick
+        layers = [{bird.velocity: 1 << offset}]
+        for tick, (lo, hi, blocked) in enumerate(limits, 1):
+            flap_velocity = min(self.get_flap_strength(bird, dt, tick) + gravity, terminal)
+            allowed = get_mask(lo, hi, bird.y, quantum, offset)
+            for top, bottom in blocked:
+                allowed &= ~get_mask(top, bottom, bird.y, quantum, offset)
+            flapped = 0
+            reached = {}
+            for velocity, heights in layers[-1].items():
+                flapped |= heights
+                v = min(velocity + gravity, terminal)
+                reached[v] = reached.get(v, 0) | shift(heights, round(v / step_size))
+            reached[flap_velocity] = (reached.get(flap_velocity, 0)
+                                      | shift(flapped, round(flap_velocity / step_size)))
+            layer = {v: heights & allowed for v, heights in reached.items() if heights & allowed}
+            if not layer:
+                break
+            self.sets += len(layer)
+            layers.append(layer)
+        return layers
+
+    def get_flap_strength(self, bird, dt, tick):
+        """Return the bird's flap strength on a tick of the plan (a speed boost may run out first)"""
+        if bird.speed_boost and tick - 1 > bird.speed_boost_timer / dt:
+            return Bird.FLAP_STRENGTH
+        return bird.flap_strength
+
+    def get_target(self, state, dt, ticks):
+        """Return the bird y that lines it up with the gap ahead after ticks steps"""
+        bird = state.bird
+        left = bird.x + 5
+        for pipe in state.pipes:
+            if pipe.x - pipe.speed * dt * ticks + pipe.width > left:
+                return pipe.gap_y + (pipe.gap_size - bird.height) / 2
+        return state.screen_height / 2
+
+    def get_horizon(self, state, dt, left, right):
+        """Return the ticks to plan ahead (past the enemies in view and out of the next gaps)"""
+        horizon = self.horizon
+        for enemy in state.enemies:
+            if enemy.speed > 0:
+                horizon = max(horizon, math.ceil((enemy.x + enemy.width - left) / (enemy.speed * dt)))
+        ahead = 0
+        for pipe in state.pipes:
+            if pipe.x + pipe.width > left and pipe.speed > 0 and ahead < PIPES_AHEAD:
+                horizon = max(horizon, math.ceil((pipe.x + pipe.width - left) / (pipe.speed * dt)))
+                ahead += 1
+
+        # Stop before the pipe that has not been placed yet reaches the bird
+        last = state.pipes.last
+        if last.speed > 0:
+            horizon = min(horizon, int((last.x + state.pipes.spacing - right) / (last.speed * dt)))
+        return max(self.horizon, min(horizon, MAX_HORIZON))
+
+    def get_limits(self, state, dt, caution=1.0):
+        """Return (lowest y, y limit, blocked y ranges) for each tick of the horizon
+
+        Heights are allowed from the lowest y up to (not including) the
+        limit, and blocked from the start up to (not including) the end of
+        each range.
+        """
+        bird = state.bird
+        # Bird hitbox (or whole sprite, with pixel-perfect collisions). Its
+        # top row is int(y) for sprite rects and round(y + 5) for hitboxes,
+        # so a collision depends on int(y + row_offset)
+        inset = 0 if state.precise_collisions else 5
+        row_offset = 0.0 if state.precise_collisions else inset + 0.5
+        left = bird.x + inset
+        right = left + bird.width - 2 * inset
+        hitbox_height = bird.height - 2 * inset
+        safe_ticks = bird.invincibility_timer / dt if bird.invincible else 0
+
+        limits = []
+        for tick in range(1, self.get_horizon(state, dt, left, right) + 1):
+            lo = 0
+            hi = state.screen_height
+            blocked = []
+            if tick > safe_ticks:
+                # Pipes: the hitbox must fit inside every gap it overlaps
+                for pipe in state.pipes:
+                    x = pipe.x - pipe.speed * dt * tick
+                    if x < right and x + pipe.width > left:
+                        # (a gap reaching past the ground is closed at the screen edge)
+                        bottom = min(pipe.gap_y + pipe.gap_size, state.screen_height)
+                        lo = max(lo, pipe.gap_y - row_offset)
+                        hi = min(hi, bottom - hitbox_height + 1 - row_offset)
+
+                # Enemies: keep out of their predicted rows (the same rounding
+                # places both hitboxes)
+                for enemy in state.enemies:
+                    x = enemy.x - enemy.speed * dt * tick
+                    if abs(x - bird.x) >= bird.width - 2 * inset:
+                        continue
+                    y, spread = predict_enemy_y(enemy, dt, tick, caution)
+                    row = math.floor(y + row_offset)
+                    blocked.append((row - hitbox_height + 1 - row_offset - spread,
+                                    row + hitbox_height - row_offset + spread))
+            limits.append((lo, hi, blocked))
+        return limits
+
+def get_mask(top, bottom, base, quantum, offset):
+    """Return the bitset of grid heights from top up to (not including) bottom"""
+    first = max(math.ceil((top - base) / quantum) + offset, 0)
+    end = math.ceil((bottom - base) / quantum) + offset
+    if end <= first:
+        return 0
+    return ((1 << (end - first)) - 1) << first
+
+def shift(heights, bits):
+    """Return a bitset of heights moved down by bits (up when negative)"""
+    return heights << bits if bits >= 0 else heights >> -bits
+
+def get_nearest_bit(heights, bit):
+    """Return the set bit of a non-empty bitset closest to bit"""
+    below = heights & ((1 << (bit + 1)) - 1)
+    above = heights >> bit
+    nearest = below.bit_length() - 1 if below else None
+    if above:
+        candidate = (above & -above).bit_length() - 1 + bit
+        if nearest is None or candidate - bit < bit - nearest:
+            nearest = candidate
+    return nearest
+
+def predict_enemy_y(enemy, dt, ticks, caution=1.0):
+    """Return (expected y, uncertainty) of an enemy after ticks steps"""
+    if enemy.pattern == 'sine':
+        # (kept on screen every tick, like Enemy.update does)
+        y = enemy.y
+        offset = enemy.pattern_offset
+        bottom = enemy.screen_height - enemy.height
+        for _ in range(ticks):
+            offset += enemy.frequency * dt
+            y = min(max(y + math.sin(offset) * 2 * dt, 0), bottom)
+        return y, 0.0
+    if enemy.pattern == 'chase':
+        # Random 2 pixel nudges on 5% of ticks, each towards a row drawn
+        # between 100 and screen_height - 100; expect their average drift,
+        # and allow for the next nudge and a slower spread after it
+        rows = enemy.screen_height - 199
+        down = min(max((enemy.screen_height - 100 - math.floor(enemy.y)) / rows, 0.0), 1.0)
+        y = enemy.y + caution * 0.05 * 2 * (2 * down - 1) * ticks * dt
+        return y, caution * (2.0 + CHASE_DRIFT * ticks * dt)
+    return enemy.y, 0.0
+
+def play(level=1, seed=None, max_ticks=36000, dt=1.0, autopilot=None, precise_collisions=False):
+    """Fly one headless run and return (final state, steps, seconds)"""
+    autopilot = autopilot or Autopilot()
+    state = SimState(800, 600, level, seed=seed, precise_collisions=precise_collisions)
+    steps = 0
+    start = time.perf_counter()
+    while not state.done and steps < max_ticks:
+        step(state, autopilot.decide(state, dt), dt)
+        state.events.clear()
+        steps += 1
+    return state, steps, time.perf_counter() - start
+
+def main(argv=None):
+    """Check levels by letting the autopilot play them headless (and list the runs it lost)"""
+    parser = argparse.ArgumentParser(description="Run the Flappy Adventure autopilot headless")
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--runs', type=int, default=10, help="runs per level")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first run")
+    parser.add_argument('--precise-collisions', action='store_true', help="use pixel-perfect collisions")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for level in args.levels:
+        autopilot = Autopilot()
+        total_steps = 0
+        total_time = 0.0
+        lost = []
+        for run in range(args.runs):
+            state, steps, seconds = play(level, args.seed + run, autopilot=autopilot,
+                                         precise_collisions=args.precise_collisions)
+            total_steps += steps
+            total_time += seconds
+            if not state.level_complete:
+                lost.append(args.seed + run)
+        failures += len(lost)
+        print(f"level {level}: cleared {args.runs - len(lost)}/{args.runs}, "
+              f"{total_steps / max(total_time, 1e-9):.0f} ticks/s, "
+              f"{autopilot.plans} plans, {autopilot.sets / max(autopilot.plans, 1):.0f} sets/plan")
+        if lost:
+            print(f"  lost seeds: {' '.join(map(str, lost))}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+Batch environment module for Flappy Adventure
+
+This module runs many games in lockstep. Birds, pipes and enemies are
+stored as structure-of-arrays NumPy buffers and every step advances all
+games with vectorized math, using the same rules as Bird, Pipe, Enemy
+and the simulation module. Power-ups, lives and level completion are not
+modelled: every game is a single-life endless run at a fixed level.
+"""
+
+import argparse
+import random
+import sys
+import numpy as np
+from bird import Bird
+from pipe import Pipe
+from enemy import Enemy
+from simulation import PIPE_COUNT, PIPE_SPACING, ENEMY_SPAWN_INTERVAL, MAX_ENEMIES, SimState, step
+
+# Bird physics (see Bird)
+GRAVITY = 0.5
+FLAP_STRENGTH = -8.0
+TERMINAL_VELOCITY = 10.0
+BIRD_X = 100
+
+# Hitboxes are the sprite shrunk by 10 pixels and offset by 5
+HITBOX_OFFSET = 5
+HITBOX_WIDTH = Bird.WIDTH - 10
+HITBOX_HEIGHT = Bird.HEIGHT - 10
+
+# Enemy movement patterns
+PATTERN_STRAIGHT = 0
+PATTERN_SINE = 1
+PATTERN_CHASE = 2
+
+# Observation layout
+OBS_SIZE = 8
+# bird y, bird velocity,
+# next pipe dx, next pipe gap y, second pipe dx, second pipe gap y,
+# nearest enemy dx, nearest enemy dy
+
+class BatchFlappyEnv:
+    """Runs num_envs independent games as vectorized NumPy arrays"""
+
+    def __init__(self, num_envs, level=1, screen_width=800, screen_height=600,
+                 max_enemies=4, num_pipes=3, reward_pipe=1.0, reward_death=-1.0,
+                 reward_alive=0.0, seed=None):
+        """Initialize the batch and reset every game"""
+        self.num_envs = num_envs
+        self.level = level
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.max_enemies = max_enemies
+        self.num_pipes = num_pipes
+        self.reward_pipe = reward_pipe
+        self.reward_death = reward_death
+        self.reward_alive = reward_alive
+        self.rng = np.random.default_rng(seed)
+
+        # Level rules (see Pipe and Enemy)
+        self.gap_size = 180 - (level * 20)
+        self.pipe_speed = 3 + (level * 0.5)
+        self.enemy_speed = 4 + (level * 0.5)
+        self.enemy_spawn_chance = 0.3 * level
+
+        # Birds
+        self.bird_y = np.zeros(num_envs)
+        self.bird_velocity = np.zeros(num_envs)
+
+        # Pipes
+        self.pipe_x = np.zeros((num_envs, num_pipes))
+        self.pipe_gap_y = np.zeros((num_envs, num_pipes))
+        self.pipe_scored = np.zeros((num_envs, num_pipes), dtype=bool)
+
+        # Enemies (inactive slots are parked far off screen)
+        self.enemy_active = np.zeros((num_envs, max_enemies), dtype=bool)
+        self.enemy_x = np.zeros((num_envs, max_enemies))
+        self.enemy_y = np.zeros((num_envs, max_enemies))
+        self.enemy_pattern = np.zeros((num_envs, max_enemies), dtype=np.int8)
+        self.enemy_phase = np.zeros((num_envs, max_enemies))
+        self.enemy_frequency = np.zeros((num_envs, max_enemies))
+
+        # Per-game counters
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+        self.enemy_spawn_tick = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+
+        # Step outputs (reused every step)
+        self.obs = np.zeros((num_envs, OBS_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset all games (or the games selected by a boolean mask)"""
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        count = int(mask.sum())
+        if count == 0:
+            return self.obs
+
+        self.bird_y[mask] = self.screen_height // 2
+        self.bird_velocity[mask] = 0
+
+        offsets = self.screen_width + PIPE_SPACING * np.arange(self.num_pipes)
+        self.pipe_x[mask] = offsets
+        self.pipe_gap_y[mask] = self.random_gap_y((count, self.num_pipes))
+        self.pipe_scored[mask] = False
+
+        self.enemy_active[mask] = False
+        self.ticks[mask] = 0
+        self.enemy_spawn_tick[mask] = 0
+        self.score[mask] = 0
+
+        self.observe()
+        return self.obs
+
+    def random_gap_y(self, shape):
+        """Draw pipe gap positions like Pipe.__init__"""
+        return self.rng.integers(150, self.screen_height - 150, size=shape, endpoint=True)
+
+    def step(self, actions):
+        """Advance every game by one tick
+
+        ``actions`` holds 1 (flap) or 0 (no-op) per game. Returns the
+        observations, rewards and done flags; finished games are reset
+        automatically and their done flag is set for this step only.
+        """
+        actions = np.asarray(actions, dtype=bool)
+        rewards = self.rewards
+        rewards.fill(self.reward_alive)
+
+        # Bird physics
+        self.bird_velocity[actions] = FLAP_STRENGTH
+        self.bird_velocity += GRAVITY
+        np.minimum(self.bird_velocity, TERMINAL_VELOCITY, out=self.bird_velocity)
+        self.bird_y += self.bird_velocity
+        self.ticks += 1
+
+        # Move pipes and score the ones the bird has passed
+        self.pipe_x -= self.pipe_speed
+        passed = ~self.pipe_scored & (self.pipe_x + Pipe.WIDTH < BIRD_X)
+        self.pipe_scored |= passed
+        passed_count = passed.sum(axis=1)
+        self.score += passed_count
+        rewards += self.reward_pipe * passed_count
+
+        # Recycle pipes that left the screen behind the rightmost one
+        offscreen = self.pipe_x + Pipe.WIDTH < 0
+        if offscreen.any():
+            rightmost = self.pipe_x.max(axis=1, keepdims=True)
+            self.pipe_x = np.where(offscreen, rightmost + PIPE_SPACING, self.pipe_x)
+            self.pipe_gap_y = np.where(offscreen, self.random_gap_y(offscreen.shape), self.pipe_gap_y)
+            self.pipe_scored &= ~offscreen
+
+        self.update_enemies()
+        self.spawn_enemies()
+
+        dones = self.collide()
+        rewards[dones] += self.reward_death
+
+        # Start finished games over
+        if dones.any():
+            self.reset(dones)
+        else:
+            self.observe()
+        return self.obs, rewards, dones
+
+    def collide(self):
+        """Flag the games whose bird hits a pipe, an enemy or the screen edge (see simulation.step)"""
+        # Hitboxes are moved by assigning to pygame.Rect attributes, which
+        # rounds coordinates half away from zero
+        bird_left = BIRD_X + HITBOX_OFFSET
+        bird_top = round_half_away(self.bird_y + HITBOX_OFFSET)[:, None]
+        bird_bottom = bird_top + HITBOX_HEIGHT
+
+        pipe_left = round_half_away(self.pipe_x)
+        in_column = (bird_left < pipe_left + Pipe.WIDTH) & (bird_left + HITBOX_WIDTH > pipe_left)
+        gap_bottom = self.pipe_gap_y + self.gap_size
+        hits_top = bird_top < self.pipe_gap_y
+        hits_bottom = (bird_bottom > gap_bottom) & (gap_bottom < self.screen_height)
+        pipe_hit = (in_column & (hits_top | hits_bottom)).any(axis=1)
+
+        enemy_left = round_half_away(self.enemy_x + HITBOX_OFFSET)
+        enemy_top = round_half_away(self.enemy_y + HITBOX_OFFSET)
+        enemy_hit = (
+            self.enemy_active
+            & (bird_left < enemy_left + HITBOX_WIDTH) & (bird_left + HITBOX_WIDTH > enemy_left)
+            & (bird_top < enemy_top + HITBOX_HEIGHT) & (bird_bottom > enemy_top)
+        ).any(axis=1)
+
+        out_of_bounds = (self.bird_y < 0) | (self.bird_y > self.screen_height)
+
+        dones = self.dones
+        np.logical_or(pipe_hit, enemy_hit, out=dones)
+        dones |= out_of_bounds
+        return dones
+
+    def update_enemies(self):
+        """Move every active enemy according to its pattern (see Enemy.update)"""
+        active = self.enemy_active
+        self.enemy_x -= self.enemy_speed
+
+        sine = active & (self.enemy_pattern == PATTERN_SINE)
+        self.enemy_phase += np.where(sine, self.enemy_frequency, 0.0)
+        self.enemy_y += np.where(sine, np.sin(self.enemy_phase) * 2, 0.0)
+
+        chase = active & (self.enemy_pattern == PATTERN_CHASE)
+        chase &= self.rng.random(chase.shape) < 0.05
+        if chase.any():
+            target_y = self.rng.integers(100, self.screen_height - 100, size=chase.shape, endpoint=True)
+            self.enemy_y += np.where(chase, np.where(self.enemy_y < target_y, 2.0, -2.0), 0.0)
+
+        np.clip(self.enemy_y, 0, self.screen_height - Enemy.HEIGHT, out=self.enemy_y)
+        self.enemy_active &= self.enemy_x + Enemy.WIDTH >= 0
+
+    def spawn_enemies(self):
+        """Spawn enemies on the same interval and odds as the simulation"""
+        due = self.ticks - self.enemy_spawn_tick > ENEMY_SPAWN_INTERVAL
+        if not due.any():
+            return
+        self.enemy_spawn_tick[due] = self.ticks[due]
+
+        # Pick the first free slot in each game that rolls a spawn
+        free = ~self.enemy_active
+        spawn = due & free.any(axis=1) & (self.rng.random(self.num_envs) < self.enemy_spawn_chance)
+        rows = np.nonzero(spawn)[0]
+        if len(rows) == 0:
+            return
+        slots = free[rows].argmax(axis=1)
+        count = len(rows)
+
+        self.enemy_active[rows, slots] = True
+        self.enemy_x[rows, slots] = self.screen_width
+        self.enemy_y[rows, slots] = self.rng.integers(100, self.screen_height - 100, size=count, endpoint=True)
+        self.enemy_pattern[rows, slots] = self.rng.integers(0, 3, size=count)
+        self.enemy_phase[rows, slots] = 0.0
+        self.enemy_frequency[rows, slots] = self.rng.uniform(0.02, 0.05, size=count)
+
+    def observe(self):
+        """Fill the observation buffer in place"""
+        obs = self.obs
+        obs[:, 0] = self.bird_y
+        obs[:, 1] = self.bird_velocity
+
+        # Next two pipes the bird has not yet cleared, ordered by x
+        upcoming_x = np.where(self.pipe_x + Pipe.WIDTH >= BIRD_X, self.pipe_x, np.inf)
+        order = np.argsort(upcoming_x, axis=1)[:, :2]
+        rows = np.arange(self.num_envs)[:, None]
+        obs[:, 2:6:2] = self.pipe_x[rows, order] - BIRD_X
+        obs[:, 3:6:2] = self.pipe_gap_y[rows, order]
+
+        # Nearest active enemy ahead of the bird (zero when there is none)
+        dx = np.where(self.enemy_active & (self.enemy_x + Enemy.WIDTH >= BIRD_X), self.enemy_x - BIRD_X, np.inf)
+        nearest = dx.argmin(axis=1)
+        nearest_dx = dx[rows[:, 0], nearest]
+        has_enemy = np.isfinite(nearest_dx)
+        obs[:, 6] = np.where(has_enemy, nearest_dx, 0.0)
+        obs[:, 7] = np.where(has_enemy, self.enemy_y[rows[:, 0], nearest] - self.bird_y, 0.0)
+        return obs
+
+def round_half_away(values):
+    """Round like pygame.Rect attribute assignment (halves away from zero)"""
+    return np.copysign(np.floor(np.abs(values) + 0.5), values)
+
+def mirror(state, batch):
+    """Copy the bird, pipes and enemies of a SimState into the first game of batch"""
+    batch.bird_y[0] = state.bird.y
+    for index, pipe in enumerate(state.pipes):
+        batch.pipe_x[0, index] = pipe.x
+        batch.pipe_gap_y[0, index] = pipe.gap_y
+    batch.enemy_active[0] = False
+    for index, enemy in enumerate(state.enemies):
+        batch.enemy_active[0, index] = True
+        batch.enemy_x[0, index] = enemy.x
+        batch.enemy_y[0, index] = enemy.y
+
+def check_collisions(level=1, runs=20, seed=0, max_ticks=5000):
+    """Play seeded runs with simulation.step and return the ticks where collide() disagrees
+
+    Every tick the run's world is mirrored into a one-game batch; the
+    result lists (seed, tick, simulation hit, batch hit). Ticks with the
+    bird invincible or just moved by a lost life are not compared.
+    """
+    batch = BatchFlappyEnv(1, level, max_enemies=MAX_ENEMIES, num_pipes=PIPE_COUNT)
+    mismatches = []
+    for run_seed in range(seed, seed + runs):
+        state = SimState(batch.screen_width, batch.screen_height, level, seed=run_seed)
+        policy = random.Random(run_seed)
+        for tick in range(max_ticks):
+            # Aim for the middle of the next gap, with a little noise
+            bird = state.bird
+            pipe = state.pipes.next_unscored()
+            target = pipe.gap_y + pipe.gap_size / 2 if pipe is not None else state.screen_height / 2
+            flap = bird.y + bird.height / 2 + policy.uniform(-40, 40) > target and bird.velocity > 0
+            invincible = bird.invincible
+            step(state, flap)
+
+            events = state.events
+            if not invincible and 'life_lost' not in events:
+                mirror(state, batch)
+                hit = 'shield' in events or 'game_over' in events
+                if bool(batch.collide()[0]) != hit:
+                    mismatches.append((run_seed, tick + 1, hit, not hit))
+            events.clear()
+            if state.done:
+                break
+    return mismatches
+
+def main(argv=None):
+    """Check the batch collision tests against the simulation"""
+    parser = argparse.ArgumentParser(description="Compare BatchFlappyEnv collisions with the simulation")
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--runs', type=int, default=20, help="runs per level")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first run")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for level in args.levels:
+        mismatches = check_collisions(level, args.runs, args.seed)
+        failures += len(mismatches)
+        print(f"level {level}: {len(mismatches)} mismatched ticks in {args.runs} runs")
+        for run_seed, tick, hit, batch_hit in mismatches[:10]:
+            print(f"  seed {run_seed}, tick {tick}: simulation {'hit' if hit else 'clear'}, "
+                  f"batch {'hit' if batch_hit else 'clear'}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
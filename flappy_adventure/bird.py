@@ -5,11 +5,33 @@ This module defines the player-controlled bird character.
 """
 
 import pygame
-import os
+import struct
+import assets
+from render_queue import BIRD
 
 class Bird:
     """Player-controlled bird character"""
     
+    # Sprite dimensions shared by every bird
+    WIDTH = 40
+    HEIGHT = 30
+    FRAME_COUNT = 3
+    SPRITE_FILES = ('yellowbird-upflap.png', 'yellowbird-midflap.png', 'yellowbird-downflap.png')
+    PULSE_FRAMES = 25  # Baked invincibility pulse frames (20 ms each)
+    FLAP_STRENGTH = -8  # Flap velocity without a speed boost
+    BOOSTED_FLAP_STRENGTH = -12  # Flap velocity during a speed boost
+    
+    # Packed layout of the state saved by snapshot()
+    SNAPSHOT = struct.Struct('<ddddIddd???B')
+    
+    __slots__ = (
+        'x', 'y', 'screen_width', 'screen_height', 'game_manager', 'prev_x', 'prev_y',
+        'draw_x', 'draw_y', 'lives', 'has_shield', 'velocity', 'gravity',
+        'flap_strength', 'terminal_velocity', 'width', 'height', 'current_sprite',
+        'animation_speed', 'animation_counter', 'invincible', 'speed_boost',
+        'invincibility_timer', 'speed_boost_timer', 'power_up_duration', 'hitbox',
+    )
+    
     def __init__(self, x, y, screen_width, screen_height):
         """Initialize the bird"""
         self.x = x
@@ -18,6 +40,10 @@ class Bird:
         self.screen_height = screen_height
         self.game_manager = None  # Reference to game manager for sound effects
         
+        # Previous and interpolated positions for rendering between ticks
+        self.prev_x = self.draw_x = x
+        self.prev_y = self.draw_y = y
+        
         # Lives
         self.lives = 1
         
@@ -27,15 +53,14 @@ class Bird:
         # Physics properties
         self.velocity = 0
         self.gravity = 0.5
-        self.flap_strength = -8
+        self.flap_strength = self.FLAP_STRENGTH
         self.terminal_velocity = 10
         
         # Size
-        self.width = 40
-        self.height = 30
+        self.width = self.WIDTH
+        self.height = self.HEIGHT
         
-        # Animation
-        self.sprites = self.load_sprites()
+        # Animation (sprites are fetched from the shared cache when drawing)
         self.current_sprite = 0
         self.animation_speed = 0.2
         self.animation_counter = 0
@@ -43,35 +68,47 @@ class Bird:
         # Power-up states
         self.invincible = False
         self.speed_boost = False
-        self.invincibility_timer = 0
-        self.speed_boost_timer = 0
-        self.power_up_duration = 5000  # 5 seconds
+        self.invincibility_timer = 0  # Ticks remaining
+        self.speed_boost_timer = 0  # Ticks remaining
+        self.power_up_duration = 300  # 5 seconds at 60 ticks per second
         
         # Hitbox (slightly smaller than the sprite for better gameplay)
         self.hitbox = pygame.Rect(self.x, self.y, self.width - 10, self.height - 10)
     
-    def load_sprites(self):
-        """Load bird sprites"""
-        sprites = []
-        
-        # Try to load sprites from assets
-        sprite_names = ['yellowbird-upflap.png', 'yellowbird-midflap.png', 'yellowbird-downflap.png']
-        for name in sprite_names:
-            sprite_path = os.path.join('assets', name)
-            
-            if os.path.exists(sprite_path):
-                sprite = pygame.image.load(sprite_path).convert_alpha()
-                sprites.append(pygame.transform.scale(sprite, (self.width, self.height)))
-            else:
-                # Create a fallback sprite
-                sprite = self.create_fallback_sprite(len(sprites))
-                sprites.append(sprite)
-        
-        return sprites
+    @classmethod
+    def get_sprites(cls):
+        """Return the shared animation frames"""
+        return assets.get_surface(('bird_sprites',), lambda: [
+            assets.get_image(
+                name, (cls.WIDTH, cls.HEIGHT),
+                fallback=lambda index=index: cls.create_fallback_sprite(index)
+            )
+            for index, name in enumerate(cls.SPRITE_FILES)
+        ])
     
-    def create_fallback_sprite(self, index):
+    @classmethod
+    def get_masks(cls):
+        """Return the shared collision masks of the animation frames"""
+        return assets.get_surface(('bird_masks',), lambda: [
+            assets.get_mask(
+                name, (cls.WIDTH, cls.HEIGHT),
+                fallback=lambda index=index: cls.create_fallback_sprite(index)
+            )
+            for index, name in enumerate(cls.SPRITE_FILES)
+        ])
+    
+    def get_mask(self):
+        """Return the collision mask of the current animation frame"""
+        return self.get_masks()[self.current_sprite]
+    
+    def get_sprite_rect(self):
+        """Return the area the sprite covers at the current tick"""
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+    
+    @classmethod
+    def create_fallback_sprite(cls, index):
         """Create a cute pixel art bird sprite"""
-        sprite = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        sprite = pygame.Surface((cls.WIDTH, cls.HEIGHT), pygame.SRCALPHA)
         
         # Default colors
         main_color = (255, 255, 0)  # Yellow
@@ -178,13 +215,13 @@ class Bird:
                     )
         
         # Draw eyes (black)
-        pygame.draw.rect(sprite, colors['B'], (self.width - 12, self.height // 3 - 2, 4, 4))
+        pygame.draw.rect(sprite, colors['B'], (cls.WIDTH - 12, cls.HEIGHT // 3 - 2, 4, 4))
         
         # Draw beak (orange)
         beak_pixels = [
-            (self.width - 6, self.height // 2 - 3, 6, 2),
-            (self.width - 6, self.height // 2, 6, 2),
-            (self.width - 6, self.height // 2 + 3, 6, 2)
+            (cls.WIDTH - 6, cls.HEIGHT // 2 - 3, 6, 2),
+            (cls.WIDTH - 6, cls.HEIGHT // 2, 6, 2),
+            (cls.WIDTH - 6, cls.HEIGHT // 2 + 3, 6, 2)
         ]
         for x, y, w, h in beak_pixels:
             pygame.draw.rect(sprite, accent_color, (x, y, w, h))
@@ -200,94 +237,163 @@ class Bird:
             if self.game_manager.sounds['flap']:
                 self.game_manager.sounds['flap'].play()
     
-    def update(self):
-        """Update bird position and state"""
+    def update(self, dt=1.0):
+        """Update bird position and state by dt ticks"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Apply gravity
-        self.velocity += self.gravity
+        self.velocity += self.gravity * dt
         
         # Cap terminal velocity
         if self.velocity > self.terminal_velocity:
             self.velocity = self.terminal_velocity
         
         # Update position
-        self.y += self.velocity
+        self.y += self.velocity * dt
         
         # Update hitbox position
         self.hitbox.x = self.x + 5  # Offset hitbox to be centered in sprite
         self.hitbox.y = self.y + 5
         
         # Update animation
-        self.animation_counter += self.animation_speed
-        if self.animation_counter >= len(self.sprites):
+        self.animation_counter += self.animation_speed * dt
+        if self.animation_counter >= self.FRAME_COUNT:
             self.animation_counter = 0
         self.current_sprite = int(self.animation_counter)
         
         # Update power-up timers
-        current_time = pygame.time.get_ticks()
-        
         if self.invincible:
-            if current_time - self.invincibility_timer > self.power_up_duration:
+            self.invincibility_timer -= dt
+            if self.invincibility_timer < 0:
                 self.invincible = False
         
         if self.speed_boost:
-            if current_time - self.speed_boost_timer > self.power_up_duration:
+            self.speed_boost_timer -= dt
+            if self.speed_boost_timer < 0:
                 self.speed_boost = False
-                self.flap_strength = -8  # Reset flap strength
+                self.flap_strength = self.FLAP_STRENGTH  # Reset flap strength
     
     def apply_invincibility(self):
         """Apply invincibility power-up"""
         self.invincible = True
-        self.invincibility_timer = pygame.time.get_ticks()
+        self.invincibility_timer = self.power_up_duration
     
     def apply_speed_boost(self):
         """Apply speed boost power-up"""
         self.speed_boost = True
-        self.speed_boost_timer = pygame.time.get_ticks()
-        self.flap_strength = -12  # Stronger flap
+        self.speed_boost_timer = self.power_up_duration
+        self.flap_strength = self.BOOSTED_FLAP_STRENGTH  # Stronger flap
+    
+    def snapshot(self):
+        """Return the bird's gameplay state as packed bytes"""
+        return self.SNAPSHOT.pack(
+            self.x, self.y, self.velocity, self.flap_strength, self.lives,
+            self.invincibility_timer, self.speed_boost_timer, self.animation_counter,
+            self.has_shield, self.invincible, self.speed_boost, self.current_sprite
+        )
+    
+    def restore(self, data, offset=0):
+        """Restore a state saved by snapshot() and return the offset after it"""
+        (self.x, self.y, self.velocity, self.flap_strength, self.lives,
+         self.invincibility_timer, self.speed_boost_timer, self.animation_counter,
+         self.has_shield, self.invincible, self.speed_boost,
+         self.current_sprite) = self.SNAPSHOT.unpack_from(data, offset)
+        self.prev_x = self.draw_x = self.x
+        self.prev_y = self.draw_y = self.y
+        self.hitbox.x = self.x + 5
+        self.hitbox.y = self.y + 5
+        return offset + self.SNAPSHOT.size
+    
+    def interpolate(self, alpha):
+        """Place the sprite alpha of the way from the previous tick to the current one"""
+        self.draw_x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.draw_y = self.prev_y + (self.y - self.prev_y) * alpha
+    
+    def get_pulse_phase(self):
+        """Return the index of the invincibility pulse frame to show"""
+        return (pygame.time.get_ticks() % 500) * self.PULSE_FRAMES // 500
+    
+    @classmethod
+    def get_invincible_frames(cls, index):
+        """Return the baked (sprite, x offset, y offset) pulse frames for a flap frame"""
+        return assets.get_surface(('bird_invincible', index), lambda: cls.bake_invincible_frames(index))
     
-    def draw(self, screen):
-        """Draw the bird on the screen"""
-        # Get the current sprite
-        sprite = self.sprites[self.current_sprite]
+    @classmethod
+    def bake_invincible_frames(cls, index):
+        """Tint a flap frame blue and pre-scale it for every pulse phase"""
+        sprite = cls.get_sprites()[index]
         
-        # Apply visual effects for power-ups
-        if self.invincible:
-            # Create a copy of the sprite with a blue tint for invincibility
-            tinted_sprite = sprite.copy()
-            blue_overlay = pygame.Surface(sprite.get_size(), pygame.SRCALPHA)
-            blue_overlay.fill((0, 0, 255, 100))
-            tinted_sprite.blit(blue_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-            
+        # Create a copy of the sprite with a blue tint for invincibility
+        tinted_sprite = sprite.copy()
+        blue_overlay = pygame.Surface(sprite.get_size(), pygame.SRCALPHA)
+        blue_overlay.fill((0, 0, 255, 100))
+        tinted_sprite.blit(blue_overlay, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        
+        frames = []
+        for phase in range(cls.PULSE_FRAMES):
             # Pulsating effect
-            pulse = (pygame.time.get_ticks() % 500) / 500.0
-            scale_factor = 1.0 + 0.2 * pulse
-            scaled_width = int(self.width * scale_factor)
-            scaled_height = int(self.height * scale_factor)
+            scale_factor = 1.0 + 0.2 * phase / cls.PULSE_FRAMES
+            scaled_width = int(cls.WIDTH * scale_factor)
+            scaled_height = int(cls.HEIGHT * scale_factor)
             scaled_sprite = pygame.transform.scale(tinted_sprite, (scaled_width, scaled_height))
             
             # Center the scaled sprite
-            x_offset = (scaled_width - self.width) // 2
-            y_offset = (scaled_height - self.height) // 2
-            
-            screen.blit(scaled_sprite, (self.x - x_offset, self.y - y_offset))
+            x_offset = (scaled_width - cls.WIDTH) // 2
+            y_offset = (scaled_height - cls.HEIGHT) // 2
+            frames.append((scaled_sprite, x_offset, y_offset))
+        return frames
+    
+    @classmethod
+    def get_trail_frames(cls, index):
+        """Return the baked fading speed-trail copies of a flap frame"""
+        return assets.get_surface(('bird_trail', index), lambda: cls.bake_trail_frames(index))
+    
+    @classmethod
+    def bake_trail_frames(cls, index):
+        """Make the three fading copies drawn behind a speed-boosted bird"""
+        sprite = cls.get_sprites()[index]
+        frames = []
+        for i in range(1, 4):
+            trail_sprite = sprite.copy()
+            trail_sprite.set_alpha(100 - i * 30)  # Fade out
+            frames.append(trail_sprite)
+        return frames
+    
+    @classmethod
+    def get_shield_sprite(cls):
+        """Return the shared shield bubble surface"""
+        return assets.get_surface('bird_shield', cls.bake_shield_sprite)
+    
+    @classmethod
+    def bake_shield_sprite(cls):
+        """Draw the shield bubble"""
+        shield_surface = pygame.Surface((cls.WIDTH + 10, cls.HEIGHT + 10), pygame.SRCALPHA)
+        pygame.draw.circle(shield_surface, (0, 191, 255, 100), (cls.WIDTH // 2 + 5, cls.HEIGHT // 2 + 5), cls.WIDTH // 2 + 5)
+        pygame.draw.circle(shield_surface, (255, 255, 255, 150), (cls.WIDTH // 2 + 5, cls.HEIGHT // 2 + 5), cls.WIDTH // 2 + 5, 2)
+        return shield_surface
+    
+    def enqueue(self, queue):
+        """Queue the bird's sprites for drawing"""
+        # Apply visual effects for power-ups (all frames are baked once)
+        if self.invincible:
+            # Blue-tinted, pulsating sprite for invincibility
+            frames = self.get_invincible_frames(self.current_sprite)
+            scaled_sprite, x_offset, y_offset = frames[self.get_pulse_phase()]
+            queue.push(scaled_sprite, (self.draw_x - x_offset, self.draw_y - y_offset), BIRD)
         
         elif self.speed_boost:
-            # Create a copy of the sprite with a yellow trail for speed boost
-            screen.blit(sprite, (self.x, self.y))
+            # Speed boost leaves a fading trail
+            queue.push(self.get_sprites()[self.current_sprite], (self.draw_x, self.draw_y), BIRD)
             
             # Draw speed lines
-            for i in range(1, 4):
-                trail_sprite = sprite.copy()
-                trail_sprite.set_alpha(100 - i * 30)  # Fade out
-                screen.blit(trail_sprite, (self.x - i * 10, self.y))
+            for i, trail_sprite in enumerate(self.get_trail_frames(self.current_sprite), 1):
+                queue.push(trail_sprite, (self.draw_x - i * 10, self.draw_y), BIRD)
         
         else:
             # Normal drawing
-            screen.blit(sprite, (self.x, self.y))
+            queue.push(self.get_sprites()[self.current_sprite], (self.draw_x, self.draw_y), BIRD)
         
         # Draw shield effect if active
         if self.has_shield:
-            shield_surface = pygame.Surface((self.width + 10, self.height + 10), pygame.SRCALPHA)
-            pygame.draw.circle(shield_surface, (0, 191, 255, 100), (self.width // 2 + 5, self.height // 2 + 5), self.width // 2 + 5)
-            pygame.draw.circle(shield_surface, (255, 255, 255, 150), (self.width // 2 + 5, self.height // 2 + 5), self.width // 2 + 5, 2)
-            screen.blit(shield_surface, (self.x - 5, self.y - 5))
\ No newline at end of file
+            queue.push(self.get_shield_sprite(), (self.draw_x - 5, self.draw_y - 5), BIRD)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Atlas builder for Flappy Adventure
+
+This script packs the sprite PNGs in assets/ into a single atlas image
+plus a JSON index of name -> [x, y, width, height]. At runtime the
+assets module loads the atlas once and hands out subsurfaces, so
+startup opens and decodes one file instead of one per sprite. Sprites
+that are not in the index are still loaded from their own files.
+
+The backgrounds stay separate: they are scaled to the screen as soon as
+they are loaded, so a view into the atlas saves nothing, and they would
+more than double the atlas area to decode.
+
+Usage:
+    python build_atlas.py   # Writes assets/atlas.png and assets/atlas.json
+"""
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import sys
+import pygame
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+
+# Files left out of the atlas
+EXCLUDE = ('background-*.png', 'atlas.png')
+
+# Transparent pixels between sprites
+PADDING = 1
+
+# Atlas widths tried by the packer (the smallest resulting area wins)
+WIDTHS = (512, 1024, 2048)
+
+def pack(sizes, width, padding=PADDING):
+    """Place rectangles on shelves and return ({name: (x, y)}, total height)
+
+    Rectangles are placed tallest first, left to right, starting a new
+    shelf when the current one is full.
+    """
+    positions = {}
+    x = y = shelf_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        if w > width:
+            return None, None
+        if x + w > width:
+            y += shelf_height + padding
+            x = shelf_height = 0
+        positions[name] = (x, y)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+def build(assets_dir=ASSETS_DIR, output='atlas'):
+    """Pack every PNG in assets_dir and write <output>.png and <output>.json"""
+    images = {}
+    for path in sorted(glob.glob(os.path.join(assets_dir, '*.png'))):
+        name = os.path.basename(path)
+        if name != output + '.png' and not any(fnmatch.fnmatch(name, pattern) for pattern in EXCLUDE):
+            images[name] = pygame.image.load(path)
+    sizes = {name: image.get_size() for name, image in images.items()}
+
+    # Pick the atlas width with the least wasted area
+    best = None
+    for width in WIDTHS:
+        positions, height = pack(sizes, width)
+        if positions is not None and (best is None or width * height < best[0] * best[1]):
+            best = (width, height, positions)
+    width, height, positions = best
+
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+    index = {}
+    for name, (x, y) in positions.items():
+        atlas.blit(images[name], (x, y))
+        index[name] = [x, y, *sizes[name]]
+
+    pygame.image.save(atlas, os.path.join(assets_dir, output + '.png'))
+    with open(os.path.join(assets_dir, output + '.json'), 'w') as f:
+        json.dump({'size': [width, height], 'sprites': dict(sorted(index.items()))}, f, separators=(',', ':'))
+    return width, height, len(index)
+
+def main(argv=None):
+    """Build the sprite atlas"""
+    parser = argparse.ArgumentParser(description="Pack the Flappy Adventure sprites into an atlas")
+    parser.add_argument('--assets', default=ASSETS_DIR, help="directory with the sprite PNGs")
+    args = parser.parse_args(argv)
+
+    width, height, count = build(args.assets)
+    print(f"packed {count} sprites into a {width}x{height} atlas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
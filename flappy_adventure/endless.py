@@ -0,0 +1,191 @@
+"""
+Endless module for Flappy Adventure
+
+This module generates the track of an endless run. Instead of three
+fixed levels, difficulty follows a continuous curve of the number of
+pipes placed so far. The track is cut into chunks of a few pipes, each
+with the enemies and power-ups spawned behind them. A chunk only depends
+on the run's seed and its index, so chunks can be built ahead of time on
+a worker thread and handed over through a bounded buffer without
+changing what a seed plays.
+"""
+
+import math
+import random
+import threading
+from collections import deque
+from enemy import Enemy
+from power_up import PowerUp, PowerUpType
+
+# Pipes per chunk, and chunks kept ready ahead of the one being played
+CHUNK_PIPES = 8
+CHUNKS_AHEAD = 4
+
+# Difficulty curve: every value eases from its first to its second value,
+# two thirds of the way there after DIFFICULTY_PIPES pipes
+DIFFICULTY_PIPES = 60
+GAP_SIZE = (170, 115)
+PIPE_SPEED = (3.5, 5.5)
+ENEMY_CHANCE = (0.05, 0.35)  # Per pipe
+POWER_UP_CHANCE = (0.12, 0.06)  # Per pipe
+
+# Enemies fly this much faster than the track scrolls
+ENEMY_SPEED_BONUS = 1.0
+
+# Pipes per visual stage (pipe, enemy and background palettes of levels 1-3)
+STAGE_PIPES = 20
+MAX_STAGE = 3
+
+# Power-up types with weighted probabilities (hearts are rarer)
+POWER_UP_TYPES = list(PowerUpType)
+POWER_UP_WEIGHTS = [0.4, 0.4, 0.2]  # Speed, Shield, Heart
+
+# Random heights tried for a power-up before it is dropped for crowding an enemy
+SPAWN_ATTEMPTS = 4
+
+def get_difficulty(pipe_index):
+    """Return (gap size, pipe speed, enemy chance, power-up chance) at a pipe of an endless run"""
+    progress = 1.0 - math.exp(-pipe_index / DIFFICULTY_PIPES)
+
+    def ease(values):
+        start, end = values
+        return start + (end - start) * progress
+
+    return ease(GAP_SIZE), ease(PIPE_SPEED), ease(ENEMY_CHANCE), ease(POWER_UP_CHANCE)
+
+def get_stage(pipe_index):
+    """Return the campaign level whose look a pipe of an endless run borrows"""
+    return min(MAX_STAGE, 1 + pipe_index // STAGE_PIPES)
+
+class Slot:
+    """One pipe of the track and what spawns behind it"""
+
+    __slots__ = (
+        'gap_y', 'gap_size', 'speed', 'stage', 'enemy_y', 'enemy_speed',
+        'power_up_y', 'power_up_type', 'power_up_speed',
+    )
+
+    def __init__(self, gap_y, gap_size, speed, stage):
+        """Initialize a slot without spawns"""
+        self.gap_y = gap_y
+        self.gap_size = gap_size
+        self.speed = speed
+        self.stage = stage
+        self.enemy_y = None
+        self.enemy_speed = 0.0
+        self.power_up_y = None
+        self.power_up_type = None
+        self.power_up_speed = speed  # Power-ups drift with the track
+
+class Chunk:
+    """CHUNK_PIPES consecutive slots of an endless track"""
+
+    __slots__ = ('index', 'slots')
+
+    def __init__(self, index, slots):
+        """Initialize a chunk"""
+        self.index = index
+        self.slots = slots
+
+class ChunkGenerator:
+    """Builds the chunks of one endless run on demand"""
+
+    def __init__(self, seed, screen_height):
+        """Initialize a generator for a run seed"""
+        self.seed = seed
+        self.screen_height = screen_height
+
+    def generate(self, index):
+        """Build chunk index (safe to call from any thread)"""
+        # Each chunk has its own stream, so chunks can be built in any order
+        rng = random.Random(f"{self.seed}/chunk/{index}")
+        screen_height = self.screen_height
+        slots = []
+        for pipe_index in range(index * CHUNK_PIPES, (index + 1) * CHUNK_PIPES):
+            gap_size, speed, enemy_chance, power_up_chance = get_difficulty(pipe_index)
+            slot = Slot(rng.randint(150, screen_height - 150), round(gap_size), speed, get_stage(pipe_index))
+
+            if rng.random() < enemy_chance:
+                slot.enemy_y = rng.randint(100, screen_height - 100)
+                slot.enemy_speed = speed + ENEMY_SPEED_BONUS
+
+            if rng.random() < power_up_chance:
+                power_up_type = rng.choices(POWER_UP_TYPES, POWER_UP_WEIGHTS)[0]
+                for _ in range(SPAWN_ATTEMPTS):
+                    y = rng.randint(100, screen_height - 100)
+                    if slot.enemy_y is None or abs(y - slot.enemy_y) >= Enemy.HEIGHT + PowerUp.SIZE:
+                        slot.power_up_y = y
+                        slot.power_up_type = power_up_type
+                        break
+            slots.append(slot)
+        return Chunk(index, slots)
+
+    def get(self, index):
+        """Return chunk index"""
+        return self.generate(index)
+
+    def close(self):
+        """Release the generator (nothing to do without a worker)"""
+
+class ChunkStream:
+    """Chunks of one endless run, built ahead on a worker thread
+
+    The worker keeps up to ``ahead`` chunks ready in a bounded buffer. A
+    chunk that is not ready when it is needed (the worker fell behind, or
+    the run was rewound) is built inline instead; it comes out the same
+    either way, so only the timing depends on the worker.
+    """
+
+    def __init__(self, generator, ahead=CHUNKS_AHEAD):
+        """Initialize the stream and start its worker"""
+        self.generator = generator
+        self.ahead = ahead
+        self.ready = deque()  # Built chunks, in index order
+        self.next_index = 0  # Index of the next chunk the worker builds
+        self.closed = False
+        self.misses = 0  # Chunks built inline
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name='chunk-generator', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Build chunks until the buffer is full, then wait for it to drain"""
+        condition = self.condition
+        while True:
+            with condition:
+                while not self.closed and len(self.ready) >= self.ahead:
+                    condition.wait()
+                if self.closed:
+                    return
+                index = self.next_index
+            chunk = self.generator.generate(index)
+            with condition:
+                # (get() may have moved the stream elsewhere meanwhile)
+                if index == self.next_index:
+                    self.ready.append(chunk)
+                    self.next_index = index + 1
+
+    def get(self, index):
+        """Return chunk index, taking it from the buffer when it is ready"""
+        with self.condition:
+            ready = self.ready
+            while ready and ready[0].index < index:
+                ready.popleft()
+            if ready and ready[0].index == index:
+                chunk = ready.popleft()
+                self.condition.notify()
+                return chunk
+
+            # Not built yet: have the worker continue after this chunk
+            ready.clear()
+            self.next_index = index + 1
+            self.misses += 1
+            self.condition.notify()
+        return self.generator.generate(index)
+
+    def close(self):
+        """Stop the worker"""
+        with self.condition:
+            self.closed = True
+            self.ready.clear()
+            self.condition.notify()
@@ -5,73 +5,113 @@ This module defines the enemy birds that the player must avoid.
 """
 
 import pygame
-import os
 import random
 import math
+import struct
+import assets
+from render_queue import ENEMIES
 
 class Enemy:
     """Enemy bird that the player must avoid"""
     
-    def __init__(self, x, y, screen_width, screen_height, level):
-        """Initialize the enemy"""
+    # Sprite dimensions shared by every enemy
+    WIDTH = 40
+    HEIGHT = 30
+    FRAME_COUNT = 3
+    PATTERNS = ('straight', 'sine', 'chase')
+    
+    # Packed layout of the state saved by snapshot()
+    SNAPSHOT = struct.Struct('<ddBdiddBdB')
+    
+    __slots__ = (
+        'x', 'y', 'screen_width', 'screen_height', 'level', 'prev_x', 'prev_y',
+        'draw_x', 'draw_y', 'width', 'height', 'base_speed', 'speed', 'pattern',
+        'pattern_offset', 'amplitude', 'frequency', 'current_sprite',
+        'animation_speed', 'animation_counter', 'hitbox', 'active', 'rng',
+    )
+    
+    def __init__(self, x, y, screen_width, screen_height, level, rng=random):
+        """Initialize the enemy (its movement pattern is drawn from rng)"""
+        # Hitbox (moved into place by reset)
+        self.hitbox = pygame.Rect(x, y, self.WIDTH - 10, self.HEIGHT - 10)
+        self.reset(x, y, screen_width, screen_height, level, rng)
+    
+    def reset(self, x, y, screen_width, screen_height, level, rng=random):
+        """(Re)initialize the enemy in place so pooled instances can be reused"""
+        self.active = True
+        self.rng = rng
         self.x = x
         self.y = y
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.level = level
         
+        # Previous and interpolated positions for rendering between ticks
+        self.prev_x = self.draw_x = x
+        self.prev_y = self.draw_y = y
+        
         # Size
-        self.width = 40
-        self.height = 30
+        self.width = self.WIDTH
+        self.height = self.HEIGHT
         
         # Speed (increases with level)
         self.base_speed = 4 + (level * 0.5)
         self.speed = self.base_speed
         
         # Movement pattern (different patterns based on level)
-        self.pattern = random.choice(['straight', 'sine', 'chase'])
+        self.pattern = rng.choice(self.PATTERNS)
         self.pattern_offset = 0
-        self.amplitude = random.randint(30, 80)
-        self.frequency = random.uniform(0.02, 0.05)
+        self.amplitude = rng.randint(30, 80)
+        self.frequency = rng.uniform(0.02, 0.05)
         
-        # Animation
-        self.sprites = self.load_sprites()
+        # Animation (sprites are fetched from the shared cache when drawing)
         self.current_sprite = 0
         self.animation_speed = 0.2
         self.animation_counter = 0
         
         # Hitbox
-        self.hitbox = pygame.Rect(self.x, self.y, self.width - 10, self.height - 10)
+        self.hitbox.x = self.x
+        self.hitbox.y = self.y
     
-    def load_sprites(self):
-        """Load enemy sprites"""
-        sprites = []
-        
-        # Try to load sprites from assets
-        if self.level == 1:
-            sprite_names = ['redbird-upflap.png', 'redbird-midflap.png', 'redbird-downflap.png']
-        else:
-            sprite_names = ['bluebird-upflap.png', 'bluebird-midflap.png', 'bluebird-downflap.png']
-            
-        for name in sprite_names:
-            sprite_path = os.path.join('assets', name)
-            
-            if os.path.exists(sprite_path):
-                sprite = pygame.image.load(sprite_path).convert_alpha()
-                sprites.append(pygame.transform.scale(sprite, (self.width, self.height)))
-            else:
-                # Create a fallback sprite
-                sprite = self.create_fallback_sprite(len(sprites))
-                sprites.append(sprite)
-        
-        return sprites
+    @classmethod
+    def get_sprite_files(cls, level):
+        """Return the animation frame files of a level's enemies"""
+        if level == 1:
+            return ('redbird-upflap.png', 'redbird-midflap.png', 'redbird-downflap.png')
+        return ('bluebird-upflap.png', 'bluebird-midflap.png', 'bluebird-downflap.png')
+    
+    @classmethod
+    def get_sprites(cls, level):
+        """Load enemy sprites for a level"""
+        # Fallback artwork only differs between level 1 and later levels
+        palette = 1 if level == 1 else 2
+        return assets.get_surface(('enemy_sprites', palette), lambda: [
+            assets.get_image(
+                name, (cls.WIDTH, cls.HEIGHT), palette=palette,
+                fallback=lambda index=index: cls.create_fallback_sprite(level, index)
+            )
+            for index, name in enumerate(cls.get_sprite_files(level))
+        ])
+    
+    @classmethod
+    def get_masks(cls, level):
+        """Return the shared collision masks of a level's animation frames"""
+        palette = 1 if level == 1 else 2
+        return assets.get_surface(('enemy_masks', palette), lambda: [
+            assets.get_mask(
+                name, (cls.WIDTH, cls.HEIGHT),
+                fallback=lambda index=index: cls.create_fallback_sprite(level, index)
+            )
+            for index, name in enumerate(cls.get_sprite_files(level))
+        ])
     
-    def create_fallback_sprite(self, index):
+    @classmethod
+    def create_fallback_sprite(cls, level, index):
         """Create a fallback enemy sprite with pixel art style"""
-        sprite = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        sprite = pygame.Surface((cls.WIDTH, cls.HEIGHT), pygame.SRCALPHA)
         
         # Different colors based on level
-        if self.level == 1:
+        if level == 1:
             main_color = (255, 0, 0)  # Red
             accent_color = (200, 0, 0)
         else:
@@ -179,37 +219,40 @@ class Enemy:
                     )
         
         # Draw angry eyes (black)
-        pygame.draw.rect(sprite, colors['B'], (self.width - 12, self.height // 3 - 3, 4, 2))
-        pygame.draw.rect(sprite, colors['B'], (self.width - 12, self.height // 3, 4, 2))
+        pygame.draw.rect(sprite, colors['B'], (cls.WIDTH - 12, cls.HEIGHT // 3 - 3, 4, 2))
+        pygame.draw.rect(sprite, colors['B'], (cls.WIDTH - 12, cls.HEIGHT // 3, 4, 2))
         
         # Draw sharp beak
         beak_pixels = [
-            (self.width - 4, self.height // 2 - 4, 4, 2),
-            (self.width - 6, self.height // 2 - 2, 6, 2),
-            (self.width - 4, self.height // 2, 4, 2),
-            (self.width - 6, self.height // 2 + 2, 6, 2),
-            (self.width - 4, self.height // 2 + 4, 4, 2)
+            (cls.WIDTH - 4, cls.HEIGHT // 2 - 4, 4, 2),
+            (cls.WIDTH - 6, cls.HEIGHT // 2 - 2, 6, 2),
+            (cls.WIDTH - 4, cls.HEIGHT // 2, 4, 2),
+            (cls.WIDTH - 6, cls.HEIGHT // 2 + 2, 6, 2),
+            (cls.WIDTH - 4, cls.HEIGHT // 2 + 4, 4, 2)
         ]
         for x, y, w, h in beak_pixels:
             pygame.draw.rect(sprite, accent_color, (x, y, w, h))
         
         return sprite
     
-    def update(self):
-        """Update enemy position and animation"""
+    def update(self, dt=1.0):
+        """Update enemy position and animation by dt ticks"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Move enemy to the left
-        self.x -= self.speed
+        self.x -= self.speed * dt
         
         # Apply movement pattern
         if self.pattern == 'sine':
             # Sinusoidal movement
-            self.pattern_offset += self.frequency
-            self.y = self.y + math.sin(self.pattern_offset) * 2
+            self.pattern_offset += self.frequency * dt
+            self.y = self.y + math.sin(self.pattern_offset) * 2 * dt
             
-        elif self.pattern == 'chase' and random.random() < 0.05:
+        elif self.pattern == 'chase' and self.rng.random() < 0.05 * dt:
             # Occasionally adjust y position to "chase" the player
             # (In a real game, you would pass the player's position)
-            target_y = random.randint(100, self.screen_height - 100)
+            target_y = self.rng.randint(100, self.screen_height - 100)
             if self.y < target_y:
                 self.y += 2
             else:
@@ -226,8 +269,8 @@ class Enemy:
         self.hitbox.y = self.y + 5
         
         # Update animation
-        self.animation_counter += self.animation_speed
-        if self.animation_counter >= len(self.sprites):
+        self.animation_counter += self.animation_speed * dt
+        if self.animation_counter >= self.FRAME_COUNT:
             self.animation_counter = 0
         self.current_sprite = int(self.animation_counter)
     
@@ -235,13 +278,47 @@ class Enemy:
         """Check if the bird collides with this enemy"""
         return bird.hitbox.colliderect(self.hitbox)
     
-    def draw(self, screen):
-        """Draw the enemy on the screen"""
+    def touches(self, rect, mask):
+        """Check if a mask placed at rect overlaps the enemy's opaque pixels"""
+        sprite_rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        if not rect.colliderect(sprite_rect):
+            return False
+        offset = (sprite_rect.x - rect.x, sprite_rect.y - rect.y)
+        return mask.overlap(self.get_masks(self.level)[self.current_sprite], offset) is not None
+    
+    def snapshot(self):
+        """Return the enemy's gameplay state as packed bytes"""
+        return self.SNAPSHOT.pack(
+            self.x, self.y, self.PATTERNS.index(self.pattern), self.pattern_offset,
+            self.amplitude, self.frequency, self.animation_counter, self.current_sprite,
+            self.speed, self.level
+        )
+    
+    def restore(self, data, offset=0):
+        """Restore a state saved by snapshot() and return the offset after it"""
+        (self.x, self.y, pattern, self.pattern_offset, self.amplitude,
+         self.frequency, self.animation_counter, self.current_sprite,
+         self.speed, self.level) = self.SNAPSHOT.unpack_from(data, offset)
+        self.base_speed = self.speed
+        self.pattern = self.PATTERNS[pattern]
+        self.prev_x = self.draw_x = self.x
+        self.prev_y = self.draw_y = self.y
+        self.hitbox.x = self.x + 5
+        self.hitbox.y = self.y + 5
+        return offset + self.SNAPSHOT.size
+    
+    def interpolate(self, alpha):
+        """Place the sprite alpha of the way from the previous tick to the current one"""
+        self.draw_x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.draw_y = self.prev_y + (self.y - self.prev_y) * alpha
+    
+    def enqueue(self, queue):
+        """Queue the enemy sprite for drawing"""
         # Get the current sprite
-        sprite = self.sprites[self.current_sprite]
+        sprite = self.get_sprites(self.level)[self.current_sprite]
         
         # Draw the enemy
-        screen.blit(sprite, (self.x, self.y))
+        queue.push(sprite, (self.draw_x, self.draw_y), ENEMIES)
         
         # Debug: draw hitbox (uncomment for debugging)
         # pygame.draw.rect(screen, (255, 0, 0), self.hitbox, 1)
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+Environment module for Flappy Adventure
+
+This module wraps the gameplay simulation in a Gym-style reset()/step()
+API for reinforcement learning. Observations are written into one
+preallocated float buffer, so stepping the environment does not build
+new lists or arrays.
+"""
+
+import math
+import numbers
+import os
+import random
+from array import array
+from bird import Bird
+from enemy import Enemy
+from pipe import Pipe
+from simulation import PIPE_COUNT, PIPE_SPACING, SimState, step
+
+# Observation layout
+OBS_BIRD_Y = 0
+OBS_BIRD_VELOCITY = 1
+OBS_PIPE1_DX = 2
+OBS_PIPE1_GAP_Y = 3
+OBS_PIPE1_GAP_SIZE = 4
+OBS_PIPE2_DX = 5
+OBS_PIPE2_GAP_Y = 6
+OBS_PIPE2_GAP_SIZE = 7
+OBS_ENEMY_DX = 8
+OBS_ENEMY_DY = 9
+OBS_INVINCIBLE = 10  # Ticks of invincibility left
+OBS_SPEED_BOOST = 11  # Ticks of speed boost left
+OBS_SHIELD = 12  # 1 when a shield is active
+OBS_LIVES = 13
+OBS_SIZE = 14
+
+# Actions
+NOOP = 0
+FLAP = 1
+
+class Discrete:
+    """Action space of n integer choices"""
+
+    def __init__(self, n):
+        """Initialize the space"""
+        self.n = n
+        self.shape = ()
+
+    def sample(self):
+        """Return a random action"""
+        return random.randrange(self.n)
+
+    def contains(self, x):
+        """Check if x is a valid action"""
+        return isinstance(x, numbers.Integral) and 0 <= x < self.n
+
+class Box:
+    """Observation space of float vectors with per-field bounds (high may be infinite)"""
+
+    def __init__(self, low, high):
+        """Initialize the space"""
+        self.low = tuple(low)
+        self.high = tuple(high)
+        self.shape = (len(self.low),)
+
+    def sample(self):
+        """Return a random observation"""
+        return array('f', (
+            random.uniform(low, high) if high != math.inf else low + random.expovariate(1.0)
+            for low, high in zip(self.low, self.high)
+        ))
+
+    def contains(self, x):
+        """Check if x fits the space"""
+        return len(x) == self.shape[0] and all(
+            low <= v <= high for low, v, high in zip(self.low, x, self.high)
+        )
+
+class FlappyEnv:
+    """Gym-style single-game environment (action 1 flaps, 0 does nothing)"""
+
+    metadata = {'render_modes': ['rgb_array']}
+
+    def __init__(self, level=1, screen_width=800, screen_height=600, render_mode=None,
+                 reward_pipe=1.0, reward_death=-1.0, reward_life_lost=0.0,
+                 reward_alive=0.0, max_steps=None):
+        """Initialize the environment"""
+        self.level = level
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.render_mode = render_mode
+        self.max_steps = max_steps
+
+        # Reward configuration
+        self.reward_pipe = reward_pipe
+        self.reward_death = reward_death
+        self.reward_life_lost = reward_life_lost
+        self.reward_alive = reward_alive
+
+        self.action_space = Discrete(2)
+        self.observation_space = get_observation_space(screen_width, screen_height)
+
+        # Observation buffer reused by every step
+        self.obs = array('f', bytes(4 * OBS_SIZE))
+
+        # Seeds of successive runs (reseeded by reset(seed=...))
+        self.seed_rng = random.Random()
+
+        self.state = None
+        self.steps = 0
+        self.game_manager = None  # Created on first render
+
+    def reset(self, seed=None, level=None):
+        """Start a new run and return (observation, info)
+
+        A ``seed`` makes this run and the ones reset after it reproducible.
+        """
+        if seed is not None:
+            self.seed_rng.seed(seed)
+        if level is not None:
+            self.level = level
+        self.state = SimState(self.screen_width, self.screen_height, self.level,
+                              seed=self.seed_rng.getrandbits(64))
+        self.steps = 0
+        self.observe()
+        return self.obs, {}
+
+    def step(self, action):
+        """Apply an action and return (obs, reward, terminated, truncated, info)"""
+        state = self.state
+        step(state, action)
+        self.steps += 1
+
+        # Reward from this step's gameplay events
+        reward = self.reward_alive
+        for event in state.events:
+            if event == 'score':
+                reward += self.reward_pipe
+            elif event == 'life_lost':
+                reward += self.reward_life_lost
+            elif event == 'game_over':
+                reward += self.reward_death
+        state.events.clear()
+
+        terminated = state.done
+        truncated = self.max_steps is not None and self.steps >= self.max_steps and not terminated
+        self.observe()
+        return self.obs, reward, terminated, truncated, {
+            'score': state.score,
+            'level_complete': state.level_complete,
+        }
+
+    def observe(self):
+        """Write the current state into the observation buffer"""
+        return write_observation(self.state, self.obs)
+
+    def render(self):
+        """Render the current frame as an (height, width, 3) RGB array"""
+        if self.render_mode != 'rgb_array':
+            return None
+
+        import pygame
+        from game_manager import GameManager, GameState
+
+        if self.game_manager is None:
+            # Draw offscreen; the display is only needed for pixel format conversion
+            if not pygame.display.get_init():
+                os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+                os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+                pygame.init()
+            if pygame.display.get_surface() is None:
+                pygame.display.set_mode((1, 1), pygame.HIDDEN)
+            canvas = pygame.Surface((self.screen_width, self.screen_height))
+            self.game_manager = GameManager(canvas, self.screen_width, self.screen_height)
+
+        game_manager = self.game_manager
+        game_manager.sim = self.state
+        game_manager.current_level = self.state.level
+        game_manager.score = self.state.score
+        game_manager.state = GameState.PLAYING
+        game_manager.draw()
+        return pygame.surfarray.array3d(game_manager.screen).transpose(1, 0, 2)
+
+    def close(self):
+        """Release rendering resources"""
+        self.game_manager = None
+
+def get_observation_space(screen_width, screen_height):
+    """Return the Box holding every observation of a screen_width x screen_height game"""
+    low = [0.0] * OBS_SIZE
+    high = [0.0] * OBS_SIZE
+
+    # The bird may leave the screen for a tick or two (a shield absorbs the
+    # first out-of-bounds hit) at up to its boosted flap or terminal velocity
+    low[OBS_BIRD_VELOCITY] = Bird.BOOSTED_FLAP_STRENGTH + 0.5
+    high[OBS_BIRD_VELOCITY] = 10.0
+    low[OBS_BIRD_Y] = 2 * low[OBS_BIRD_VELOCITY]
+    high[OBS_BIRD_Y] = screen_height + 2 * high[OBS_BIRD_VELOCITY]
+
+    # Pipes and enemies are spawned at most a full track ahead of the screen
+    # edge and tracked until they have passed the bird
+    farthest = screen_width + PIPE_COUNT * PIPE_SPACING
+    for dx, gap_y, gap_size in ((OBS_PIPE1_DX, OBS_PIPE1_GAP_Y, OBS_PIPE1_GAP_SIZE),
+                                (OBS_PIPE2_DX, OBS_PIPE2_GAP_Y, OBS_PIPE2_GAP_SIZE)):
+        low[dx] = -Pipe.WIDTH - Bird.WIDTH
+        high[dx] = farthest
+        high[gap_y] = high[gap_size] = screen_height
+    low[OBS_ENEMY_DX] = -Enemy.WIDTH
+    high[OBS_ENEMY_DX] = farthest
+    low[OBS_ENEMY_DY] = -high[OBS_BIRD_Y]
+    high[OBS_ENEMY_DY] = screen_height - Enemy.HEIGHT - low[OBS_BIRD_Y]
+
+    # Power-up timers and lives have no fixed ceiling
+    for index in (OBS_INVINCIBLE, OBS_SPEED_BOOST, OBS_LIVES):
+        high[index] = math.inf
+    high[OBS_SHIELD] = 1.0
+    return Box(low, high)
+
+def write_observation(state, obs, offset=0):
+    """Write a compact observation of state into obs starting at offset"""
+    bird = state.bird
+    bird_x = bird.x
+
+    # Find the next two pipes the bird has not cleared yet (read straight
+    # from the track's ring, which keeps them in order)
+    track = state.pipes
+    first = track.next_unscored()
+    second = None
+    if first is not None and track.passed + 1 < len(track.pipes):
+        pipes = track.pipes
+        second = pipes[(track.head + track.passed + 1) % len(pipes)]
+
+    # Find the nearest enemy ahead of the bird
+    nearest = None
+    for enemy in state.enemies:
+        if enemy.x + enemy.width >= bird_x and (nearest is None or enemy.x < nearest.x):
+            nearest = enemy
+
+    obs[offset + OBS_BIRD_Y] = bird.y
+    obs[offset + OBS_BIRD_VELOCITY] = bird.velocity
+    if first is not None:
+        obs[offset + OBS_PIPE1_DX] = first.x - bird_x
+        obs[offset + OBS_PIPE1_GAP_Y] = first.gap_y
+        obs[offset + OBS_PIPE1_GAP_SIZE] = first.gap_size
+    else:
+        obs[offset + OBS_PIPE1_DX] = obs[offset + OBS_PIPE1_GAP_Y] = obs[offset + OBS_PIPE1_GAP_SIZE] = 0.0
+    if second is not None:
+        obs[offset + OBS_PIPE2_DX] = second.x - bird_x
+        obs[offset + OBS_PIPE2_GAP_Y] = second.gap_y
+        obs[offset + OBS_PIPE2_GAP_SIZE] = second.gap_size
+    else:
+        obs[offset + OBS_PIPE2_DX] = obs[offset + OBS_PIPE2_GAP_Y] = obs[offset + OBS_PIPE2_GAP_SIZE] = 0.0
+    if nearest is not None:
+        obs[offset + OBS_ENEMY_DX] = nearest.x - bird_x
+        obs[offset + OBS_ENEMY_DY] = nearest.y - bird.y
+    else:
+        obs[offset + OBS_ENEMY_DX] = obs[offset + OBS_ENEMY_DY] = 0.0
+    obs[offset + OBS_INVINCIBLE] = bird.invincibility_timer if bird.invincible else 0.0
+    obs[offset + OBS_SPEED_BOOST] = bird.speed_boost_timer if bird.speed_boost else 0.0
+    obs[offset + OBS_SHIELD] = 1.0 if bird.has_shield else 0.0
+    obs[offset + OBS_LIVES] = bird.lives
+    return obs
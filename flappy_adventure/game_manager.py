@@ -6,16 +6,48 @@ and coordinates interactions between game objects.
 """
 
 import pygame
-import random
 import os
 import sys
-import math
+import random
+import time
+from collections import deque
 from enum import Enum
 from bird import Bird
 from pipe import Pipe
-from power_up import PowerUp, PowerUpType
 from enemy import Enemy
-from ui import Button, Text
+from power_up import PowerUp, PowerUpType
+from ui import Button, Text, Overlay, BitmapNumber, get_digit_sprites
+from simulation import SimState, step
+from scheduler import Scheduler
+from rewind import RewindBuffer
+from profiler import Profiler
+from renderer import DirtyRectRenderer
+from render_queue import RenderQueue, HUD, POPUP
+from endless import ChunkGenerator, ChunkStream
+import assets
+
+# Files decoded on loader threads while the menu is shown
+PRELOAD_IMAGES = (
+    'background-day.png', 'background-night.png',
+    'yellowbird-upflap.png', 'yellowbird-midflap.png', 'yellowbird-downflap.png',
+    'redbird-upflap.png', 'redbird-midflap.png', 'redbird-downflap.png',
+    'bluebird-upflap.png', 'bluebird-midflap.png', 'bluebird-downflap.png',
+    'pipe-green.png', 'pipe-red.png',
+    *(f'{digit}.png' for digit in range(10)),
+)
+
+# Sound effects by name (the OGG copies are preferred when present)
+SOUND_FILES = {
+    'flap': 'wing.wav',      # Bird flap sound
+    'score': 'point.wav',    # Passing obstacle sound
+    'hit': 'hit.wav',        # Collision sound
+    'power_up': 'swoosh.wav',  # Collecting item sound
+    'level_complete': 'point.wav',  # Level complete sound (higher pitched)
+    'game_over': 'die.wav',  # Game over sound
+}
+
+# Milliseconds of each menu frame spent converting and baking assets
+LOADING_BUDGET_MS = 4
 
 class GameState(Enum):
     """Enum for different game states"""
@@ -28,8 +60,19 @@ class GameState(Enum):
 class GameManager:
     """Manages the overall game state and coordinates game objects"""
     
-    def __init__(self, screen, screen_width, screen_height):
-        """Initialize the game manager"""
+    def __init__(self, screen, screen_width, screen_height, dirty_rects=False, seed=None, recorder=None,
+                 autopilot=None, precise_collisions=False, score_store=None, player='player',
+                 leaderboard=None):
+        """Initialize the game manager
+
+        ``seed`` makes the sequence of runs reproducible, ``recorder``
+        (a replay.ReplayRecorder) logs every run's inputs and ``autopilot``
+        (an autopilot.Autopilot) plays instead of the player.
+        ``precise_collisions`` tests the bird pixel by pixel.
+        ``score_store`` (a score_store.ScoreStore) keeps the score of every
+        finished run under the ``player`` name, and ``leaderboard`` (a
+        leaderboard_client.LeaderboardClient) sends it on with telemetry.
+        """
         self.screen = screen
         self.screen_width = screen_width
         self.screen_height = screen_height
@@ -37,7 +80,12 @@ class GameManager:
         self.current_level = 1
         self.max_levels = 3
         self.score = 0
-        self.high_score = 0
+        
+        # Finished runs are saved to the score store; the HUD shows its cached best
+        self.score_store = score_store
+        self.leaderboard = leaderboard
+        self.player = player
+        self.high_score = score_store.best if score_store is not None else 0
         
         # Initialize pygame mixer for sound
         if not pygame.mixer.get_init():
@@ -49,49 +97,111 @@ class GameManager:
         # Create UI elements
         self.create_ui_elements()
         
+        # Flap input queued for the next simulation step
+        self.flap_requested = False
+        
+        # Seeds of successive runs, and the optional input recorder
+        self.seed_rng = random.Random(seed)
+        self.recorder = recorder
+        
+        # Input source that feeds events to handle_event every step
+        self.autopilot = autopilot
+        
+        # Collision mode of every run
+        self.precise_collisions = precise_collisions
+        
+        # Endless mode (picked on the menu) and the track chunks of its run
+        self.endless = False
+        self.chunk_stream = None
+        
+        # Recent snapshots for rewinding the current run
+        self.rewind_buffer = RewindBuffer()
+        
+        # Per-phase frame timings (F3 shows the overlay, F4 exports a trace)
+        self.profiler = Profiler()
+        
+        # Timed sounds and state changes, driven once per frame by update()
+        self.scheduler = Scheduler()
+        
+        # Blits of the current frame, submitted to the screen in one call
+        self.render_queue = RenderQueue()
+        
+        # Redraw only changed regions instead of the full screen
+        self.dirty_rects = dirty_rects
+        self.renderer = DirtyRectRenderer(screen)
+        
         # Create game objects
         self.reset_game()
         
-        # Set up timers
-        self.enemy_spawn_timer = 0
-        self.power_up_spawn_timer = 0
-        self.enemy_spawn_interval = 5000  # milliseconds
-        self.power_up_spawn_interval = 7000  # milliseconds
-        
     def load_assets(self):
-        """Load all game assets"""
-        # Load backgrounds for different levels
-        self.backgrounds = []
-        bg_files = ['background-day.png', 'background-night.png']
-        
-        for i in range(self.max_levels):
-            bg_file = bg_files[i % len(bg_files)]
-            bg_path = os.path.join('assets', bg_file)
-            
-            if os.path.exists(bg_path):
-                bg = pygame.image.load(bg_path).convert()
-                bg = pygame.transform.scale(bg, (self.screen_width, self.screen_height))
-                self.backgrounds.append(bg)
-            else:
-                self.backgrounds.append(self.create_fallback_background(i + 1))
+        """Start loading the game assets, waiting only for what the menu shows"""
+        # Decode every file on the loader threads while the menu is up
+        assets.preload(PRELOAD_IMAGES, SOUND_FILES.values())
+        
+        # Sound effects stay None until they are loaded (every caller checks)
+        self.sounds = dict.fromkeys(SOUND_FILES)
+        
+        # The menu only needs its own background
+        self.get_background(self.current_level)
+        
+        # Everything else is converted and baked a little every menu frame,
+        # or all at once when a run starts
+        self.loading_steps = deque()
+        for level in range(1, self.max_levels + 1):
+            self.loading_steps.append(lambda level=level: self.get_background(level))
+        
+        # Preload sprites so spawning pipes and enemies never touches the disk
+        self.loading_steps.append(Bird.get_sprites)
+        for level in range(1, self.max_levels + 1):
+            self.loading_steps.append(lambda level=level: Pipe.get_sprites(level))
+            self.loading_steps.append(lambda level=level: Enemy.get_sprites(level))
+        
+        # Bake animation frames so drawing never allocates surfaces
+        for index in range(Bird.FRAME_COUNT):
+            self.loading_steps.append(lambda index=index: Bird.get_invincible_frames(index))
+            self.loading_steps.append(lambda index=index: Bird.get_trail_frames(index))
+        self.loading_steps.append(Bird.get_shield_sprite)
+        self.loading_steps.append(get_digit_sprites)
+        for power_up_type in PowerUpType:
+            self.loading_steps.append(PowerUp(0, 0, power_up_type).get_pulse_frames)
         
         # Load retro Mario-style sound effects
-        self.sounds = {
-            'flap': self.load_sound('wing.wav'),      # Bird flap sound
-            'score': self.load_sound('point.wav'),    # Passing obstacle sound
-            'hit': self.load_sound('hit.wav'),        # Collision sound
-            'power_up': self.load_sound('swoosh.wav'),  # Collecting item sound
-            'level_complete': self.load_sound('point.wav'),  # Level complete sound (higher pitched)
-            'game_over': self.load_sound('die.wav')   # Game over sound
-        }
+        self.loading_steps.append(self.load_sounds)
+        self.loading_total = len(self.loading_steps)
+        
+        # No background music tracks
+    
+    def continue_loading(self, budget_ms=None):
+        """Run loading steps for up to budget_ms milliseconds (None runs them all)"""
+        steps = self.loading_steps
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000.0
+        while steps:
+            steps.popleft()()
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        
+        done = (self.loading_total - len(steps)) * 100 // self.loading_total
+        self.loading_text.update_text(f"Loading {done}%")
+    
+    def get_background(self, level):
+        """Return the background of a level"""
+        bg_files = ['background-day.png', 'background-night.png']
+        return assets.get_image(
+            bg_files[(level - 1) % len(bg_files)], (self.screen_width, self.screen_height),
+            palette=level, alpha=False,
+            fallback=lambda: self.create_fallback_background(level)
+        )
+    
+    def load_sounds(self):
+        """Load the sound effects (waiting for the loader threads if needed)"""
+        for name, filename in SOUND_FILES.items():
+            self.sounds[name] = self.load_sound(filename)
         
         # Adjust volume and pitch for retro feel
         if self.sounds['level_complete']:
             self.sounds['level_complete'].set_volume(0.8)
         if self.sounds['power_up']:
             self.sounds['power_up'].set_volume(0.7)
-        
-        # No background music tracks
     
     def create_fallback_background(self, level):
         """Create a fallback background if the image file doesn't exist"""
@@ -109,12 +219,9 @@ class GameManager:
     
     def load_sound(self, filename):
         """Load a sound file with retro-style adjustments"""
-        path = os.path.join('assets', filename)
-        
         try:
-            if os.path.exists(path):
-                sound = pygame.mixer.Sound(path)
-                
+            sound = assets.get_sound(filename)
+            if sound is not None:
                 # Set appropriate volume for retro Mario-style sounds
                 if 'wing' in filename:  # Flap sound
                     sound.set_volume(0.5)
@@ -142,9 +249,15 @@ class GameManager:
             200, 50, "Start Game", (100, 200, 100)
         )
         
-        self.exit_button = Button(
+        self.endless_button = Button(
             self.screen_width // 2 - 100,
             self.screen_height // 2 + 50,
+            200, 50, "Endless", (200, 170, 60)
+        )
+        
+        self.exit_button = Button(
+            self.screen_width // 2 - 100,
+            self.screen_height // 2 + 125,
             200, 50, "Exit", (200, 100, 100)
         )
         
@@ -165,18 +278,23 @@ class GameManager:
         self.title_text = Text("Flappy Adventure", 48, (255, 255, 255), 
                               self.screen_width // 2, 100)
         
-        self.score_text = Text("Score: 0", 24, (255, 255, 255), 
-                              70, 30)
+        # Shown on the menu until every asset is ready
+        self.loading_text = Text("Loading 0%", 24, (255, 255, 255),
+                                self.screen_width // 2, self.screen_height - 40, glyphs=True)
+        
+        # Score drawn with the digit sprites
+        self.score_number = BitmapNumber(self.screen_width // 2, 50)
         
+        # HUD values are assembled from cached glyphs as they change
         self.high_score_text = Text(f"High Score: {self.high_score}", 24, (255, 255, 255), 
-                                   self.screen_width - 100, 30)
+                                   self.screen_width - 100, 30, glyphs=True)
         
         self.level_text = Text(f"Level: {self.current_level}", 24, (255, 255, 255), 
-                              self.screen_width // 2, 30)
+                              self.screen_width // 2, 30, glyphs=True)
         
         # Lives counter
         self.lives_text = Text("Lives: 1", 24, (255, 255, 255),
-                              70, 60)
+                              70, 60, glyphs=True)
         
         # Shield indicator
         self.shield_text = Text("Shield: None", 24, (255, 255, 255),
@@ -187,50 +305,128 @@ class GameManager:
         
         self.level_complete_text = Text("Level Complete!", 48, (0, 255, 0), 
                                        self.screen_width // 2, self.screen_height // 3)
+        
+        self.final_score_text = Text(f"Final Score: {self.score}", 36, (255, 255, 255), 
+                                    self.screen_width // 2, self.screen_height // 2 - 50)
+        
+        self.level_score_text = Text(f"Level Score: {self.score}", 36, (255, 255, 255), 
+                                    self.screen_width // 2, self.screen_height // 2 - 50)
+        
+        self.next_level_text = Text(f"Press ENTER for Level {self.current_level + 1}", 36, (255, 255, 255), 
+                                   self.screen_width // 2, self.screen_height // 2)
+        
+        self.all_levels_complete_text = Text("You've completed all levels! Press ENTER to restart", 24, (255, 255, 255), 
+                                            self.screen_width // 2, self.screen_height // 2)
+        
+        # Pause screen
+        self.pause_overlay = Overlay(self.screen_width, self.screen_height, (0, 0, 0, 128))
+        
+        self.pause_text = Text("PAUSED", 48, (255, 255, 255), 
+                              self.screen_width // 2, self.screen_height // 2, layer=POPUP)
+        
+        self.pause_instructions_text = Text("Press ESC to resume", 24, (255, 255, 255), 
+                                           self.screen_width // 2, self.screen_height // 2 + 50, layer=POPUP)
     
     def reset_game(self):
         """Reset the game state for a new game"""
-        # Create the player bird
-        self.bird = Bird(100, self.screen_height // 2, self.screen_width, self.screen_height)
-        # Give bird a reference to game manager for sound effects
-        self.bird.game_manager = self
-        
-        # Initialize game object lists
-        self.pipes = []
-        self.power_ups = []
-        self.enemies = []
+        # A run needs every asset; wait for whatever the menu did not finish
+        if self.state != GameState.MENU:
+            self.continue_loading()
         
         # Reset score for new game
         if self.state == GameState.MENU:
             self.score = 0
             self.current_level = 1
         
-        # Set up initial pipes
-        self.spawn_initial_pipes()
+        # Endless runs build their track chunks ahead on a worker thread
+        if self.chunk_stream is not None:
+            self.chunk_stream.close()
+            self.chunk_stream = None
+        seed = self.seed_rng.getrandbits(64)
+        if self.endless:
+            self.chunk_stream = ChunkStream(ChunkGenerator(seed, self.screen_height))
+        
+        # Create the headless gameplay state (bird, pipes, enemies, power-ups)
+        self.sim = SimState(self.screen_width, self.screen_height, self.current_level, self.score,
+                            seed, self.precise_collisions, self.endless, self.chunk_stream)
+        self.current_level = self.sim.level
+        if self.recorder is not None:
+            self.recorder.begin(self.sim)
+        self.rewind_buffer.clear()
+        # Give bird a reference to game manager for sound effects
+        self.bird.game_manager = self
+        self.flap_requested = False
         
-        # Reset timers
-        self.enemy_spawn_timer = pygame.time.get_ticks()
-        self.power_up_spawn_timer = pygame.time.get_ticks()
+        # Drop sounds and transitions left over from the previous run
+        self.scheduler.clear()
         
         # Start music for current level
         self.play_level_music()
     
+    def start_run(self, endless):
+        """Start a new game from the menu (level 1, or an endless run)"""
+        self.endless = endless
+        self.score = 0
+        self.current_level = 1
+        self.state = GameState.PLAYING
+        self.reset_game()
+    
+    @property
+    def bird(self):
+        """The player bird of the current run"""
+        return self.sim.bird
+    
+    @property
+    def pipes(self):
+        """Pipes of the current run"""
+        return self.sim.pipes
+    
+    @property
+    def power_ups(self):
+        """Power-ups of the current run"""
+        return self.sim.power_ups
+    
+    @property
+    def enemies(self):
+        """Enemies of the current run"""
+        return self.sim.enemies
+    
+    def snapshot(self):
+        """Return the complete gameplay state as a compact bytes object"""
+        return self.sim.snapshot()
+    
+    def restore(self, data):
+        """Return the current run to a state saved by snapshot()"""
+        # The recording cannot follow a jump back in time (it ends where the run was)
+        if self.recorder is not None:
+            self.recorder.finish()
+        
+        self.sim.restore(data)
+        self.score = self.sim.score
+        self.flap_requested = False
+        self.lives_text.update_text(f"Lives: {self.bird.lives}")
+    
+    def rewind(self):
+        """Wind the current run back a few seconds"""
+        data = self.rewind_buffer.rewind(self.sim.ticks)
+        if data is not None:
+            self.restore(data)
+    
     def play_level_music(self):
         """Initialize sound effects for the level (no background music)"""
         # No background music, just make sure mixer is initialized
         if not pygame.mixer.get_init():
             pygame.mixer.init()
     
-    def spawn_initial_pipes(self):
-        """Spawn the initial set of pipes"""
-        pipe_spacing = 300  # Horizontal space between pipes
-        for i in range(3):  # Start with 3 pipes
-            x_pos = self.screen_width + (i * pipe_spacing)
-            self.pipes.append(Pipe(x_pos, self.screen_width, self.screen_height, self.current_level))
-    
     def handle_event(self, event):
         """Handle pygame events"""
         if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                self.profiler.toggle()
+                self.renderer.invalidate()
+            elif event.key == pygame.K_F4:
+                self.profiler.export_chrome_trace(time.strftime('trace-%Y%m%d-%H%M%S.json'))
+            
             if event.key == pygame.K_ESCAPE:
                 if self.state == GameState.PLAYING:
                     self.state = GameState.PAUSED
@@ -239,8 +435,7 @@ class GameManager:
             
             if event.key == pygame.K_RETURN:
                 if self.state == GameState.MENU:
-                    self.state = GameState.PLAYING
-                    self.reset_game()
+                    self.start_run(endless=False)
                 elif self.state == GameState.GAME_OVER:
                     self.state = GameState.MENU
                 elif self.state == GameState.LEVEL_COMPLETE:
@@ -250,26 +445,27 @@ class GameManager:
                     self.state = GameState.PLAYING
                     self.reset_game()
             
-            # Bird flap controls
+            # Bird flap controls (applied on the next simulation step)
             if self.state == GameState.PLAYING:
                 if event.key in (pygame.K_SPACE, pygame.K_UP):
-                    self.bird.flap()
-                    if self.sounds['flap']:
-                        self.sounds['flap'].play()
+                    self.flap_requested = True
+                
+                # Rewind for practice (only while the run is still going)
+                elif event.key == pygame.K_r and not self.sim.done:
+                    self.rewind()
         
         # Mouse controls
         if event.type == pygame.MOUSEBUTTONDOWN:
             mouse_pos = pygame.mouse.get_pos()
             
             if self.state == GameState.PLAYING:
-                self.bird.flap()
-                if self.sounds['flap']:
-                    self.sounds['flap'].play()
+                self.flap_requested = True
             
             elif self.state == GameState.MENU:
                 if self.start_button.is_clicked(mouse_pos):
-                    self.state = GameState.PLAYING
-                    self.reset_game()
+                    self.start_run(endless=False)
+                elif self.endless_button.is_clicked(mouse_pos):
+                    self.start_run(endless=True)
                 elif self.exit_button.is_clicked(mouse_pos):
                     pygame.quit()
                     sys.exit()
@@ -282,194 +478,120 @@ class GameManager:
                 elif self.menu_button.is_clicked(mouse_pos):
                     self.state = GameState.MENU
     
-    def update(self):
-        """Update game state"""
+    def update(self, dt=1.0):
+        """Update game state by dt ticks (1.0 is one frame at 60 FPS)"""
+        profiler = self.profiler
+        
+        # Run sounds and state changes that are due this frame
+        self.scheduler.update(pygame.time.get_ticks())
+        
         if self.state == GameState.PLAYING:
-            # Update bird
-            self.bird.update()
-            
-            # Update pipes
-            for pipe in self.pipes[:]:
-                pipe.update()
-                
-                # Check if pipe is passed
-                if not pipe.scored and pipe.x + pipe.width < self.bird.x:
-                    self.score += 1
-                    pipe.scored = True
-                    # Play score sound
-                    if self.sounds['score']:
-                        self.sounds['score'].play()
-                    # Update score display
-                    self.score_text.update_text(f"Score: {self.score}")
-                
-                # Remove pipes that are off screen
-                if pipe.x + pipe.width < 0:
-                    self.pipes.remove(pipe)
-                    # Add a new pipe
-                    new_x = max([p.x for p in self.pipes]) + 300
-                    self.pipes.append(Pipe(new_x, self.screen_width, self.screen_height, self.current_level))
-            
-            # Update power-ups
-            for power_up in self.power_ups[:]:
-                power_up.update()
-                
-                # Check for collision with bird
-                if power_up.collides_with(self.bird):
-                    self.apply_power_up(power_up)
-                    self.power_ups.remove(power_up)
-                    if self.sounds['power_up']:
-                        self.sounds['power_up'].play()
-                
-                # Remove power-ups that are off screen
-                if power_up.x + power_up.width < 0:
-                    self.power_ups.remove(power_up)
-            
-            # Update enemies
-            for enemy in self.enemies[:]:
-                enemy.update()
-                
-                # Check for collision with bird
-                if enemy.collides_with(self.bird) and not self.bird.invincible:
-                    self.game_over()
-                
-                # Remove enemies that are off screen
-                if enemy.x + enemy.width < 0:
-                    self.enemies.remove(enemy)
-            
-            # Check for collisions with pipes
-            for pipe in self.pipes:
-                if pipe.collides_with(self.bird) and not self.bird.invincible:
-                    self.game_over()
-            
-            # Check if bird is out of bounds
-            if self.bird.y < 0 or self.bird.y > self.screen_height:
+            # Let the autopilot press keys like a player would
+            if self.autopilot is not None:
+                for event in self.autopilot.get_events(self.sim, dt):
+                    self.handle_event(event)
+            
+            # Advance the gameplay simulation
+            action = 1 if self.flap_requested else 0
+            if self.recorder is not None:
+                self.recorder.record(action, dt)
+            profiler.lap('events')
+            step(self.sim, action, dt, profiler)
+            self.flap_requested = False
+            self.score = self.sim.score
+            
+            # React to what happened during the step
+            self.handle_sim_events()
+            self.rewind_buffer.record(self.sim)
+            
+            # Update UI text (endless runs borrow the look of the levels as they go)
+            self.score_number.update_value(self.score)
+            if self.endless:
+                self.current_level = self.sim.level
+                self.level_text.update_text("Endless")
+            else:
+                self.level_text.update_text(f"Level: {self.current_level}")
+        profiler.lap('game')
+    
+    def handle_sim_events(self):
+        """Play sounds and switch game states for simulation events"""
+        for event in self.sim.events:
+            if event == 'score':
+                # Play score sound
+                if self.sounds['score']:
+                    self.sounds['score'].play()
+            elif event == 'power_up':
+                # Slight delay for better feedback
+                self.scheduler.play(self.sounds['power_up'], 50)
+            elif event == 'shield':
+                if self.sounds['power_up']:
+                    self.sounds['power_up'].play()
+            elif event == 'extra_life':
+                self.apply_extra_life()
+            elif event == 'life_lost':
+                self.lives_text.update_text(f"Lives: {self.bird.lives}")
+                # Play hit sound
+                if self.sounds['hit']:
+                    self.sounds['hit'].play()
+            elif event == 'game_over':
                 self.game_over()
-            
-            # Spawn enemies and power-ups
-            self.spawn_enemies()
-            self.spawn_power_ups()
-            
-            # Check for level completion
-            if self.score >= 10 * self.current_level:
+            elif event == 'level_complete':
                 self.complete_level()
-            
-            # Update UI text
-            self.score_text.update_text(f"Score: {self.score}")
-            self.level_text.update_text(f"Level: {self.current_level}")
-            self.high_score_text.update_text(f"High Score: {self.high_score}")
-    
-    def spawn_enemies(self):
-        """Spawn enemy birds periodically"""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.enemy_spawn_timer > self.enemy_spawn_interval:
-            # Adjust spawn rate based on level
-            spawn_chance = 0.3 * self.current_level
-            if random.random() < spawn_chance:
-                y_pos = random.randint(100, self.screen_height - 100)
-                self.enemies.append(Enemy(self.screen_width, y_pos, self.screen_width, self.screen_height, self.current_level))
-            self.enemy_spawn_timer = current_time
+        self.sim.events.clear()
     
-    def spawn_power_ups(self):
-        """Spawn power-ups periodically"""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.power_up_spawn_timer > self.power_up_spawn_interval:
-            # Adjust spawn rate based on level
-            spawn_chance = 0.4 - (0.05 * self.current_level)  # Less power-ups in higher levels
-            if random.random() < spawn_chance:
-                y_pos = random.randint(100, self.screen_height - 100)
-                
-                # Choose a power-up type with weighted probabilities
-                # Hearts are rarer than other power-ups
-                weights = [0.4, 0.4, 0.2]  # Speed, Shield, Heart
-                power_up_types = list(PowerUpType)
-                
-                # Choose based on weights
-                rand = random.random()
-                cumulative = 0
-                chosen_type = power_up_types[0]
-                
-                for i, weight in enumerate(weights):
-                    cumulative += weight
-                    if rand <= cumulative:
-                        chosen_type = power_up_types[i]
-                        break
-                
-                self.power_ups.append(PowerUp(self.screen_width, y_pos, chosen_type))
-            self.power_up_spawn_timer = current_time
-    
-    def apply_power_up(self, power_up):
-        """Apply the effect of a power-up with retro sound effect"""
-        # Play power-up sound with retro feel
-        if self.sounds['power_up']:
-            # Play the sound effect with slight delay for better feedback
-            pygame.time.delay(50)
-            self.sounds['power_up'].play()
-            
-        if power_up.type == PowerUpType.SPEED:
-            self.bird.apply_speed_boost()
-            # Lightning allows passing through obstacles temporarily
-            self.bird.apply_invincibility()
-        elif power_up.type == PowerUpType.INVINCIBILITY:
-            # Shield protects from one hit
-            self.bird.has_shield = True
-        elif power_up.type == PowerUpType.EXTRA_LIFE:
-            # Heart grants +1 life
-            self.bird.lives += 1
-            # Show life count on screen
-            self.lives_text.update_text(f"Lives: {self.bird.lives}")
-            # Play score sound for extra life
-            if self.sounds['score']:
-                pygame.time.delay(100)  # Small delay for better audio feedback
-                self.sounds['score'].play()
+    def apply_extra_life(self):
+        """Show the extra life gained from a heart power-up"""
+        # Show life count on screen
+        self.lives_text.update_text(f"Lives: {self.bird.lives}")
+        # Play score sound for extra life (small delay for better audio feedback)
+        self.scheduler.play(self.sounds['score'], 100)
     
     def game_over(self):
         """Handle game over state with retro sound effects"""
-        # Check if player has shield
-        if self.bird.has_shield:
-            # Use shield to prevent death
-            self.bird.has_shield = False
-            if self.sounds['power_up']:
-                self.sounds['power_up'].play()
-            return
-            
-        # Check if player has extra lives
-        if self.bird.lives > 1:
-            # Use a life and continue playing
-            self.bird.lives -= 1
-            self.lives_text.update_text(f"Lives: {self.bird.lives}")
-            
-            # Reset bird position but keep the game going
-            self.bird.y = self.screen_height // 2
-            self.bird.velocity = 0
-            
-            # Play hit sound
-            if self.sounds['hit']:
-                self.sounds['hit'].play()
-            
-            return
-            
         # No lives left, game over
+        # The simulation is frozen while the sounds play; the loop keeps running
         # Play hit sound first (collision)
-        if self.sounds['hit']:
-            self.sounds['hit'].play()
-            
+        self.scheduler.play(self.sounds['hit'])
+        
         # Wait a short moment before playing game over sound (classic retro timing)
-        pygame.time.delay(700)
+        delay = 700
         
         # Play game over sound with retro feel
-        if self.sounds['game_over']:
-            self.sounds['game_over'].play()
+        self.scheduler.play(self.sounds['game_over'], delay)
         
         # Update high score
-        if self.score > self.high_score:
-            self.high_score = self.score
-            self.high_score_text.update_text(f"High Score: {self.high_score}")
-            
+        if self.record_score():
             # Play score sound for new high score
             if self.sounds['score']:
-                pygame.time.delay(1000)  # Wait for game over sound to finish
-                self.sounds['score'].play()
+                delay += 1000  # Wait for game over sound to finish
+                self.scheduler.play(self.sounds['score'], delay)
         
+        # Show the game over screen once the sequence has played
+        self.scheduler.schedule(delay, self.show_game_over)
+    
+    def record_score(self):
+        """Save the finished run's score and return whether it is a new high score"""
+        sim = self.sim
+        if self.score_store is not None:
+            self.score_store.submit(self.player, self.score, self.current_level, self.endless, sim.seed)
+        if self.leaderboard is not None:
+            # Queued only; the client's thread does the network work
+            average_ms, worst_ms, _ = self.profiler.get_breakdown()
+            self.leaderboard.submit(
+                {'player': self.player, 'score': self.score, 'level': self.current_level,
+                 'endless': self.endless, 'seed': sim.seed},
+                {'player': self.player, 'seed': sim.seed, 'ticks': sim.ticks,
+                 'precise_collisions': sim.precise_collisions,
+                 'frame_ms': round(average_ms, 3), 'worst_frame_ms': round(worst_ms, 3)}
+            )
+        if self.score <= self.high_score:
+            return False
+        self.high_score = self.score
+        self.high_score_text.update_text(f"High Score: {self.high_score}")
+        return True
+    
+    def show_game_over(self):
+        """Switch to the game over screen"""
         self.state = GameState.GAME_OVER
     
     def complete_level(self):
@@ -478,85 +600,135 @@ class GameManager:
         if self.sounds['level_complete']:
             self.sounds['level_complete'].play()
         
+        # Clearing the last level finishes the run
+        if self.current_level >= self.max_levels:
+            self.record_score()
+        
         self.state = GameState.LEVEL_COMPLETE
     
-    def draw(self):
-        """Draw the game state"""
-        # Draw background based on current level
-        self.screen.blit(self.backgrounds[self.current_level - 1], (0, 0))
-        
+    def get_drawables(self):
+        """Return everything visible in the current state, in drawing order"""
+        return self.get_entities() + self.get_interface()
+    
+    def get_entities(self):
+        """Return the game objects visible in the current state"""
+        if self.state == GameState.PLAYING or self.state == GameState.PAUSED:
+            drawables = list(self.pipes)
+            drawables.extend(self.power_ups)
+            drawables.extend(self.enemies)
+            drawables.append(self.bird)
+            return drawables
+        return []
+    
+    def get_interface(self):
+        """Return the HUD, menus and overlays visible in the current state"""
         if self.state == GameState.MENU:
-            # Draw menu
-            self.title_text.draw(self.screen)
-            self.start_button.draw(self.screen)
-            self.exit_button.draw(self.screen)
-            self.high_score_text.draw(self.screen)
-        
-        elif self.state == GameState.PLAYING or self.state == GameState.PAUSED:
-            # Draw game objects
-            for pipe in self.pipes:
-                pipe.draw(self.screen)
-            
-            for power_up in self.power_ups:
-                power_up.draw(self.screen)
-            
-            for enemy in self.enemies:
-                enemy.draw(self.screen)
-            
-            self.bird.draw(self.screen)
-            
-            # Draw UI
-            self.score_text.draw(self.screen)
-            self.high_score_text.draw(self.screen)
-            self.level_text.draw(self.screen)
-            self.lives_text.draw(self.screen)
-            
+            # Menu
+            self.start_button.update(pygame.mouse.get_pos())
+            self.endless_button.update(pygame.mouse.get_pos())
+            self.exit_button.update(pygame.mouse.get_pos())
+            drawables = [self.title_text, self.start_button, self.endless_button, self.exit_button,
+                         self.high_score_text]
+            if self.loading_steps:
+                drawables.append(self.loading_text)
+            return drawables
+        
+        if self.state == GameState.PLAYING or self.state == GameState.PAUSED:
             # Update shield text
             shield_status = "Active" if self.bird.has_shield else "None"
             self.shield_text.update_text(f"Shield: {shield_status}")
-            self.shield_text.draw(self.screen)
-            
-            # Draw pause overlay
-            if self.state == GameState.PAUSED:
-                # Semi-transparent overlay
-                overlay = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 128))
-                self.screen.blit(overlay, (0, 0))
-                
-                # Pause text
-                pause_text = Text("PAUSED", 48, (255, 255, 255), 
-                                 self.screen_width // 2, self.screen_height // 2)
-                pause_text.draw(self.screen)
-                
-                # Instructions
-                instructions = Text("Press ESC to resume", 24, (255, 255, 255), 
-                                   self.screen_width // 2, self.screen_height // 2 + 50)
-                instructions.draw(self.screen)
-        
-        elif self.state == GameState.GAME_OVER:
-            # Draw game over screen
-            self.game_over_text.draw(self.screen)
-            
-            final_score = Text(f"Final Score: {self.score}", 36, (255, 255, 255), 
-                              self.screen_width // 2, self.screen_height // 2 - 50)
-            final_score.draw(self.screen)
             
-            self.restart_button.draw(self.screen)
-            self.menu_button.draw(self.screen)
-        
-        elif self.state == GameState.LEVEL_COMPLETE:
-            # Draw level complete screen
-            self.level_complete_text.draw(self.screen)
+            # UI
+            drawables = [self.score_number, self.high_score_text, self.level_text,
+                         self.lives_text, self.shield_text]
             
+            # Pause overlay
+            if self.state == GameState.PAUSED:
+                drawables.extend((self.pause_overlay, self.pause_text, self.pause_instructions_text))
+            return drawables
+        
+        if self.state == GameState.GAME_OVER:
+            # Game over screen
+            self.final_score_text.update_text(f"Final Score: {self.score}")
+            self.restart_button.update(pygame.mouse.get_pos())
+            self.menu_button.update(pygame.mouse.get_pos())
+            return [self.game_over_text, self.final_score_text, self.restart_button, self.menu_button]
+        
+        if self.state == GameState.LEVEL_COMPLETE:
+            # Level complete screen
             if self.current_level < self.max_levels:
-                next_level = Text(f"Press ENTER for Level {self.current_level + 1}", 36, (255, 255, 255), 
-                                 self.screen_width // 2, self.screen_height // 2)
+                self.next_level_text.update_text(f"Press ENTER for Level {self.current_level + 1}")
+                next_level = self.next_level_text
             else:
-                next_level = Text("You've completed all levels! Press ENTER to restart", 24, (255, 255, 255), 
-                                 self.screen_width // 2, self.screen_height // 2)
-            
-            next_level.draw(self.screen)
-            
-            level_score = Text(f"Level Score: {self.score}", 36, (255, 255, 255), 
-                              self.screen_width // 2, self.screen_height // 2 - 50)
-            level_score.draw(self.screen)
\ No newline at end of file
+                next_level = self.all_levels_complete_text
+            self.level_score_text.update_text(f"Level Score: {self.score}")
+            return [self.level_complete_text, next_level, self.level_score_text]
+        
+        return []
+    
+    def draw(self, alpha=1.0):
+        """Draw the game state
+
+        ``alpha`` places moving objects between the previous logic tick (0.0)
+        and the current one (1.0) for smooth rendering. Returns the list of changed rects in dirty-rect mode, or None when
+        the whole screen was redrawn and should be flipped.
+        """
+        profiler = self.profiler
+        
+        # Load assets in the background of the menu (once per rendered frame,
+        # however many logic updates the frame ran)
+        if self.loading_steps and self.state == GameState.MENU:
+            self.continue_loading(LOADING_BUDGET_MS)
+            profiler.lap('loading')
+        
+        # Background based on current level
+        background = self.get_background(self.current_level)
+        
+        # Interpolate positions while the game is moving; frozen scenes show the current tick
+        if self.state == GameState.PLAYING or self.state == GameState.PAUSED:
+            if self.state == GameState.PAUSED or self.sim.done:
+                alpha = 1.0
+            for entity in self.pipes:
+                entity.interpolate(alpha)
+            for entity in self.power_ups:
+                entity.interpolate(alpha)
+            for entity in self.enemies:
+                entity.interpolate(alpha)
+            self.bird.interpolate(alpha)
+        
+        # Collect the frame's blits, sorted into layers as they are queued.
+        # Game objects fill the layers below HUD and the interface the rest,
+        # so each group is timed on its own and, on full redraws, drawn with
+        # its own blits call
+        queue = self.render_queue
+        queue.clear()
+        full_redraw = not self.dirty_rects
+        if full_redraw:
+            self.screen.blit(background, (0, 0))
+            profiler.lap('background')
+        
+        for drawable in self.get_entities():
+            drawable.enqueue(queue)
+        if full_redraw:
+            queue.submit(self.screen, 0, HUD)
+        profiler.lap('entities')
+        
+        for drawable in self.get_interface():
+            drawable.enqueue(queue)
+        if full_redraw:
+            queue.submit(self.screen, HUD)
+        profiler.lap('hud')
+        
+        if full_redraw:
+            dirty = None
+        else:
+            dirty = self.renderer.render(background, queue, (self.state, self.current_level))
+            profiler.lap('render')
+        
+        # Profiler overlay on top of everything (it changes every frame)
+        if profiler.visible:
+            rect = profiler.draw(self.screen)
+            if dirty is not None:
+                dirty.append(rect)
+            profiler.lap('profiler')
+        return dirty
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Leaderboard client module for Flappy Adventure
+
+This module sends finished runs and their telemetry to the leaderboard
+service (see leaderboard_server.py). submit() only queues a record. A
+background thread keeps one HTTP connection open to the server, merges
+everything queued since the last request into a single batch, and
+retries failed batches (server unreachable or answering 5xx) with
+exponential backoff. A slow or unreachable server therefore never holds
+up a frame; the local score store still has every run if the
+leaderboard never sees it.
+
+Usage:
+    python leaderboard_client.py 127.0.0.1:8765 -k 10   # Show the leaderboard
+"""
+
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+# Seconds to wait for the server to answer one request
+TIMEOUT = 5.0
+
+# Retry delays double from the first to the last (with random jitter)
+BACKOFF_START = 0.5
+BACKOFF_MAX = 30.0
+
+# Records kept while the server is unreachable (the oldest are dropped)
+MAX_PENDING = 1000
+
+# Most runs sent in one request
+MAX_BATCH = 100
+
+# Seconds close() waits for queued records to be sent
+CLOSE_TIMEOUT = 2.0
+
+def parse_address(address):
+    """Return (host, port) from a 'host:port' string"""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+class LeaderboardClient:
+    """Queues runs and telemetry and delivers them on a background thread"""
+
+    def __init__(self, host, port, timeout=TIMEOUT):
+        """Initialize the client and start its sender thread"""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connection = None  # Persistent connection, owned by the sender thread
+
+        # Records waiting for the next batch
+        self.runs = deque(maxlen=MAX_PENDING)
+        self.telemetry = deque(maxlen=MAX_PENDING)
+        self.condition = threading.Condition()
+        self.closed = False
+
+        # Delivery statistics
+        self.sent_batches = 0
+        self.sent_runs = 0
+        self.failures = 0
+
+        self.thread = threading.Thread(target=self.send_loop, name='leaderboard-sender', daemon=True)
+        self.thread.start()
+
+    def submit(self, run, telemetry=None):
+        """Queue a finished run (and optional telemetry record) for sending"""
+        with self.condition:
+            self.runs.append(run)
+            if telemetry is not None:
+                self.telemetry.append(telemetry)
+            self.condition.notify()
+
+    def take_batch(self):
+        """Remove up to MAX_BATCH queued runs plus the queued telemetry and return them as a batch"""
+        runs = [self.runs.popleft() for _ in range(min(MAX_BATCH, len(self.runs)))]
+        telemetry = list(self.telemetry)
+        self.telemetry.clear()
+        return {'id': uuid.uuid4().hex, 'runs': runs, 'telemetry': telemetry}
+
+    def send_loop(self):
+        """Send queued records as batches until the client is closed"""
+        condition = self.condition
+        while True:
+            with condition:
+                while not self.closed and not self.runs and not self.telemetry:
+                    condition.wait()
+                if not self.runs and not self.telemetry:
+                    break
+                batch = self.take_batch()
+
+            # Retry the same batch (same id, so the server stores it once)
+            delay = BACKOFF_START
+            while not self.send(batch):
+                self.failures += 1
+                with condition:
+                    if condition.wait_for(lambda: self.closed, delay * random.uniform(0.5, 1.0)):
+                        # Closed while the server is down: give up on the rest
+                        self.disconnect()
+                        return
+                delay = min(BACKOFF_MAX, delay * 2)
+        self.disconnect()
+
+    def send(self, batch):
+        """POST one batch on the persistent connection and return whether it was delivered"""
+        body = json.dumps(batch).encode()
+        response = self.post(body)
+        if response is None:
+            return False
+        if response.status >= 500:
+            # The server could not store it; retry later
+            return False
+        if response.status != 200:
+            # A rejected batch would be rejected again; drop it
+            print(f"Leaderboard rejected {len(batch['runs'])} runs ({response.status})", file=sys.stderr)
+            return True
+        self.sent_batches += 1
+        self.sent_runs += len(batch['runs'])
+        return True
+
+    def post(self, body):
+        """POST a body to /runs and return the read response, or None on a connection error"""
+        # A kept-alive connection the server has since closed only fails on
+        # use, so a reused connection gets one retry on a fresh one
+        for _ in range(2):
+            reused = self.connection is not None
+            try:
+                if self.connection is None:
+                    self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                self.connection.request('POST', '/runs', body, {'Content-Type': 'application/json'})
+                response = self.connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                self.disconnect()
+                if not reused:
+                    return None
+                continue
+            if response.getheader('Connection', '').lower() == 'close':
+                self.disconnect()
+            return response
+        return None
+
+    def disconnect(self):
+        """Close the persistent connection"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Send what is queued (waiting at most timeout seconds) and stop the sender"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join(timeout)
+
+    def fetch_top(self, k=10, mode=None):
+        """Return the server's leaderboard as a list of dicts (blocking; not for the game loop)"""
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            path = f'/top?k={k}' + (f'&mode={mode}' if mode else '')
+            connection.request('GET', path)
+            response = connection.getresponse()
+            data = json.loads(response.read())
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise ValueError(data.get('error', f"status {response.status}"))
+        return data['top']
+
+def main(argv=None):
+    """Print the leaderboard of a running server"""
+    parser = argparse.ArgumentParser(description="Show the Flappy Adventure leaderboard")
+    parser.add_argument('address', help="server as host:port")
+    parser.add_argument('-k', type=int, default=10, help="number of runs")
+    parser.add_argument('--mode', choices=('endless', 'campaign'))
+    args = parser.parse_args(argv)
+
+    client = LeaderboardClient(*parse_address(args.address))
+    try:
+        for rank, run in enumerate(client.fetch_top(args.k, args.mode), 1):
+            mode = "endless" if run['endless'] else f"level {run['level']}"
+            date = time.strftime('%Y-%m-%d %H:%M', time.localtime(run['created']))
+            print(f"{rank:>3}. {run['player']:<16} {run['score']:>6}  {mode:<8} {date}")
+    finally:
+        client.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
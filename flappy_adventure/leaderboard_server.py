@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Leaderboard server module for Flappy Adventure
+
+This module is a small asyncio HTTP/1.1 service that collects runs and
+telemetry from game cabinets and serves the leaderboard. It keeps
+connections alive between requests and stores runs in a score_store
+database. Top-K responses are encoded once and served from a cache until
+new runs arrive. It runs locally as a stand-in for the central service.
+
+Endpoints:
+    POST /runs     {"id": ..., "runs": [...], "telemetry": [...]}
+                   Store a batch; acknowledged once the runs are written,
+                   answered 503 (retry later) when the write failed.
+                   A retried batch id is acknowledged without storing twice.
+    GET  /top      ?k=10&mode=endless|campaign  The best runs as JSON
+    GET  /health   Run count and cache statistics
+
+Usage:
+    python leaderboard_server.py --port 8765 --db leaderboard.db
+    python leaderboard_server.py --delay 500   # Answer like a slow server
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+from score_store import ScoreStore
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_DB = 'leaderboard.db'
+
+# Largest leaderboard served and largest request body accepted
+MAX_TOP = 100
+MAX_BODY = 1 << 20
+
+# Seconds an idle connection is kept open
+IDLE_TIMEOUT = 60.0
+
+# Batch ids remembered for acknowledging retries
+RECENT_BATCHES = 1024
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+    503: 'Service Unavailable',
+}
+
+class HttpError(Exception):
+    """Request that is answered with an error status"""
+
+    def __init__(self, status, message):
+        """Initialize the error"""
+        super().__init__(message)
+        self.status = status
+
+class LeaderboardServer:
+    """Accepts run batches and serves cached leaderboards"""
+
+    def __init__(self, store, telemetry_path=None, delay=0.0):
+        """Initialize the service around a ScoreStore
+
+        Telemetry records are appended to ``telemetry_path`` as JSON
+        lines when it is given. ``delay`` seconds are waited before every
+        response, to try clients against a slow server.
+        """
+        self.store = store
+        self.telemetry_file = open(telemetry_path, 'a') if telemetry_path else None
+        self.delay = delay
+
+        # Encoded /top bodies by (k, mode), dropped whenever runs are added
+        self.top_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Recently stored batch ids, oldest first
+        self.recent = deque()
+        self.recent_ids = set()
+        # Write futures of the batches being stored, by id
+        self.writing = {}
+
+        self.batches = 0
+        self.telemetry_records = 0
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                keep_alive = await self.handle_request(request_line, reader, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request_line, reader, writer):
+        """Read one request, write its response and return whether to keep the connection"""
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = headers.get('connection', '').lower() != 'close'
+
+        try:
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3:
+                raise HttpError(400, "malformed request line")
+            method, target, _ = parts
+            try:
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                keep_alive = False  # (the body cannot be skipped)
+                raise HttpError(400, "bad Content-Length")
+            if length > MAX_BODY:
+                keep_alive = False  # (the body is not read)
+                raise HttpError(413, "request body too large")
+            body = await reader.readexactly(length) if length else b''
+            status, payload = 200, await self.dispatch(method, target, body)
+        except HttpError as error:
+            status, payload = error.status, json.dumps({'error': str(error)}).encode()
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            # (bad numbers, missing fields, or JSON of the wrong shape)
+            status, payload = 400, json.dumps({'error': f"bad request: {error!r}"}).encode()
+
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + payload
+        )
+        await writer.drain()
+        return keep_alive
+
+    async def dispatch(self, method, target, body):
+        """Return the response body of a request"""
+        url = urlsplit(target)
+        if url.path == '/runs':
+            if method != 'POST':
+                raise HttpError(405, "use POST")
+            return await self.add_batch(json.loads(body))
+        if url.path == '/top':
+            if method != 'GET':
+                raise HttpError(405, "use GET")
+            query = parse_qs(url.query)
+            k = min(MAX_TOP, max(1, int(query.get('k', ['10'])[0])))
+            mode = query.get('mode', [''])[0]
+            if mode not in ('', 'endless', 'campaign'):
+                raise HttpError(400, "mode is endless or campaign")
+            return self.get_top(k, mode)
+        if url.path == '/health':
+            return json.dumps({
+                'runs': len(self.store), 'batches': self.batches, 'telemetry': self.telemetry_records,
+                'cache_hits': self.cache_hits, 'cache_misses': self.cache_misses,
+            }).encode()
+        raise HttpError(404, "no such endpoint")
+
+    async def add_batch(self, batch):
+        """Store a batch of runs and telemetry and return the acknowledgement"""
+        batch_id = batch.get('id')
+        runs = batch.get('runs', [])
+        if batch_id is not None and batch_id in self.recent_ids:
+            return json.dumps({'accepted': len(runs), 'duplicate': True}).encode()
+
+        # Check every run before storing any of them
+        rows = [
+            (str(run['player']), int(run['score']), int(run.get('level', 1)),
+             bool(run.get('endless', False)), int(run.get('seed', 0)))
+            for run in runs
+        ]
+        telemetry = batch.get('telemetry', [])
+
+        # A retry arriving while the batch is still being written waits for that write
+        writing = self.writing.get(batch_id) if batch_id is not None else None
+        if writing is not None:
+            try:
+                await asyncio.wrap_future(writing)
+            except sqlite3.Error as error:
+                raise HttpError(503, f"could not store runs: {error}")
+            return json.dumps({'accepted': len(runs), 'duplicate': True}).encode()
+
+        # Acknowledge only once the runs are on disk, and remember the id
+        # only then, so a failed batch is stored when the client retries it
+        if rows:
+            future = self.store.submit_batch(rows)
+            if batch_id is not None:
+                self.writing[batch_id] = future
+            try:
+                await asyncio.wrap_future(future)
+            except sqlite3.Error as error:
+                raise HttpError(503, f"could not store runs: {error}")
+            finally:
+                self.writing.pop(batch_id, None)
+            self.top_cache.clear()
+        if batch_id is not None:
+            self.recent.append(batch_id)
+            self.recent_ids.add(batch_id)
+            if len(self.recent) > RECENT_BATCHES:
+                self.recent_ids.discard(self.recent.popleft())
+
+        if telemetry and self.telemetry_file is not None:
+            self.telemetry_file.write(''.join(json.dumps(record) + '\n' for record in telemetry))
+            self.telemetry_file.flush()
+        self.telemetry_records += len(telemetry)
+        self.batches += 1
+        return json.dumps({'accepted': len(runs)}).encode()
+
+    def get_top(self, k, mode):
+        """Return the encoded leaderboard, from the cache when runs have not changed"""
+        key = (k, mode)
+        body = self.top_cache.get(key)
+        if body is not None:
+            self.cache_hits += 1
+            return body
+        self.cache_misses += 1
+        endless = None if not mode else mode == 'endless'
+        body = json.dumps({'top': [
+            {'player': player, 'score': score, 'level': level, 'endless': endless, 'created': created}
+            for player, score, level, endless, created in self.store.top(k, endless)
+        ]}).encode()
+        self.top_cache[key] = body
+        return body
+
+    def close(self):
+        """Close the telemetry file"""
+        if self.telemetry_file is not None:
+            self.telemetry_file.close()
+
+async def serve(server, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Serve until cancelled"""
+    listener = await asyncio.start_server(server.handle_connection, host, port)
+    print(f"Leaderboard listening on {host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+def main(argv=None):
+    """Run the leaderboard service"""
+    parser = argparse.ArgumentParser(description="Flappy Adventure leaderboard service")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--db', default=DEFAULT_DB, help="score database (default: %(default)s)")
+    parser.add_argument('--telemetry', metavar='PATH', help="append telemetry records to PATH as JSON lines")
+    parser.add_argument('--delay', type=float, default=0.0, metavar='MS', help="wait before every response")
+    args = parser.parse_args(argv)
+
+    store = ScoreStore(args.db)
+    server = LeaderboardServer(store, args.telemetry, args.delay / 1000.0)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
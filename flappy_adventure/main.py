@@ -4,6 +4,7 @@
 
 This game features:
 - Multiple levels with increasing difficulty
+- Endless mode with a continuous difficulty curve
 - Power-ups (speed boosts, invincibility, coin multipliers)
 - Enemy birds to avoid
 - Detailed scoring system
@@ -15,16 +16,57 @@ This game features:
 Controls:
 - SPACE/UP/MOUSE CLICK: Flap the bird
 - ESC: Pause game
+- R: Rewind 3 seconds
+- F3: Show frame profiler
+- F4: Export the last 10 seconds of frame timings as a Chrome trace
 - ENTER: Select menu options
 
 To run the game:
     python main.py
+    python main.py --dirty-rects   # Update only the changed screen regions
+    python main.py --logic-hz 120 --fps 0   # 120 Hz logic, uncapped rendering
+    python main.py --seed 42 --record run.rply   # Record a reproducible replay
+    python replay.py run.rply   # Re-run a recording headless and verify it
+    python main.py --autopilot   # Watch the lookahead bot play
+    python main.py --precise-collisions   # Pixel-perfect collisions
+    python autopilot.py --levels 1 2 3   # Check levels headless with the bot
+    python batch_env.py   # Check batch env collisions against the simulation
+    python main.py --player alice   # Save scores under a name (to scores.db)
+    python score_store.py top   # Show the leaderboard
+    python leaderboard_server.py   # Local leaderboard service on port 8765
+    python main.py --leaderboard 127.0.0.1:8765   # Also send runs to it
+
+Startup times (to the first frame and until every asset is loaded) are
+printed to the console.
 """
 
+import time
 import pygame
 import sys
 import os
+import argparse
+import getpass
 from game_manager import GameManager
+from simulation import TICK_RATE
+from replay import ReplayRecorder
+from autopilot import Autopilot
+from score_store import ScoreStore, DEFAULT_PATH
+from leaderboard_client import LeaderboardClient, parse_address
+
+# Startup clock for platforms that do not expose the process start time
+IMPORT_TIME = time.perf_counter()
+
+def get_uptime():
+    """Return the seconds since the process started"""
+    try:
+        # Start time is field 22 of /proc/self/stat, in clock ticks since boot
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            boot_seconds = float(f.read().split()[0])
+        return boot_seconds - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.perf_counter() - IMPORT_TIME
 
 # Initialize pygame
 pygame.init()
@@ -38,33 +80,109 @@ pygame.display.set_caption("Flappy Adventure - Pixel Art Style")
 
 # Set up the clock
 clock = pygame.time.Clock()
-FPS = 60
+FPS = 60  # Render rate cap (0 = uncapped)
+LOGIC_HZ = 120  # Fixed game logic update rate
+
+# Most logic updates run per rendered frame before the game slows down
+# instead of trying to catch up (avoids a spiral on slow machines)
+MAX_UPDATES_PER_FRAME = 8
 
 def main():
     """Main function to run the game"""
+    parser = argparse.ArgumentParser(description="Flappy Adventure")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="redraw and update only changed screen regions instead of flipping full frames")
+    parser.add_argument('--logic-hz', type=int, default=LOGIC_HZ,
+                        help="fixed game logic update rate (default: %(default)s)")
+    parser.add_argument('--fps', type=int, default=FPS,
+                        help="render frame rate cap, 0 for uncapped (default: %(default)s)")
+    parser.add_argument('--seed', type=int,
+                        help="seed for the random layout of every run (default: random)")
+    parser.add_argument('--record', metavar='PATH',
+                        help="write a replay of every run played to PATH on exit")
+    parser.add_argument('--autopilot', action='store_true',
+                        help="let the lookahead bot fly the bird")
+    parser.add_argument('--precise-collisions', action='store_true',
+                        help="test collisions pixel by pixel instead of with shrunken hitboxes")
+    parser.add_argument('--scores', metavar='PATH', default=DEFAULT_PATH,
+                        help="score database (default: %(default)s)")
+    parser.add_argument('--no-scores', action='store_true', help="do not save scores")
+    parser.add_argument('--player', default=getpass.getuser(),
+                        help="name saved with the scores (default: the login name)")
+    parser.add_argument('--leaderboard', metavar='HOST:PORT',
+                        help="send finished runs and telemetry to a leaderboard service")
+    args = parser.parse_args()
+    
+    # Each logic update advances the game by a fixed slice of time
+    update_interval = 1.0 / args.logic_hz
+    update_dt = TICK_RATE / args.logic_hz  # In 60 FPS frames
+    accumulator = 0.0
+    
     # Create game manager
-    game_manager = GameManager(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
+    recorder = ReplayRecorder(SCREEN_WIDTH, SCREEN_HEIGHT) if args.record else None
+    score_store = None if args.no_scores else ScoreStore(args.scores)
+    leaderboard = LeaderboardClient(*parse_address(args.leaderboard)) if args.leaderboard else None
+    game_manager = GameManager(screen, SCREEN_WIDTH, SCREEN_HEIGHT, dirty_rects=args.dirty_rects,
+                               seed=args.seed, recorder=recorder,
+                               autopilot=Autopilot() if args.autopilot else None,
+                               precise_collisions=args.precise_collisions,
+                               score_store=score_store, player=args.player, leaderboard=leaderboard)
     
-    # Main game loop
-    running = True
-    while running:
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            game_manager.handle_event(event)
-        
-        # Update game state
-        game_manager.update()
-        
-        # Draw everything
-        game_manager.draw()
-        
-        # Update the display
-        pygame.display.flip()
-        
-        # Cap the frame rate
-        clock.tick(FPS)
+    # Main game loop (the replay and scores are saved even when the exit button quits)
+    try:
+        running = True
+        profiler = game_manager.profiler
+        first_frame = True
+        loading = True
+        while running:
+            profiler.begin_frame()
+            
+            # Handle events
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                game_manager.handle_event(event)
+            profiler.lap('events')
+            
+            # Update game state at the fixed logic rate
+            updates = 0
+            while accumulator >= update_interval:
+                game_manager.update(update_dt)
+                accumulator -= update_interval
+                updates += 1
+                if updates == MAX_UPDATES_PER_FRAME:
+                    accumulator = 0.0
+                    break
+            
+            # Draw everything, interpolated between the last two logic updates
+            dirty = game_manager.draw(accumulator / update_interval)
+            
+            # Update the display
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+            profiler.lap('flip')
+            
+            # Report how long startup took
+            if first_frame:
+                first_frame = False
+                print(f"First frame after {get_uptime() * 1000:.0f} ms")
+            if loading and not game_manager.loading_steps:
+                loading = False
+                print(f"Assets loaded after {get_uptime() * 1000:.0f} ms")
+            
+            # Cap the frame rate and collect the time that passed
+            accumulator += clock.tick(args.fps) / 1000.0
+            profiler.lap('idle')
+            profiler.end_frame()
+    finally:
+        if recorder is not None:
+            recorder.save(args.record)
+        if score_store is not None:
+            score_store.close()
+        if leaderboard is not None:
+            leaderboard.close()
     
     # Clean up
     pygame.quit()
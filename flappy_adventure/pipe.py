@@ -5,25 +5,50 @@ This module defines the pipe obstacles that the player must avoid.
 """
 
 import pygame
-import os
 import random
+import struct
+import assets
+from render_queue import PIPES
 
 class Pipe:
     """Pipe obstacle that the player must avoid"""
     
-    def __init__(self, x, screen_width, screen_height, level):
-        """Initialize the pipe"""
+    # Sprite dimensions shared by every pipe
+    WIDTH = 80
+    SPRITE_HEIGHT = 500
+    
+    # Packed layout of the state saved by snapshot()
+    SNAPSHOT = struct.Struct('<diidB?')
+    
+    __slots__ = (
+        'x', 'screen_width', 'screen_height', 'level', 'prev_x', 'draw_x', 'width',
+        'gap_size', 'gap_y', 'speed', 'scored', 'top_hitbox', 'bottom_hitbox', 'rng',
+    )
+    
+    def __init__(self, x, screen_width, screen_height, level, rng=random):
+        """Initialize the pipe (gap positions are drawn from rng)"""
+        # Hitboxes (moved into place by reset)
+        self.top_hitbox = pygame.Rect(0, 0, 0, 0)
+        self.bottom_hitbox = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, screen_width, screen_height, level, rng)
+    
+    def reset(self, x, screen_width, screen_height, level, rng=random):
+        """(Re)initialize the pipe in place so it can be recycled"""
+        self.rng = rng
         self.x = x
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.level = level
         
+        # Previous and interpolated positions for rendering between ticks
+        self.prev_x = self.draw_x = x
+        
         # Size
-        self.width = 80
+        self.width = self.WIDTH
         self.gap_size = 180 - (level * 20)  # Gap gets smaller with higher levels
         
         # Position
-        self.gap_y = random.randint(150, self.screen_height - 150)
+        self.gap_y = rng.randint(150, self.screen_height - 150)
         
         # Speed (increases with level)
         self.speed = 3 + (level * 0.5)
@@ -31,52 +56,79 @@ class Pipe:
         # Scoring
         self.scored = False
         
-        # Load sprites
-        self.top_pipe, self.bottom_pipe = self.load_sprites()
-        
         # Hitboxes
-        self.top_hitbox = pygame.Rect(
+        self.update_hitboxes()
+    
+    def shape(self, gap_y, gap_size, speed, level):
+        """Give the pipe a gap, speed and look chosen elsewhere (endless runs)"""
+        self.gap_y = gap_y
+        self.gap_size = gap_size
+        self.speed = speed
+        self.level = level
+        self.update_hitboxes()
+    
+    def update_hitboxes(self):
+        """Fit both hitboxes to the current position and gap"""
+        self.top_hitbox.update(
             self.x, 
             0, 
             self.width, 
             self.gap_y
         )
-        self.bottom_hitbox = pygame.Rect(
+        self.bottom_hitbox.update(
             self.x, 
             self.gap_y + self.gap_size, 
             self.width, 
             self.screen_height - (self.gap_y + self.gap_size)
         )
     
-    def load_sprites(self):
+    @classmethod
+    def get_sprite_file(cls, level):
+        """Return the pipe image used on a level"""
+        return 'pipe-red.png' if level == 2 else 'pipe-green.png'
+    
+    @classmethod
+    def get_sprites(cls, level):
         """Load pipe sprites with different colors based on level"""
-        # Try to load pipe sprites from assets
-        pipe_path = os.path.join('assets', 'pipe-green.png')
-        if self.level == 2:
-            pipe_path = os.path.join('assets', 'pipe-red.png')
-        
-        if os.path.exists(pipe_path):
-            pipe_sprite = pygame.image.load(pipe_path).convert_alpha()
-            pipe_sprite = pygame.transform.scale(pipe_sprite, (self.width, 500))
-            
-            # Create top pipe (flipped)
-            top_pipe = pygame.transform.flip(pipe_sprite, False, True)
-            bottom_pipe = pipe_sprite
-        else:
-            # Create fallback pipe sprites
-            top_pipe = self.create_fallback_sprite(True)
-            bottom_pipe = self.create_fallback_sprite(False)
-        
-        return top_pipe, bottom_pipe
+        def build():
+            pipe_file = cls.get_sprite_file(level)
+            size = (cls.WIDTH, cls.SPRITE_HEIGHT)
+            # Top pipe is the bottom sprite flipped vertically
+            top_pipe = assets.get_image(
+                pipe_file, size, flip_y=True, palette=level,
+                fallback=lambda: cls.create_fallback_sprite(level, True)
+            )
+            bottom_pipe = assets.get_image(
+                pipe_file, size, palette=level,
+                fallback=lambda: cls.create_fallback_sprite(level, False)
+            )
+            return top_pipe, bottom_pipe
+        return assets.get_surface(('pipe_sprites', level), build)
+    
+    @classmethod
+    def get_masks(cls, level):
+        """Return the shared (top, bottom) collision masks of a level's pipes"""
+        def build():
+            pipe_file = cls.get_sprite_file(level)
+            size = (cls.WIDTH, cls.SPRITE_HEIGHT)
+            top_mask = assets.get_mask(
+                pipe_file, size, flip_y=True, fallback=lambda: cls.create_fallback_sprite(level, True)
+            )
+            bottom_mask = assets.get_mask(
+                pipe_file, size, fallback=lambda: cls.create_fallback_sprite(level, False)
+            )
+            return top_mask, bottom_mask
+        return assets.get_surface(('pipe_masks', level), build)
     
-    def create_fallback_sprite(self, is_top):
+    @classmethod
+    def create_fallback_sprite(cls, level, is_top):
         """Create a fallback pipe sprite with pixel art style"""
         # Colors based on level
-        if self.level == 1:
+        if level == 1:
             main_color = (0, 200, 0)  # Green
             highlight_color = (0, 255, 0)
             shadow_color = (0, 150, 0)
-        elif self.level == 2:
+        elif level == 2:
             main_color = (200, 0, 0)  # Red
             highlight_color = (255, 0, 0)
             shadow_color = (150, 0, 0)
@@ -86,25 +138,25 @@ class Pipe:
             shadow_color = (0, 0, 150)
         
         # Create pipe surface
-        height = 500
-        pipe = pygame.Surface((self.width, height), pygame.SRCALPHA)
+        height = cls.SPRITE_HEIGHT
+        pipe = pygame.Surface((cls.WIDTH, height), pygame.SRCALPHA)
         
         # Draw pipe body
-        pygame.draw.rect(pipe, main_color, (0, 0, self.width, height))
+        pygame.draw.rect(pipe, main_color, (0, 0, cls.WIDTH, height))
         
         # Draw pipe edge (top or bottom depending on orientation)
         edge_height = 20
         if is_top:
-            pygame.draw.rect(pipe, main_color, (0, height - edge_height, self.width, edge_height))
-            pygame.draw.rect(pipe, highlight_color, (0, height - edge_height, self.width, 5))
-            pygame.draw.rect(pipe, shadow_color, (0, height - 5, self.width, 5))
+            pygame.draw.rect(pipe, main_color, (0, height - edge_height, cls.WIDTH, edge_height))
+            pygame.draw.rect(pipe, highlight_color, (0, height - edge_height, cls.WIDTH, 5))
+            pygame.draw.rect(pipe, shadow_color, (0, height - 5, cls.WIDTH, 5))
         else:
-            pygame.draw.rect(pipe, main_color, (0, 0, self.width, edge_height))
-            pygame.draw.rect(pipe, highlight_color, (0, 0, self.width, 5))
-            pygame.draw.rect(pipe, shadow_color, (0, edge_height - 5, self.width, 5))
+            pygame.draw.rect(pipe, main_color, (0, 0, cls.WIDTH, edge_height))
+            pygame.draw.rect(pipe, highlight_color, (0, 0, cls.WIDTH, 5))
+            pygame.draw.rect(pipe, shadow_color, (0, edge_height - 5, cls.WIDTH, 5))
         
         # Add pixel art details
-        for i in range(0, self.width, 10):
+        for i in range(0, cls.WIDTH, 10):
             if i % 20 == 0:
                 if is_top:
                     pygame.draw.rect(pipe, highlight_color, (i, 0, 5, height - edge_height))
@@ -115,10 +167,12 @@ class Pipe:
         
         return pipe
     
-    def update(self):
-        """Update pipe position"""
+    def update(self, dt=1.0):
+        """Update pipe position by dt ticks"""
+        self.prev_x = self.x
+        
         # Move pipe to the left
-        self.x -= self.speed
+        self.x -= self.speed * dt
         
         # Update hitboxes
         self.top_hitbox.x = self.x
@@ -126,15 +180,48 @@ class Pipe:
     
     def collides_with(self, bird):
         """Check if the bird collides with this pipe"""
-        return bird.hitbox.colliderect(self.top_hitbox) or bird.hitbox.colliderect(self.bottom_hitbox)
+        return self.overlaps(bird.hitbox)
+    
+    def overlaps(self, rect):
+        """Check if a rect overlaps either half of this pipe"""
+        return rect.colliderect(self.top_hitbox) or rect.colliderect(self.bottom_hitbox)
     
-    def draw(self, screen):
-        """Draw the pipe on the screen"""
+    def touches(self, rect, mask):
+        """Check if a mask placed at rect overlaps the opaque pixels of either pipe sprite"""
+        top_mask, bottom_mask = self.get_masks(self.level)
+        for sprite_mask, y in ((top_mask, self.gap_y - self.SPRITE_HEIGHT), (bottom_mask, self.gap_y + self.gap_size)):
+            sprite_rect = pygame.Rect(self.x, y, self.width, self.SPRITE_HEIGHT)
+            if rect.colliderect(sprite_rect):
+                offset = (sprite_rect.x - rect.x, sprite_rect.y - rect.y)
+                if mask.overlap(sprite_mask, offset) is not None:
+                    return True
+        return False
+    
+    def snapshot(self):
+        """Return the pipe's gameplay state as packed bytes"""
+        return self.SNAPSHOT.pack(self.x, self.gap_y, self.gap_size, self.speed, self.level, self.scored)
+    
+    def restore(self, data, offset=0):
+        """Restore a state saved by snapshot() and return the offset after it"""
+        (self.x, self.gap_y, self.gap_size, self.speed, self.level,
+         self.scored) = self.SNAPSHOT.unpack_from(data, offset)
+        self.prev_x = self.draw_x = self.x
+        self.update_hitboxes()
+        return offset + self.SNAPSHOT.size
+    
+    def interpolate(self, alpha):
+        """Place the sprite alpha of the way from the previous tick to the current one"""
+        self.draw_x = self.prev_x + (self.x - self.prev_x) * alpha
+    
+    def enqueue(self, queue):
+        """Queue both pipe halves for drawing"""
+        top_pipe, bottom_pipe = self.get_sprites(self.level)
+        
         # Draw top pipe
-        screen.blit(self.top_pipe, (self.x, self.gap_y - 500))
+        queue.push(top_pipe, (self.draw_x, self.gap_y - self.SPRITE_HEIGHT), PIPES)
         
         # Draw bottom pipe
-        screen.blit(self.bottom_pipe, (self.x, self.gap_y + self.gap_size))
+        queue.push(bottom_pipe, (self.draw_x, self.gap_y + self.gap_size), PIPES)
         
         # Debug: draw hitboxes (uncomment for debugging)
         # pygame.draw.rect(screen, (255, 0, 0), self.top_hitbox, 1)
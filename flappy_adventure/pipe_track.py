@@ -0,0 +1,82 @@
+"""
+Pipe track module for Flappy Adventure
+
+This module keeps the pipes of a run in a circular buffer ordered by x.
+Every pipe scrolls at the same speed, so the leftmost pipe is always the
+next one to leave the screen and can be moved behind the rightmost one
+without searching or reallocating.
+"""
+
+from pipe import Pipe
+
+class PipeTrack:
+    """Fixed ring of pipes ordered from left to right"""
+
+    def __init__(self, count, spacing, screen_width, screen_height, level, rng):
+        """Initialize the track with count pipes starting at the right screen edge"""
+        self.spacing = spacing
+        self.rng = rng  # Draws the gap of every new or recycled pipe
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.level = level
+
+        self.pipes = [
+            Pipe(screen_width + (i * spacing), screen_width, screen_height, level, rng)
+            for i in range(count)
+        ]
+        self.head = 0  # Index of the leftmost pipe
+        self.passed = 0  # Number of scored pipes at the head of the track
+
+    @property
+    def first(self):
+        """Return the leftmost pipe"""
+        return self.pipes[self.head]
+
+    @property
+    def last(self):
+        """Return the rightmost pipe"""
+        return self.pipes[self.head - 1]
+
+    def recycle(self):
+        """Move the leftmost pipe behind the rightmost one and return it"""
+        pipes = self.pipes
+        pipe = pipes[self.head]
+        pipe.reset(self.last.x + self.spacing, self.screen_width, self.screen_height, self.level, self.rng)
+        self.head = (self.head + 1) % len(pipes)
+        if self.passed:
+            self.passed -= 1
+        return pipe
+
+    def next_unscored(self):
+        """Return the leftmost pipe the bird has not passed yet, or None"""
+        pipes = self.pipes
+        count = len(pipes)
+
+        # Pipes are passed in order, so scored ones always form a prefix
+        while self.passed < count:
+            pipe = pipes[(self.head + self.passed) % count]
+            if not pipe.scored:
+                return pipe
+            self.passed += 1
+        return None
+
+    def overlapping(self, left, right):
+        """Yield the pipes whose columns overlap the range [left, right)"""
+        pipes = self.pipes
+        count = len(pipes)
+        for offset in range(count):
+            pipe = pipes[(self.head + offset) % count]
+            if pipe.x >= right:
+                # Everything further along the track is even further right
+                return
+            if pipe.x + pipe.width > left:
+                yield pipe
+
+    def __iter__(self):
+        pipes = self.pipes
+        count = len(pipes)
+        for offset in range(count):
+            yield pipes[(self.head + offset) % count]
+
+    def __len__(self):
+        return len(self.pipes)
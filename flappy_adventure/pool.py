@@ -0,0 +1,68 @@
+"""
+Pool module for Flappy Adventure
+
+This module defines a fixed-capacity object pool. Released objects go on
+a free list and are reset in place for the next spawn, so long sessions
+do not keep allocating and discarding game objects.
+"""
+
+class Pool:
+    """Fixed-capacity pool of reusable game objects
+
+    Pooled classes provide reset(*args) with the same arguments as their
+    constructor and an ``active`` attribute. Iterating a pool yields the
+    active objects in spawn order.
+    """
+
+    def __init__(self, cls, capacity):
+        """Initialize an empty pool"""
+        self.cls = cls
+        self.capacity = capacity
+        self.created = 0  # Objects built so far (never more than capacity)
+        self.free = []  # Released objects ready for reuse
+        self.active = []  # Objects in play
+
+    def acquire(self, *args):
+        """Return an object initialized with args, or None if the pool is exhausted"""
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+        elif self.created < self.capacity:
+            obj = self.cls(*args)
+            self.created += 1
+        else:
+            return None
+        obj.active = True
+        self.active.append(obj)
+        return obj
+
+    def release(self, obj):
+        """Mark an object as finished; sweep() returns it to the free list"""
+        obj.active = False
+
+    def sweep(self):
+        """Move released objects from the active list to the free list"""
+        active = self.active
+        kept = 0
+        for obj in active:
+            if obj.active:
+                active[kept] = obj
+                kept += 1
+            else:
+                self.free.append(obj)
+        del active[kept:]
+
+    def clear(self):
+        """Release every active object"""
+        for obj in self.active:
+            obj.active = False
+        self.sweep()
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __len__(self):
+        return len(self.active)
+
+    def __getitem__(self, index):
+        return self.active[index]
@@ -5,8 +5,10 @@ This module defines the power-ups that the player can collect.
 """
 
 import pygame
-import os
+import struct
 from enum import Enum
+import assets
+from render_queue import POWER_UPS
 
 class PowerUpType(Enum):
     """Types of power-ups"""
@@ -17,29 +19,57 @@ class PowerUpType(Enum):
 class PowerUp:
     """Power-up that the player can collect"""
     
+    # Sprite dimensions shared by every power-up
+    SIZE = 30
+    
+    # Packed layout of the state saved by snapshot()
+    SNAPSHOT = struct.Struct('<ddBddb')
+    
+    # Baked pulse frames cover animation_counter 0.0 to 1.0 in 0.1 steps
+    PULSE_STEPS = 10
+    
+    __slots__ = (
+        'x', 'y', 'type', 'prev_x', 'prev_y', 'draw_x', 'draw_y', 'width', 'height',
+        'speed', 'animation_counter', 'pulse_direction', 'hitbox', 'active',
+    )
+    
     def __init__(self, x, y, power_up_type):
         """Initialize the power-up"""
+        # Hitbox (moved into place by reset)
+        self.hitbox = pygame.Rect(x, y, self.SIZE, self.SIZE)
+        self.reset(x, y, power_up_type)
+    
+    def reset(self, x, y, power_up_type):
+        """(Re)initialize the power-up in place so pooled instances can be reused"""
+        self.active = True
         self.x = x
         self.y = y
         self.type = power_up_type
         
+        # Previous and interpolated positions for rendering between ticks
+        self.prev_x = self.draw_x = x
+        self.prev_y = self.draw_y = y
+        
         # Size
-        self.width = 30
-        self.height = 30
+        self.width = self.SIZE
+        self.height = self.SIZE
         
         # Speed
         self.speed = 3
         
-        # Animation
-        self.sprite = self.create_sprite()
+        # Animation (the sprite is fetched from the shared cache when drawing)
         self.animation_counter = 0
         self.pulse_direction = 1
         
         # Hitbox
-        self.hitbox = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.hitbox.update(self.x, self.y, self.width, self.height)
+    
+    def get_sprite(self):
+        """Return the shared sprite for this power-up type"""
+        return assets.get_surface(('power_up', self.type), self.build_sprite)
     
-    def create_sprite(self):
-        """Create a sprite for the power-up"""
+    def build_sprite(self):
+        """Draw the sprite for this power-up type"""
         sprite = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         
         # Different colors and shapes based on power-up type
@@ -83,17 +113,20 @@ class PowerUp:
         
         return sprite
     
-    def update(self):
-        """Update power-up position and animation"""
+    def update(self, dt=1.0):
+        """Update power-up position and animation by dt ticks"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Move power-up to the left
-        self.x -= self.speed
+        self.x -= self.speed * dt
         
         # Update hitbox
         self.hitbox.x = self.x
         self.hitbox.y = self.y
         
         # Animate (pulsating effect)
-        self.animation_counter += 0.1 * self.pulse_direction
+        self.animation_counter += 0.1 * self.pulse_direction * dt
         if self.animation_counter >= 1.0:
             self.pulse_direction = -1
         elif self.animation_counter <= 0.0:
@@ -103,16 +136,55 @@ class PowerUp:
         """Check if the bird collides with this power-up"""
         return bird.hitbox.colliderect(self.hitbox)
     
-    def draw(self, screen):
-        """Draw the power-up on the screen"""
-        # Apply pulsating effect
-        scale = 1.0 + 0.2 * self.animation_counter
-        scaled_width = int(self.width * scale)
-        scaled_height = int(self.height * scale)
-        scaled_sprite = pygame.transform.scale(self.sprite, (scaled_width, scaled_height))
-        
-        # Center the scaled sprite
-        x_offset = (scaled_width - self.width) // 2
-        y_offset = (scaled_height - self.height) // 2
-        
-        screen.blit(scaled_sprite, (self.x - x_offset, self.y - y_offset))
\ No newline at end of file
+    def snapshot(self):
+        """Return the power-up's gameplay state as packed bytes"""
+        return self.SNAPSHOT.pack(
+            self.x, self.y, self.type.value, self.speed, self.animation_counter, self.pulse_direction
+        )
+    
+    def restore(self, data, offset=0):
+        """Restore a state saved by snapshot() and return the offset after it"""
+        (self.x, self.y, power_up_type, self.speed, self.animation_counter,
+         self.pulse_direction) = self.SNAPSHOT.unpack_from(data, offset)
+        self.type = PowerUpType(power_up_type)
+        self.prev_x = self.draw_x = self.x
+        self.prev_y = self.draw_y = self.y
+        self.hitbox.x = self.x
+        self.hitbox.y = self.y
+        return offset + self.SNAPSHOT.size
+    
+    def interpolate(self, alpha):
+        """Place the sprite alpha of the way from the previous tick to the current one"""
+        self.draw_x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.draw_y = self.prev_y + (self.y - self.prev_y) * alpha
+    
+    def get_pulse_phase(self):
+        """Return the index of the baked pulse frame to show"""
+        phase = int(self.animation_counter * self.PULSE_STEPS + 0.5)
+        return min(max(phase, 0), self.PULSE_STEPS)
+    
+    def get_pulse_frames(self):
+        """Return the baked (sprite, x offset, y offset) pulse frames for this type"""
+        return assets.get_surface(('power_up_pulse', self.type), self.bake_pulse_frames)
+    
+    def bake_pulse_frames(self):
+        """Pre-scale the sprite for every pulse phase"""
+        sprite = self.get_sprite()
+        frames = []
+        for phase in range(self.PULSE_STEPS + 1):
+            # Apply pulsating effect
+            scale = 1.0 + 0.2 * phase / self.PULSE_STEPS
+            scaled_width = int(self.width * scale)
+            scaled_height = int(self.height * scale)
+            scaled_sprite = pygame.transform.scale(sprite, (scaled_width, scaled_height))
+            
+            # Center the scaled sprite
+            x_offset = (scaled_width - self.width) // 2
+            y_offset = (scaled_height - self.height) // 2
+            frames.append((scaled_sprite, x_offset, y_offset))
+        return frames
+    
+    def enqueue(self, queue):
+        """Queue the pulsating sprite for drawing"""
+        scaled_sprite, x_offset, y_offset = self.get_pulse_frames()[self.get_pulse_phase()]
+        queue.push(scaled_sprite, (self.draw_x - x_offset, self.draw_y - y_offset), POWER_UPS)
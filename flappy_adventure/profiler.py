@@ -0,0 +1,176 @@
+"""
+Profiler module for Flappy Adventure
+
+This module records how long each phase of a frame takes (event
+handling, the simulation subsystems, drawing and the display flip) using
+perf_counter_ns laps. It draws a toggleable overlay with a rolling
+frame-time graph and per-phase averages, and exports the last few
+seconds as a Chrome trace (load it in chrome://tracing or Perfetto).
+"""
+
+import itertools
+import json
+import time
+from collections import deque
+import pygame
+from ui import draw_glyphs
+
+# Seconds of frames kept for trace export
+TRACE_SECONDS = 10
+
+# Frames shown in the overlay graph and averaged in the breakdown
+GRAPH_FRAMES = 120
+BREAKDOWN_FRAMES = 60
+
+# Frames between two refreshes of the breakdown text
+TEXT_REFRESH_FRAMES = 15
+
+# Frame budget drawn as a line across the graph (60 FPS)
+BUDGET_MS = 1000.0 / 60
+
+# Phases in display order
+PHASES = (
+    'events', 'bird', 'pipes', 'power_ups', 'enemies', 'collision', 'spawn', 'game',
+    'loading', 'background', 'entities', 'hud', 'render', 'profiler', 'flip', 'idle',
+)
+
+# Overlay layout
+PANEL_WIDTH = GRAPH_FRAMES * 2 + 10
+GRAPH_HEIGHT = 80
+LINE_HEIGHT = 15
+FONT_SIZE = 14
+MS_PER_PIXEL = 0.5
+PANEL_COLOR = (20, 20, 30)
+TEXT_COLOR = (230, 230, 230)
+
+class Profiler:
+    """Collects per-phase frame timings and presents them"""
+
+    def __init__(self, seconds=TRACE_SECONDS):
+        """Initialize an empty history covering the given number of seconds"""
+        self.window_ns = int(seconds * 1e9)
+        self.frames = deque()  # (start ns, end ns, laps) of finished frames
+        self.laps = []  # (phase, start ns, end ns) of the current frame
+        self.frame_start = self.last = time.perf_counter_ns()
+        self.in_frame = False  # Laps outside begin_frame()/end_frame() are ignored
+        self.visible = False
+
+        # Overlay text, rendered into a surface every few frames
+        self.lines = []
+        self.text_surface = None
+        self.frames_since_refresh = TEXT_REFRESH_FRAMES
+
+    def toggle(self):
+        """Show or hide the overlay"""
+        self.visible = not self.visible
+
+    def begin_frame(self):
+        """Start timing a new frame"""
+        self.frame_start = self.last = time.perf_counter_ns()
+        self.laps = []
+        self.in_frame = True
+
+    def lap(self, phase):
+        """Charge the time since the previous lap to phase (ignored outside a frame)"""
+        if not self.in_frame:
+            return
+        now = time.perf_counter_ns()
+        self.laps.append((phase, self.last, now))
+        self.last = now
+
+    def end_frame(self):
+        """Finish the current frame and forget frames older than the trace window"""
+        if not self.in_frame:
+            return
+        self.in_frame = False
+        now = time.perf_counter_ns()
+        frames = self.frames
+        frames.append((self.frame_start, now, self.laps))
+        while frames[0][1] < now - self.window_ns:
+            frames.popleft()
+        self.frames_since_refresh += 1
+
+    def get_breakdown(self, count=BREAKDOWN_FRAMES):
+        """Return (average frame ms, worst frame ms, {phase: average ms}) of recent frames"""
+        frames = list(self.frames)[-count:]
+        if not frames:
+            return 0.0, 0.0, {}
+        totals = {}
+        worst = 0
+        for start, end, laps in frames:
+            worst = max(worst, end - start)
+            for phase, lap_start, lap_end in laps:
+                totals[phase] = totals.get(phase, 0) + lap_end - lap_start
+        scale = 1e6 * len(frames)
+        average = sum(end - start for start, end, _ in frames) / scale
+        return average, worst / 1e6, {phase: total / scale for phase, total in totals.items()}
+
+    def export_chrome_trace(self, path):
+        """Write the recorded frames as a Chrome trace JSON file"""
+        events = []
+        for start, end, laps in self.frames:
+            events.append({
+                'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                'ts': start / 1000.0, 'dur': (end - start) / 1000.0,
+            })
+            for phase, lap_start, lap_end in laps:
+                events.append({
+                    'name': phase, 'ph': 'X', 'pid': 1, 'tid': 1,
+                    'ts': lap_start / 1000.0, 'dur': (lap_end - lap_start) / 1000.0,
+                })
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def refresh_lines(self):
+        """Rebuild the breakdown text from recent frames"""
+        average, worst, phases = self.get_breakdown()
+        lines = [f"frame {average:6.2f} ms  max {worst:6.2f} ms"]
+        for phase in PHASES:
+            if phase in phases:
+                lines.append(f"{phase:<10} {phases[phase]:7.3f} ms")
+        self.lines = lines
+        self.frames_since_refresh = 0
+
+        # Render the text once; the overlay blits it until the next refresh
+        surface = pygame.Surface((PANEL_WIDTH, len(lines) * LINE_HEIGHT))
+        surface.fill(PANEL_COLOR)
+        for index, line in enumerate(lines):
+            draw_glyphs(surface, FONT_SIZE, line, TEXT_COLOR, (6, index * LINE_HEIGHT))
+        self.text_surface = surface
+
+    def get_rect(self, screen):
+        """Return the screen area covered by the overlay"""
+        height = GRAPH_HEIGHT + 10 + (len(PHASES) + 1) * LINE_HEIGHT
+        return pygame.Rect(screen.get_width() - PANEL_WIDTH - 10, 10, PANEL_WIDTH, height)
+
+    def draw(self, screen):
+        """Draw the overlay and return the rect it covers"""
+        if self.frames_since_refresh >= TEXT_REFRESH_FRAMES:
+            self.refresh_lines()
+
+        rect = self.get_rect(screen)
+        screen.fill(PANEL_COLOR, rect)
+
+        # Rolling frame-time graph: whole frame (light) over the work part (dark)
+        baseline = rect.top + GRAPH_HEIGHT
+        x = rect.right - 7
+        for start, end, laps in itertools.islice(reversed(self.frames), GRAPH_FRAMES):
+            total_ms = (end - start) / 1e6
+            idle_ms = sum(lap_end - lap_start for phase, lap_start, lap_end in laps if phase == 'idle') / 1e6
+            if total_ms <= BUDGET_MS:
+                color = (80, 200, 80)
+            elif total_ms <= 2 * BUDGET_MS:
+                color = (220, 200, 60)
+            else:
+                color = (230, 70, 60)
+            height = min(GRAPH_HEIGHT, int(total_ms / MS_PER_PIXEL))
+            work = min(height, int((total_ms - idle_ms) / MS_PER_PIXEL))
+            screen.fill(color, (x, baseline - height, 2, height))
+            screen.fill((40, 110, 200), (x, baseline - work, 2, work))
+            x -= 2
+        budget_y = baseline - int(BUDGET_MS / MS_PER_PIXEL)
+        screen.fill((255, 255, 255), (rect.left, budget_y, rect.width, 1))
+
+        # Per-phase breakdown
+        screen.blit(self.text_surface, (rect.left, baseline + 6))
+        return rect
@@ -0,0 +1,52 @@
+"""
+Render queue module for Flappy Adventure
+
+This module defines the per-frame draw list. Every visible object pushes
+the (surface, position) pairs it wants blitted into a layer instead of
+drawing itself, and the queued layers are then submitted to the screen
+with Surface.blits() calls (one per range of layers).
+"""
+
+from itertools import chain
+
+# Layers, drawn back to front
+PIPES = 0
+POWER_UPS = 1
+ENEMIES = 2
+BIRD = 3
+HUD = 4
+OVERLAY = 5  # Pause dimming
+POPUP = 6  # Text on top of the overlay
+LAYER_COUNT = 7
+
+class RenderQueue:
+    """Blits of one frame, bucketed by layer"""
+
+    def __init__(self, layer_count=LAYER_COUNT):
+        """Initialize an empty queue"""
+        self.layers = [[] for _ in range(layer_count)]
+
+    def clear(self):
+        """Forget the previous frame's blits"""
+        for layer in self.layers:
+            layer.clear()
+
+    def push(self, surface, position, layer):
+        """Queue one blit"""
+        self.layers[layer].append((surface, position))
+
+    def extend(self, blits, layer):
+        """Queue several (surface, position) blits"""
+        self.layers[layer].extend(blits)
+
+    def __len__(self):
+        """Return the number of queued blits"""
+        return sum(len(layer) for layer in self.layers)
+
+    def get_blits(self, first=0, last=None):
+        """Return the queued blits of layers first to last (exclusive) in drawing order"""
+        return list(chain.from_iterable(self.layers[first:last]))
+
+    def submit(self, screen, first=0, last=None):
+        """Draw the queued blits of layers first to last (exclusive) in one call"""
+        screen.blits(self.get_blits(first, last), doreturn=False)
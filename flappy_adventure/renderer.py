@@ -0,0 +1,79 @@
+"""
+Renderer module for Flappy Adventure
+
+This module implements dirty-rectangle rendering: only the screen areas
+where something moved, changed or disappeared are restored from the
+background and redrawn, and only those areas are pushed to the display.
+"""
+
+class DirtyRectRenderer:
+    """Redraws and reports only the damaged regions of the screen"""
+
+    def __init__(self, screen):
+        """Initialize the renderer for a screen surface"""
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.previous = set()  # (surface, position) blits of the last frame
+        self.scene = None
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Redraw the whole screen on the next frame"""
+        self.full_redraw = True
+
+    def render(self, background, queue, scene=None):
+        """Draw the queued frame and return the list of rects that changed
+
+        Blits are compared with the previous frame's by surface and
+        position, so a sprite that moved, changed its look or disappeared
+        damages its old and its new area. A change of ``scene`` (e.g. game
+        state or level) redraws everything.
+        """
+        if scene != self.scene:
+            self.scene = scene
+            self.full_redraw = True
+
+        blits = queue.get_blits()
+        current = set(blits)
+        previous = self.previous
+        self.previous = current
+
+        if self.full_redraw:
+            self.full_redraw = False
+            damaged = [self.screen_rect.copy()]
+        else:
+            damaged = merge_rects(
+                [get_blit_rect(blit) for blit in current.symmetric_difference(previous)],
+                self.screen_rect
+            )
+
+        # Restore the background and replay the blits overlapping each area
+        screen = self.screen
+        rects = [get_blit_rect(blit) for blit in blits]
+        for area in damaged:
+            screen.set_clip(area)
+            screen.blit(background, area, area)
+            screen.blits([blits[index] for index in area.collidelistall(rects)], doreturn=False)
+        screen.set_clip(None)
+        return damaged
+
+def get_blit_rect(blit):
+    """Return the area a (surface, position) blit may cover"""
+    surface, position = blit
+    # Allow a pixel of slack for float positions truncated by blit
+    return surface.get_rect(topleft=position).inflate(2, 2)
+
+def merge_rects(rects, bounds):
+    """Clip rects to bounds and merge the overlapping ones"""
+    merged = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if rect.width == 0 or rect.height == 0:
+            continue
+        # Absorb every merged rect this one touches until none is left
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
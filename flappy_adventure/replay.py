@@ -0,0 +1,265 @@
+"""
+Replay module for Flappy Adventure
+
+This module records runs as a seed plus a run-length encoded log of flap
+inputs and replays them headless. A run only depends on its seed, its
+inputs and the logic step size, so a replay reproduces it bit for bit
+(e.g. to check a disputed score or re-run a perf scenario exactly).
+
+File layout (little-endian):
+    header   magic, version, screen width, screen height, segment count
+    segment  level, start score, seed, dt, steps, final score,
+             final state digest, run count, flags, then the runs as varints
+
+Version 1 files (without segment flags) can still be read.
+
+Each segment is one SimState (a level attempt or an endless run). Runs alternate between
+no-flap and flap steps, starting with no-flap.
+"""
+
+import argparse
+import struct
+import sys
+import time
+import zlib
+from simulation import SimState, step
+
+MAGIC = b'FLRP'
+VERSION = 2
+
+HEADER = struct.Struct('<4sHHHH')
+SEGMENT = struct.Struct('<BIQdIIIIB')
+SEGMENT_V1 = struct.Struct('<BIQdIIII')
+
+# Segment flags
+PRECISE_COLLISIONS = 1
+ENDLESS = 2
+
+def write_varint(out, value):
+    """Append an unsigned LEB128 integer to a bytearray"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, offset):
+    """Read an unsigned LEB128 integer and return (value, next offset)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def state_digest(state):
+    """Return a CRC32 over everything that decides how a run continues"""
+    bird = state.bird
+    values = [
+        state.ticks, state.score, bird.y, bird.velocity, bird.lives,
+        bird.speed_boost, bird.speed_boost_timer, bird.invincible, bird.invincibility_timer,
+        bird.has_shield,
+    ]
+    for pipe in state.pipes:
+        values.extend((pipe.x, pipe.gap_y))
+    for enemy in state.enemies:
+        values.extend((enemy.x, enemy.y))
+    for power_up in state.power_ups:
+        values.extend((power_up.x, power_up.y, power_up.type.value))
+    return zlib.crc32(struct.pack(f'<{len(values)}d', *values))
+
+class Segment:
+    """Inputs of one level attempt, run-length encoded"""
+
+    def __init__(self, level, score, seed, dt=1.0, precise_collisions=False, endless=False):
+        """Initialize an empty segment for a run starting at level and score"""
+        self.level = level
+        self.score = score
+        self.seed = seed
+        self.dt = dt
+        self.precise_collisions = precise_collisions
+        self.endless = endless
+        self.steps = 0
+        self.runs = []  # Alternating no-flap / flap run lengths
+        self.final_score = score
+        self.digest = 0
+
+        # Run being extended by append()
+        self.bit = 0
+        self.run = 0
+
+    def append(self, action, dt):
+        """Record the action of one step"""
+        if self.steps == 0:
+            self.dt = dt
+        elif dt != self.dt:
+            raise ValueError("replays need a fixed step size within a segment")
+        self.steps += 1
+
+        bit = 1 if action else 0
+        if bit == self.bit:
+            self.run += 1
+        else:
+            self.runs.append(self.run)
+            self.bit = bit
+            self.run = 1
+
+    def close(self, state):
+        """Finish the log and remember how the run ended"""
+        if self.run:
+            self.runs.append(self.run)
+            self.bit = 0
+            self.run = 0
+        self.final_score = state.score
+        self.digest = state_digest(state)
+
+    def get_flags(self):
+        """Return the segment flags of the file format"""
+        return (PRECISE_COLLISIONS if self.precise_collisions else 0) | (ENDLESS if self.endless else 0)
+
+    def actions(self):
+        """Yield the recorded action of every step"""
+        for index, length in enumerate(self.runs):
+            action = index & 1
+            for _ in range(length):
+                yield action
+
+class Replay:
+    """Recorded segments together with the screen size they were played at"""
+
+    def __init__(self, screen_width, screen_height, segments=None):
+        """Initialize a replay"""
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.segments = segments if segments is not None else []
+
+    def to_bytes(self):
+        """Encode the replay in the binary file format"""
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.screen_width, self.screen_height, len(self.segments)))
+        for segment in self.segments:
+            out += SEGMENT.pack(
+                segment.level, segment.score, segment.seed, segment.dt, segment.steps,
+                segment.final_score, segment.digest, len(segment.runs),
+                segment.get_flags()
+            )
+            for length in segment.runs:
+                write_varint(out, length)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode a replay written by to_bytes()"""
+        magic, version, screen_width, screen_height, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("not a Flappy Adventure replay (or an unsupported version)")
+
+        replay = cls(screen_width, screen_height)
+        offset = HEADER.size
+        for _ in range(count):
+            if version == 1:
+                level, score, seed, dt, steps, final_score, digest, run_count = SEGMENT_V1.unpack_from(data, offset)
+                offset += SEGMENT_V1.size
+                flags = 0
+            else:
+                level, score, seed, dt, steps, final_score, digest, run_count, flags = SEGMENT.unpack_from(data, offset)
+                offset += SEGMENT.size
+
+            segment = Segment(level, score, seed, dt, bool(flags & PRECISE_COLLISIONS), bool(flags & ENDLESS))
+            segment.steps = steps
+            segment.final_score = final_score
+            segment.digest = digest
+            for _ in range(run_count):
+                length, offset = read_varint(data, offset)
+                segment.runs.append(length)
+            replay.segments.append(segment)
+        return replay
+
+    def save(self, path):
+        """Write the replay to a file"""
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read a replay from a file"""
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+class ReplayRecorder:
+    """Logs the inputs fed to step() while a game is played"""
+
+    def __init__(self, screen_width, screen_height):
+        """Initialize an empty recording"""
+        self.replay = Replay(screen_width, screen_height)
+        self.segment = None
+        self.state = None
+
+    def begin(self, state):
+        """Start a new segment for a freshly created SimState"""
+        self.finish()
+        self.state = state
+        self.segment = Segment(state.level, state.score, state.seed,
+                               precise_collisions=state.precise_collisions, endless=state.endless)
+
+    def record(self, action, dt=1.0):
+        """Record the action passed to the next step() of the current state"""
+        if self.segment is not None and not self.state.done:
+            self.segment.append(action, dt)
+
+    def finish(self):
+        """Close the current segment (empty segments are dropped)"""
+        segment = self.segment
+        if segment is not None and segment.steps:
+            segment.close(self.state)
+            self.replay.segments.append(segment)
+        self.segment = None
+        self.state = None
+
+    def save(self, path):
+        """Close the current segment and write everything recorded so far"""
+        self.finish()
+        self.replay.save(path)
+
+def play_segment(replay, segment):
+    """Re-run a segment headless and return the final SimState"""
+    state = SimState(replay.screen_width, replay.screen_height, segment.level, segment.score, segment.seed,
+                     segment.precise_collisions, segment.endless)
+    dt = segment.dt
+    for action in segment.actions():
+        step(state, action, dt)
+        state.events.clear()
+    return state
+
+def verify(replay):
+    """Replay every segment and return whether each one ended exactly as recorded"""
+    results = []
+    for segment in replay.segments:
+        state = play_segment(replay, segment)
+        results.append(state.score == segment.final_score and state_digest(state) == segment.digest)
+    return results
+
+def main(argv=None):
+    """Replay a recorded file and report whether every segment matches"""
+    parser = argparse.ArgumentParser(description="Replay a Flappy Adventure recording headless")
+    parser.add_argument('path', help="replay file written with main.py --record")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    mismatches = 0
+    for index, segment in enumerate(replay.segments):
+        start = time.perf_counter()
+        state = play_segment(replay, segment)
+        elapsed = time.perf_counter() - start
+        ok = state.score == segment.final_score and state_digest(state) == segment.digest
+        mismatches += not ok
+        mode = "endless" if segment.endless else f"level {segment.level}"
+        print(f"segment {index}: {mode}, seed {segment.seed}, "
+              f"{segment.steps} steps, score {segment.score} -> {state.score} "
+              f"(recorded {segment.final_score}), {'ok' if ok else 'MISMATCH'}, "
+              f"{segment.steps / max(elapsed, 1e-9):.0f} steps/s")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
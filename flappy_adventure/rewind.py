@@ -0,0 +1,53 @@
+"""
+Rewind module for Flappy Adventure
+
+This module keeps a short history of simulation snapshots so a run can
+be wound back a few seconds for practice.
+"""
+
+from collections import deque
+from simulation import TICK_RATE
+
+# How far back a run can be rewound (in seconds)
+REWIND_SECONDS = 3
+
+# Ticks between two snapshots (0.1 seconds)
+SNAPSHOT_INTERVAL = 6
+
+class RewindBuffer:
+    """Ring of recent snapshots of one run"""
+
+    def __init__(self, seconds=REWIND_SECONDS, interval=SNAPSHOT_INTERVAL):
+        """Initialize an empty history covering the given number of seconds"""
+        self.interval = interval
+        self.snapshots = deque(maxlen=int(seconds * TICK_RATE / interval) + 1)  # (ticks, data)
+        self.last_tick = None
+
+    def clear(self):
+        """Forget every snapshot (e.g. when a new run starts)"""
+        self.snapshots.clear()
+        self.last_tick = None
+
+    def record(self, state):
+        """Take a snapshot if the last one is at least one interval old"""
+        if self.last_tick is None or state.ticks - self.last_tick >= self.interval:
+            self.snapshots.append((state.ticks, state.snapshot()))
+            self.last_tick = state.ticks
+
+    def rewind(self, ticks, seconds=REWIND_SECONDS):
+        """Return the snapshot from about seconds before ticks, or None if there is none
+
+        Newer snapshots are dropped, so the history continues from the
+        returned one once it has been restored.
+        """
+        snapshots = self.snapshots
+        if not snapshots:
+            return None
+
+        # Keep at least the oldest snapshot when the run is younger than the target
+        target = ticks - seconds * TICK_RATE
+        while len(snapshots) > 1 and snapshots[-1][0] > target:
+            snapshots.pop()
+
+        self.last_tick, data = snapshots[-1]
+        return data
@@ -0,0 +1,237 @@
+"""
+Rollout module for Flappy Adventure
+
+This module collects gameplay data with a pool of worker processes. Each
+worker runs several headless games and writes observations, rewards and
+done flags straight into a multiprocessing.shared_memory ring buffer;
+only short commands travel over the per-worker pipes.
+
+Run it directly to benchmark steps per second for different worker counts:
+    python rollout.py --workers 1 2 4 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from multiprocessing import shared_memory
+from flappy_env import FlappyEnv, OBS_SIZE, OBS_BIRD_Y, OBS_BIRD_VELOCITY, OBS_PIPE1_GAP_Y, OBS_PIPE1_GAP_SIZE
+
+def random_policy(obs):
+    """Flap now and then at random"""
+    return 1 if random.random() < 0.08 else 0
+
+def heuristic_policy(obs):
+    """Flap when falling into the lower part of the next gap"""
+    gap_bottom = obs[OBS_PIPE1_GAP_Y] + obs[OBS_PIPE1_GAP_SIZE]
+    if obs[OBS_BIRD_Y] > gap_bottom - 50 and obs[OBS_BIRD_VELOCITY] > 0:
+        return 1
+    return 0
+
+POLICIES = {
+    'random': random_policy,
+    'heuristic': heuristic_policy,
+}
+
+class SharedRing:
+    """Views over the shared memory blocks of a rollout ring buffer"""
+
+    def __init__(self, capacity, num_envs, names=None):
+        """Create the blocks, or attach to existing ones when names are given"""
+        self.capacity = capacity
+        self.num_envs = num_envs
+        sizes = (
+            4 * capacity * num_envs * OBS_SIZE,  # Observations (float32)
+            4 * capacity * num_envs,  # Rewards (float32)
+            capacity * num_envs,  # Done flags (uint8)
+            num_envs,  # Actions for lockstep stepping (uint8)
+        )
+        if names is None:
+            self.blocks = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+        else:
+            self.blocks = [shared_memory.SharedMemory(name=name) for name in names]
+        self.obs = self.blocks[0].buf.cast('f')
+        self.rewards = self.blocks[1].buf.cast('f')
+        self.dones = self.blocks[2].buf
+        self.actions = self.blocks[3].buf
+
+    @property
+    def names(self):
+        """Names used by worker processes to attach to the blocks"""
+        return [block.name for block in self.blocks]
+
+    def close(self, unlink=False):
+        """Release the views and the blocks"""
+        self.obs.release()
+        self.rewards.release()
+        self.obs = self.rewards = self.dones = self.actions = None
+        for block in self.blocks:
+            block.close()
+            if unlink:
+                block.unlink()
+
+def worker_main(conn, names, capacity, num_envs, env_start, env_count, level, seed):
+    """Worker process loop: run env_count games and serve commands"""
+    random.seed(seed)
+    ring = SharedRing(capacity, num_envs, names)
+    envs = [FlappyEnv(level=level) for _ in range(env_count)]
+    for index, env in enumerate(envs):
+        env.reset(seed=f"{seed}/{env_start + index}")
+    stride = num_envs * OBS_SIZE
+    obs = ring.obs
+    rewards = ring.rewards
+    dones = ring.dones
+    actions = ring.actions
+
+    def run(slot, policy):
+        """Step every game once and record the results in a ring slot"""
+        row = slot * num_envs
+        for i, env in enumerate(envs):
+            index = env_start + i
+            base = slot * stride + index * OBS_SIZE
+            # Policies read the observation the game wrote on its previous step
+            action = actions[index] if policy is None else policy(env.obs)
+            env.obs = obs[base:base + OBS_SIZE]
+            _, reward, terminated, truncated, _ = env.step(action)
+            rewards[row + index] = reward
+            dones[row + index] = terminated or truncated
+            if terminated or truncated:
+                env.reset()
+
+    try:
+        while True:
+            command = conn.recv()
+            if command[0] == 'step':
+                # One lockstep step using actions written by the parent
+                run(command[1], None)
+                conn.send(True)
+            elif command[0] == 'collect':
+                # Many free-running steps with a built-in policy
+                _, start_slot, count, policy_name = command
+                policy = POLICIES[policy_name]
+                for n in range(count):
+                    run((start_slot + n) % capacity, policy)
+                conn.send(True)
+            elif command[0] == 'close':
+                break
+    finally:
+        for env in envs:
+            env.obs = None
+        ring.close()
+        conn.close()
+
+class RolloutPool:
+    """Pool of worker processes sharing one rollout ring buffer"""
+
+    def __init__(self, num_workers, envs_per_worker=8, capacity=256, level=1, seed=0):
+        """Start the workers"""
+        self.num_workers = num_workers
+        self.num_envs = num_workers * envs_per_worker
+        self.capacity = capacity
+        self.head = 0  # Next ring slot to write
+        self.ring = SharedRing(capacity, self.num_envs)
+
+        self.connections = []
+        self.workers = []
+        for w in range(num_workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=worker_main,
+                args=(child_conn, self.ring.names, capacity, self.num_envs,
+                      w * envs_per_worker, envs_per_worker, level, seed + w),
+                daemon=True,
+            )
+            worker.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.workers.append(worker)
+
+    def step(self, actions):
+        """Step every game once with the given actions and return the ring slot used"""
+        for i, action in enumerate(actions):
+            self.ring.actions[i] = action
+        slot = self.head
+        for conn in self.connections:
+            conn.send(('step', slot))
+        for conn in self.connections:
+            conn.recv()
+        self.head = (slot + 1) % self.capacity
+        return slot
+
+    def collect(self, steps, policy='random'):
+        """Let the workers run steps ticks on their own and return the first slot written
+
+        Only the last ``capacity`` steps remain in the ring afterwards.
+        """
+        slot = self.head
+        for conn in self.connections:
+            conn.send(('collect', slot, steps, policy))
+        for conn in self.connections:
+            conn.recv()
+        self.head = (slot + steps) % self.capacity
+        return slot
+
+    def observation(self, slot, env):
+        """Return the observation view of one game in a ring slot"""
+        base = (slot * self.num_envs + env) * OBS_SIZE
+        return self.ring.obs[base:base + OBS_SIZE]
+
+    def reward(self, slot, env):
+        """Return the reward of one game in a ring slot"""
+        return self.ring.rewards[slot * self.num_envs + env]
+
+    def done(self, slot, env):
+        """Return the done flag of one game in a ring slot"""
+        return bool(self.ring.dones[slot * self.num_envs + env])
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        for conn in self.connections:
+            try:
+                conn.send(('close',))
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self.workers:
+            worker.join()
+        for conn in self.connections:
+            conn.close()
+        self.connections = []
+        self.workers = []
+        if self.ring is not None:
+            self.ring.close(unlink=True)
+            self.ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def benchmark(worker_counts, envs_per_worker=8, steps=2000, policy='heuristic'):
+    """Measure collection throughput for each worker count"""
+    results = []
+    for num_workers in worker_counts:
+        with RolloutPool(num_workers, envs_per_worker) as pool:
+            pool.collect(10, policy)  # Warm up
+            start = time.perf_counter()
+            pool.collect(steps, policy)
+            elapsed = time.perf_counter() - start
+        total = num_workers * envs_per_worker * steps
+        results.append((num_workers, total / elapsed))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark rollout collection")
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--envs-per-worker', type=int, default=8)
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='heuristic')
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>8} {'steps/sec':>12} {'per worker':>12} {'scaling':>8}")
+    for num_workers, rate in benchmark(args.workers, args.envs_per_worker, args.steps, args.policy):
+        baseline = baseline or rate / num_workers
+        print(f"{num_workers:>8} {rate:>12.0f} {rate / num_workers:>12.0f} {rate / baseline:>8.2f}")
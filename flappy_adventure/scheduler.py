@@ -0,0 +1,43 @@
+"""
+Scheduler module for Flappy Adventure
+
+This module queues sounds and state changes for a later time. The main
+loop drives it once per frame, so timed sequences (e.g. "hit, then die,
+then point") keep their rhythm without ever blocking a frame.
+"""
+
+import heapq
+import itertools
+
+class Scheduler:
+    """Runs queued callbacks once their due time has been reached"""
+
+    def __init__(self):
+        """Initialize an empty schedule"""
+        self.queue = []  # Heap of (due time, sequence number, callback, args)
+        self.counter = itertools.count()  # Keeps equal due times in FIFO order
+        self.now = 0
+
+    def schedule(self, delay, callback, *args):
+        """Call callback(*args) delay milliseconds from the last update"""
+        heapq.heappush(self.queue, (self.now + delay, next(self.counter), callback, args))
+
+    def play(self, sound, delay=0):
+        """Play a sound after delay milliseconds (missing sounds are ignored)"""
+        if sound:
+            self.schedule(delay, sound.play)
+
+    def update(self, now):
+        """Run every callback that is due at time now (in milliseconds)"""
+        self.now = now
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            _, _, callback, args = heapq.heappop(queue)
+            callback(*args)
+
+    def clear(self):
+        """Drop everything still waiting"""
+        self.queue.clear()
+
+    def __len__(self):
+        return len(self.queue)
@@ -0,0 +1,319 @@
+"""
+Score store module for Flappy Adventure
+
+This module keeps every finished run in a SQLite database (WAL journal),
+so high scores survive restarts and leaderboards can be queried.
+
+Runs submitted by the game are queued and written by a background thread
+in batched transactions, so the game thread never waits on the disk. Top
+scores and per-player bests are read through indexes, and percentiles
+come from a score histogram kept next to the runs, so queries stay fast
+as the table grows into millions of rows. The best score is cached in
+memory for the HUD.
+
+Usage:
+    python score_store.py top -k 10
+    python score_store.py best alice
+    python score_store.py percentile 25
+    python score_store.py import --player alice --verify runs/*.rply
+"""
+
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from replay import Replay, verify
+
+# Database used by the game (relative to the game directory, like the assets)
+DEFAULT_PATH = 'scores.db'
+
+# Most runs written per transaction
+BATCH_SIZE = 10000
+
+# Seconds a connection waits for another connection's write to finish
+BUSY_TIMEOUT = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    endless INTEGER NOT NULL DEFAULT 0,
+    seed INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_score ON runs (score DESC, id);
+CREATE INDEX IF NOT EXISTS runs_mode_score ON runs (endless, score DESC, id);
+CREATE INDEX IF NOT EXISTS runs_player_score ON runs (player, score DESC);
+CREATE INDEX IF NOT EXISTS runs_level_score ON runs (level, score DESC);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+
+-- Number of runs per score, for percentiles without scanning the runs
+CREATE TABLE IF NOT EXISTS score_counts (
+    score INTEGER PRIMARY KEY,
+    runs INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+INSERT_RUN = "INSERT INTO runs (player, score, level, endless, seed, created) VALUES (?, ?, ?, ?, ?, ?)"
+COUNT_SCORE = (
+    "INSERT INTO score_counts (score, runs) VALUES (?, ?) "
+    "ON CONFLICT (score) DO UPDATE SET runs = runs + excluded.runs"
+)
+
+# Sentinel that stops the writer thread
+STOP = None
+
+def connect(path):
+    """Open a connection to the score database, creating its tables if needed"""
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+    connection.execute("PRAGMA journal_mode = WAL")
+    # (a crash can lose the last transactions, but never corrupts the file)
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+def write_runs(connection, rows):
+    """Insert run rows and their histogram counts in one transaction"""
+    counts = Counter(row[1] for row in rows)
+    with connection:
+        connection.executemany(INSERT_RUN, rows)
+        connection.executemany(COUNT_SCORE, counts.items())
+
+def make_row(player, score, level=1, endless=False, seed=0, created=None):
+    """Return the runs table row of a finished run"""
+    if created is None:
+        created = time.time()
+    # (seeds are unsigned 64-bit, SQLite integers are signed)
+    if seed >= 1 << 63:
+        seed -= 1 << 64
+    return (player, score, level, 1 if endless else 0, seed, created)
+
+class Batch:
+    """Runs queued together, with the future that reports their write"""
+
+    __slots__ = ('rows', 'future')
+
+    def __init__(self, rows):
+        """Initialize a batch of run rows"""
+        self.rows = rows
+        self.future = Future()
+
+class ScoreStore:
+    """Persistent scores of finished runs
+
+    submit() only queues a run; the writer thread stores it shortly after.
+    Queries read what has been written so far (call flush() first to
+    include everything submitted). submit_batch() also returns a future,
+    for callers that must know whether their runs reached the disk.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=BATCH_SIZE):
+        """Open (or create) the database and start the writer thread"""
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = connect(path)
+
+        # Cached top-1 score, so the HUD never has to query
+        self.best = self.connection.execute("SELECT MAX(score) FROM runs").fetchone()[0] or 0
+
+        # Runs waiting for the writer
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name='score-writer', daemon=True)
+        self.writer.start()
+
+    def submit(self, player, score, level=1, endless=False, seed=0):
+        """Queue a finished run for writing"""
+        self.best = max(self.best, score)
+        self.pending.put(make_row(player, score, level, endless, seed))
+
+    def submit_batch(self, runs):
+        """Queue (player, score, level, endless, seed) runs and return a Future of their write
+
+        The future's result is the number of runs written; it holds the
+        sqlite3.Error instead when their transaction failed.
+        """
+        batch = Batch([make_row(*run) for run in runs])
+        if batch.rows:
+            self.best = max(self.best, max(row[1] for row in batch.rows))
+        self.pending.put(batch)
+        return batch.future
+
+    def write_loop(self):
+        """Write queued runs, batching whatever piled up while the last batch was written"""
+        connection = connect(self.path)
+        pending = self.pending
+        running = True
+        while running:
+            rows = []
+            batches = []
+            items = 0
+            item = pending.get()
+            while True:
+                items += 1
+                if item is STOP:
+                    running = False
+                elif isinstance(item, Batch):
+                    rows.extend(item.rows)
+                    batches.append(item)
+                else:
+                    rows.append(item)
+                if not running or len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+            error = None
+            if rows:
+                try:
+                    write_runs(connection, rows)
+                except sqlite3.Error as exception:
+                    error = exception
+                    print(f"Could not save {len(rows)} scores: {error}", file=sys.stderr)
+            for batch in batches:
+                if error is None:
+                    batch.future.set_result(len(batch.rows))
+                else:
+                    batch.future.set_exception(error)
+            for _ in range(items):
+                pending.task_done()
+        connection.close()
+
+    def flush(self):
+        """Wait until every submitted run has been written"""
+        self.pending.join()
+
+    def close(self):
+        """Write the remaining runs and close the database"""
+        if self.writer.is_alive():
+            self.pending.put(STOP)
+            self.writer.join()
+        self.connection.close()
+
+    def import_rows(self, rows):
+        """Write many run rows (see make_row) on the calling thread and return how many"""
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                write_runs(self.connection, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            write_runs(self.connection, batch)
+            count += len(batch)
+        if count:
+            self.best = self.connection.execute("SELECT MAX(score) FROM runs").fetchone()[0] or 0
+        return count
+
+    def import_replays(self, paths, player, check=False):
+        """Import the runs recorded in replay files and return (imported, rejected)
+
+        Consecutive segments of a campaign run (each level continuing the
+        previous one's score) count as one run ending at the last segment.
+        With ``check`` every segment is re-simulated first and runs that
+        do not end as recorded are rejected.
+        """
+        rows = []
+        rejected = 0
+        for path in paths:
+            replay = Replay.load(path)
+            created = os.path.getmtime(path)
+            segments = replay.segments
+            results = verify(replay) if check else [True] * len(segments)
+            for index, segment in enumerate(segments):
+                following = segments[index + 1] if index + 1 < len(segments) else None
+                if (following is not None and not segment.endless and not following.endless
+                        and following.level == segment.level + 1 and following.score == segment.final_score):
+                    continue
+                if not results[index]:
+                    rejected += 1
+                    continue
+                rows.append(make_row(player, segment.final_score, segment.level, segment.endless,
+                                     segment.seed, created))
+        return self.import_rows(rows), rejected
+
+    def top(self, k=10, endless=None):
+        """Return the k best runs as (player, score, level, endless, created), best first
+
+        ``endless`` limits the list to endless (True) or campaign (False) runs.
+        """
+        if endless is None:
+            cursor = self.connection.execute(
+                "SELECT player, score, level, endless, created FROM runs ORDER BY score DESC, id LIMIT ?", (k,)
+            )
+        else:
+            cursor = self.connection.execute(
+                "SELECT player, score, level, endless, created FROM runs WHERE endless = ? "
+                "ORDER BY score DESC, id LIMIT ?", (1 if endless else 0, k)
+            )
+        return [(player, score, level, bool(endless), created) for player, score, level, endless, created in cursor]
+
+    def player_best(self, player):
+        """Return a player's best score, or None if they have no runs"""
+        return self.connection.execute("SELECT MAX(score) FROM runs WHERE player = ?", (player,)).fetchone()[0]
+
+    def percentile(self, score):
+        """Return the percentage of runs that scored less than score"""
+        below, total = self.connection.execute(
+            "SELECT TOTAL(CASE WHEN score < ? THEN runs END), TOTAL(runs) FROM score_counts", (score,)
+        ).fetchone()
+        return 100.0 * below / total if total else 0.0
+
+    def __len__(self):
+        return int(self.connection.execute("SELECT TOTAL(runs) FROM score_counts").fetchone()[0])
+
+def main(argv=None):
+    """Query the score database or import replays into it"""
+    parser = argparse.ArgumentParser(description="Flappy Adventure scores")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="score database (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    top_parser = commands.add_parser('top', help="list the best runs")
+    top_parser.add_argument('-k', type=int, default=10, help="number of runs")
+    mode = top_parser.add_mutually_exclusive_group()
+    mode.add_argument('--endless', dest='endless', action='store_true', default=None)
+    mode.add_argument('--campaign', dest='endless', action='store_false')
+
+    best_parser = commands.add_parser('best', help="show a player's best score")
+    best_parser.add_argument('player')
+
+    percentile_parser = commands.add_parser('percentile', help="show how many runs scored less")
+    percentile_parser.add_argument('score', type=int)
+
+    import_parser = commands.add_parser('import', help="import the runs of replay files")
+    import_parser.add_argument('paths', nargs='+', metavar='REPLAY')
+    import_parser.add_argument('--player', default='replay', help="player the runs are credited to")
+    import_parser.add_argument('--verify', action='store_true', help="re-simulate every run before importing it")
+    args = parser.parse_args(argv)
+
+    store = ScoreStore(args.db)
+    try:
+        if args.command == 'top':
+            for rank, (player, score, level, endless, created) in enumerate(store.top(args.k, args.endless), 1):
+                mode = "endless" if endless else f"level {level}"
+                date = time.strftime('%Y-%m-%d %H:%M', time.localtime(created))
+                print(f"{rank:>3}. {player:<16} {score:>6}  {mode:<8} {date}")
+        elif args.command == 'best':
+            best = store.player_best(args.player)
+            print(f"{args.player}: {best}" if best is not None else f"{args.player}: no runs")
+        elif args.command == 'percentile':
+            print(f"{store.percentile(args.score):.1f}% of {len(store)} runs scored less than {args.score}")
+        elif args.command == 'import':
+            start = time.perf_counter()
+            imported, rejected = store.import_replays(args.paths, args.player, args.verify)
+            print(f"imported {imported} runs ({rejected} rejected) in {time.perf_counter() - start:.2f} s")
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,476 @@
+"""
+Simulation module for Flappy Adventure
+
+This module holds the gameplay rules as a pure step function that runs
+without a display, a mixer or the pygame clock. All timers count logic
+ticks (one tick is one frame at 60 FPS), so a game can be advanced much
+faster than real time. Every random decision comes from a per-subsystem
+stream derived from the run's seed, so the same seed and inputs always
+replay the same run.
+"""
+
+import random
+import struct
+import pygame
+from bird import Bird
+from pipe_track import PipeTrack
+from power_up import PowerUp, PowerUpType
+from enemy import Enemy
+from pool import Pool
+from spatial import SpatialGrid
+from endless import ChunkGenerator, CHUNK_PIPES
+
+# Logic ticks per second of game time
+TICK_RATE = 60
+
+# Spawn intervals (in ticks)
+ENEMY_SPAWN_INTERVAL = 300  # 5 seconds
+POWER_UP_SPAWN_INTERVAL = 420  # 7 seconds
+
+# Pipes on the track and the horizontal space between them
+PIPE_COUNT = 3
+PIPE_SPACING = 300
+
+# Pool capacities (spawns are skipped while a pool is exhausted)
+MAX_ENEMIES = 16
+MAX_POWER_UPS = 8
+
+# Random positions tried before a blocked spawn is skipped
+SPAWN_ATTEMPTS = 4
+
+# Packed layouts used by SimState.snapshot(): run counters, then one
+# Mersenne Twister state (624 words plus position, cached gauss value)
+# per random stream
+SNAPSHOT_HEADER = struct.Struct('<QdIB??ddBBBBI')
+RNG_STATE = struct.Struct('<625I?d')
+
+class RandomStream(random.Random):
+    """Random generator that counts its draws
+
+    The count tells snapshots whether the packed generator state from the
+    last snapshot is still current, so streams that were not drawn from
+    (the common case between two snapshots) cost nothing to save.
+    """
+
+    def __init__(self, seed):
+        """Initialize the stream from a seed"""
+        self.version = 0  # Bumped by every draw and restore
+        self.packed = None  # RNG_STATE bytes valid for packed_version
+        self.packed_version = -1
+        super().__init__(seed)
+
+    def random(self):
+        self.version += 1
+        return random.Random.random(self)
+
+    def getrandbits(self, k):
+        self.version += 1
+        return random.Random.getrandbits(self, k)
+
+    def pack(self):
+        """Return the generator state as RNG_STATE bytes"""
+        if self.packed_version != self.version:
+            _, words, gauss = self.getstate()
+            self.packed = RNG_STATE.pack(*words, gauss is not None, gauss or 0.0)
+            self.packed_version = self.version
+        return self.packed
+
+    def unpack_from(self, data, offset):
+        """Restore a state written by pack() and return the offset after it"""
+        end = offset + RNG_STATE.size
+        packed = data[offset:end]
+        if self.packed_version != self.version or packed != self.packed:
+            values = RNG_STATE.unpack(packed)
+            self.setstate((3, values[:625], values[626] if values[625] else None))
+            self.version += 1
+            self.packed = packed
+            self.packed_version = self.version
+        return end
+
+def make_rng(seed, stream):
+    """Return the random stream of one subsystem for a run seed"""
+    return RandomStream(f"{seed}/{stream}")
+
+class SimState:
+    """Complete gameplay state advanced by step()"""
+
+    def __init__(self, screen_width, screen_height, level=1, score=0, seed=None, precise_collisions=False,
+                 endless=False, chunks=None):
+        """Initialize a fresh run at the given level
+
+        ``seed`` (0 to 2**64 - 1) fixes every random decision of the run; a
+        seed is drawn from the global random module when omitted. With
+        ``precise_collisions`` the bird is tested against enemies and pipes
+        pixel by pixel instead of with its shrunken hitbox.
+
+        An ``endless`` run never completes: its pipes and spawns come from
+        the track chunks of endless.py, read from ``chunks`` (e.g. an
+        endless.ChunkStream) or generated inline when it is omitted.
+        """
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.level = level
+        self.score = score
+        self.precise_collisions = precise_collisions
+        self.endless = endless
+
+        # Independent random streams, so e.g. an extra spawn roll never
+        # shifts the gaps of later pipes
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.pipe_rng = make_rng(seed, 'pipes')
+        self.enemy_rng = make_rng(seed, 'enemies')
+        self.spawn_rng = make_rng(seed, 'spawns')
+
+        # Elapsed game time (in ticks)
+        self.ticks = 0
+
+        # Game objects
+        self.bird = Bird(100, screen_height // 2, screen_width, screen_height)
+        self.pipes = PipeTrack(PIPE_COUNT, PIPE_SPACING, screen_width, screen_height, level, self.pipe_rng)
+        self.power_ups = Pool(PowerUp, MAX_POWER_UPS)
+        self.enemies = Pool(Enemy, MAX_ENEMIES)
+
+        # Broad phase for enemies and power-ups (rebuilt every step)
+        self.grid = SpatialGrid(screen_width)
+
+        # Spawn timers (tick of the last spawn attempt)
+        self.enemy_spawn_tick = 0
+        self.power_up_spawn_tick = 0
+
+        # Outcome flags
+        self.game_over = False
+        self.level_complete = False
+
+        # Endless track: chunk source, chunk being placed and next pipe index
+        self.chunks = None
+        self.chunk = None
+        self.next_pipe = 0
+        if endless:
+            self.chunks = chunks if chunks is not None else ChunkGenerator(seed, screen_height)
+            for pipe in self.pipes:
+                place_pipe(self, pipe)
+
+        # Gameplay events since the front-end last consumed them
+        # ('score', 'power_up', 'extra_life', 'shield', 'life_lost',
+        # 'game_over', 'level_complete')
+        self.events = []
+
+    @property
+    def done(self):
+        """Whether the run has ended (death or level completion)"""
+        return self.game_over or self.level_complete
+
+    @property
+    def rngs(self):
+        """Every random stream of the run, in snapshot order"""
+        return (self.pipe_rng, self.enemy_rng, self.spawn_rng)
+
+    def snapshot(self):
+        """Return the complete gameplay state as a compact bytes object
+
+        Only the values that decide how the run continues are packed (no
+        surfaces, sounds or drawing positions), so taking a snapshot is
+        cheap enough to do every few ticks or at every search node.
+        """
+        track = self.pipes
+        parts = [SNAPSHOT_HEADER.pack(
+            self.seed, self.ticks, self.score, self.level, self.game_over, self.level_complete,
+            self.enemy_spawn_tick, self.power_up_spawn_tick, track.head, track.passed,
+            len(self.enemies), len(self.power_ups), self.next_pipe
+        ), self.bird.snapshot()]
+        parts.extend(pipe.snapshot() for pipe in track.pipes)
+        parts.extend(enemy.snapshot() for enemy in self.enemies)
+        parts.extend(power_up.snapshot() for power_up in self.power_ups)
+        parts.extend(rng.pack() for rng in self.rngs)
+        return b''.join(parts)
+
+    def restore(self, data):
+        """Return the run to a state saved by snapshot() of the same run"""
+        (self.seed, self.ticks, self.score, self.level, self.game_over, self.level_complete,
+         self.enemy_spawn_tick, self.power_up_spawn_tick, head, passed,
+         enemy_count, power_up_count, self.next_pipe) = SNAPSHOT_HEADER.unpack_from(data)
+        offset = self.bird.restore(data, SNAPSHOT_HEADER.size)
+
+        track = self.pipes
+        track.head = head
+        track.passed = passed
+        for pipe in track.pipes:
+            offset = pipe.restore(data, offset)
+
+        # Pooled objects are re-acquired and then overwritten (the random
+        # draws made by their reset are undone when the streams are restored)
+        self.enemies.clear()
+        for _ in range(enemy_count):
+            enemy = self.enemies.acquire(0, 0, self.screen_width, self.screen_height, self.level, self.enemy_rng)
+            offset = enemy.restore(data, offset)
+        self.power_ups.clear()
+        for _ in range(power_up_count):
+            power_up = self.power_ups.acquire(0, 0, PowerUpType.SPEED)
+            offset = power_up.restore(data, offset)
+
+        for rng in self.rngs:
+            offset = rng.unpack_from(data, offset)
+
+        self.events.clear()
+
+def step(state, action, dt=1.0, profiler=None):
+    """Advance the simulation by dt ticks (action 1 = flap, 0 = no-op)
+
+    A profiler.Profiler, if given, is charged with the time spent in each
+    subsystem.
+    """
+    if state.done:
+        return state
+
+    bird = state.bird
+    if action:
+        bird.flap()
+
+    # Update bird
+    bird.update(dt)
+    state.ticks += dt
+    if profiler is not None:
+        profiler.lap('bird')
+
+    # Update pipes
+    track = state.pipes
+    for pipe in track.pipes:
+        pipe.update(dt)
+
+    # Score every pipe the bird has passed (they are passed left to right)
+    pipe = track.next_unscored()
+    while pipe is not None and pipe.x + pipe.width < bird.x:
+        state.score += 1
+        pipe.scored = True
+        state.events.append('score')
+        pipe = track.next_unscored()
+
+    # Recycle pipes that are off screen behind the rightmost one
+    while track.first.x + track.first.width < 0:
+        pipe = track.recycle()
+        if state.endless:
+            place_pipe(state, pipe)
+    if profiler is not None:
+        profiler.lap('pipes')
+
+    # Update power-ups and remove the ones that are off screen
+    power_ups = state.power_ups
+    for power_up in power_ups:
+        power_up.update(dt)
+        if power_up.x + power_up.width < 0:
+            power_ups.release(power_up)
+    power_ups.sweep()
+    if profiler is not None:
+        profiler.lap('power_ups')
+
+    # Update enemies and remove the ones that are off screen
+    enemies = state.enemies
+    for enemy in enemies:
+        enemy.update(dt)
+        if enemy.x + enemy.width < 0:
+            enemies.release(enemy)
+    enemies.sweep()
+    if profiler is not None:
+        profiler.lap('enemies')
+
+    # Index power-ups and enemies by column (power-ups first so they are
+    # collected before an enemy hit in the same step is resolved)
+    grid = state.grid
+    grid.clear()
+    for power_up in power_ups:
+        grid.insert(power_up)
+    for enemy in enemies:
+        grid.insert(enemy)
+
+    # Precise mode: the sprite rects are the broad phase and the masks
+    # are only compared on a rect hit
+    precise = state.precise_collisions
+    if precise:
+        bird_rect = bird.get_sprite_rect()
+        bird_mask = bird.get_mask()
+        # (enemies are indexed by hitboxes inset 5 pixels into their sprites)
+        query_rect = bird_rect.inflate(10, 10)
+    else:
+        query_rect = bird.hitbox
+
+    # Check for collisions with the power-ups and enemies near the bird
+    for obj in grid.query(query_rect):
+        if isinstance(obj, PowerUp):
+            if obj.collides_with(bird):
+                apply_power_up(state, obj)
+                power_ups.release(obj)
+        elif bird.invincible:
+            continue
+        elif obj.touches(bird_rect, bird_mask) if precise else obj.collides_with(bird):
+            hit(state)
+    power_ups.sweep()
+
+    # Check for collisions with the pipes in the bird's columns
+    if not bird.invincible:
+        if precise:
+            for pipe in track.overlapping(bird_rect.left, bird_rect.right):
+                if pipe.touches(bird_rect, bird_mask):
+                    hit(state)
+        else:
+            hitbox = bird.hitbox
+            for pipe in track.overlapping(hitbox.left, hitbox.right):
+                if pipe.collides_with(bird):
+                    hit(state)
+
+    # Check if bird is out of bounds
+    if bird.y < 0 or bird.y > state.screen_height:
+        hit(state)
+
+    if profiler is not None:
+        profiler.lap('collision')
+
+    # Spawn enemies and power-ups (endless runs spawn them with the pipes)
+    if not state.endless:
+        spawn_enemies(state)
+        spawn_power_ups(state)
+    if profiler is not None:
+        profiler.lap('spawn')
+
+    # Check for level completion
+    if not state.game_over and not state.endless and state.score >= 10 * state.level:
+        state.level_complete = True
+        state.events.append('level_complete')
+
+    return state
+
+def spawn_enemies(state):
+    """Spawn enemy birds periodically"""
+    if state.ticks - state.enemy_spawn_tick > ENEMY_SPAWN_INTERVAL:
+        # Adjust spawn rate based on level
+        spawn_chance = 0.3 * state.level
+        if state.spawn_rng.random() < spawn_chance:
+            y_pos = find_spawn_y(state, Enemy.WIDTH, Enemy.HEIGHT)
+            if y_pos is not None:
+                enemy = state.enemies.acquire(
+                    state.screen_width, y_pos, state.screen_width, state.screen_height,
+                    state.level, state.enemy_rng
+                )
+                if enemy is not None:
+                    state.grid.insert(enemy)
+        state.enemy_spawn_tick = state.ticks
+
+def spawn_power_ups(state):
+    """Spawn power-ups periodically"""
+    if state.ticks - state.power_up_spawn_tick > POWER_UP_SPAWN_INTERVAL:
+        # Adjust spawn rate based on level
+        spawn_chance = 0.4 - (0.05 * state.level)  # Less power-ups in higher levels
+        if state.spawn_rng.random() < spawn_chance:
+            y_pos = find_spawn_y(state, PowerUp.SIZE, PowerUp.SIZE)
+            if y_pos is not None:
+                # Choose a power-up type with weighted probabilities
+                # Hearts are rarer than other power-ups
+                weights = [0.4, 0.4, 0.2]  # Speed, Shield, Heart
+                power_up_types = list(PowerUpType)
+
+                # Choose based on weights
+                rand = state.spawn_rng.random()
+                cumulative = 0
+                chosen_type = power_up_types[0]
+
+                for i, weight in enumerate(weights):
+                    cumulative += weight
+                    if rand <= cumulative:
+                        chosen_type = power_up_types[i]
+                        break
+
+                power_up = state.power_ups.acquire(state.screen_width, y_pos, chosen_type)
+                if power_up is not None:
+                    state.grid.insert(power_up)
+        state.power_up_spawn_tick = state.ticks
+
+def place_pipe(state, pipe):
+    """Shape a new pipe of an endless run from its track slot and spawn what follows it"""
+    index = state.next_pipe
+    state.next_pipe = index + 1
+    chunk = state.chunk
+    if chunk is None or chunk.index != index // CHUNK_PIPES:
+        chunk = state.chunk = state.chunks.get(index // CHUNK_PIPES)
+    slot = chunk.slots[index % CHUNK_PIPES]
+
+    state.level = slot.stage
+    pipe.shape(slot.gap_y, slot.gap_size, slot.speed, slot.stage)
+
+    # The track keeps scrolling as one piece at the newest pipe's speed
+    for other in state.pipes:
+        other.speed = slot.speed
+    for power_up in state.power_ups:
+        power_up.speed = slot.power_up_speed
+
+    # Spawns start halfway between this pipe and the next one
+    x = pipe.x + (state.pipes.spacing + pipe.width) / 2
+    if slot.enemy_y is not None:
+        enemy = state.enemies.acquire(
+            x - Enemy.WIDTH / 2, slot.enemy_y, state.screen_width, state.screen_height,
+            slot.stage, state.enemy_rng
+        )
+        if enemy is not None:
+            enemy.base_speed = enemy.speed = slot.enemy_speed
+    if slot.power_up_type is not None:
+        power_up = state.power_ups.acquire(x - PowerUp.SIZE / 2, slot.power_up_y, slot.power_up_type)
+        if power_up is not None:
+            power_up.speed = slot.power_up_speed
+
+def find_spawn_y(state, width, height):
+    """Return a free spawn height at the right screen edge, or None if every attempt is blocked"""
+    area = pygame.Rect(state.screen_width, 0, width, height)
+    for _ in range(SPAWN_ATTEMPTS):
+        area.y = state.spawn_rng.randint(100, state.screen_height - 100)
+        if not state.grid.is_free(area):
+            continue
+        if any(pipe.overlaps(area) for pipe in state.pipes.overlapping(area.left, area.right)):
+            continue
+        return area.y
+    return None
+
+def apply_power_up(state, power_up):
+    """Apply the effect of a collected power-up to the bird"""
+    bird = state.bird
+    state.events.append('power_up')
+
+    if power_up.type == PowerUpType.SPEED:
+        bird.apply_speed_boost()
+        # Lightning allows passing through obstacles temporarily
+        bird.apply_invincibility()
+    elif power_up.type == PowerUpType.INVINCIBILITY:
+        # Shield protects from one hit
+        bird.has_shield = True
+    elif power_up.type == PowerUpType.EXTRA_LIFE:
+        # Heart grants +1 life
+        bird.lives += 1
+        state.events.append('extra_life')
+
+def hit(state):
+    """Resolve a lethal collision using the shield, a spare life or ending the run"""
+    if state.game_over:
+        return
+
+    bird = state.bird
+
+    # Check if player has shield
+    if bird.has_shield:
+        # Use shield to prevent death
+        bird.has_shield = False
+        state.events.append('shield')
+        return
+
+    # Check if player has extra lives
+    if bird.lives > 1:
+        # Use a life and continue playing
+        bird.lives -= 1
+
+        # Reset bird position but keep the game going
+        bird.y = bird.prev_y = state.screen_height // 2
+        bird.velocity = 0
+        state.events.append('life_lost')
+        return
+
+    # No lives left, game over
+    state.game_over = True
+    state.events.append('game_over')
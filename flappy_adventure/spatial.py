@@ -0,0 +1,80 @@
+"""
+Spatial module for Flappy Adventure
+
+This module defines the broad phase for collisions: a uniform grid of
+screen columns. Everything in the game scrolls horizontally, so bucketing
+hitboxes by x is enough to keep each collision query down to the few
+objects that are actually near the rect being tested.
+"""
+
+# Width of one grid column in pixels
+CELL_WIDTH = 64
+
+class SpatialGrid:
+    """Uniform grid of x columns holding objects with a ``hitbox`` rect
+
+    Objects left of the screen fall into the first column and objects past
+    the right edge into the last one, so the grid never needs resizing.
+    """
+
+    def __init__(self, screen_width, cell_width=CELL_WIDTH):
+        """Initialize an empty grid covering the screen plus one column each side"""
+        self.cell_width = cell_width
+        self.columns = [[] for _ in range(screen_width // cell_width + 3)]
+        self.count = 0  # Objects inserted since the last clear
+        self.used = []  # Indices of the columns holding objects
+
+    def column(self, x):
+        """Return the index of the column containing x"""
+        index = int(x) // self.cell_width + 1
+        if index < 0:
+            return 0
+        last = len(self.columns) - 1
+        return last if index > last else index
+
+    def clear(self):
+        """Remove every object"""
+        columns = self.columns
+        for index in self.used:
+            columns[index].clear()
+        self.used.clear()
+        self.count = 0
+
+    def insert(self, obj):
+        """Add an object to every column its hitbox spans"""
+        hitbox = obj.hitbox
+        entry = (self.count, obj)
+        self.count += 1
+        columns = self.columns
+        for index in range(self.column(hitbox.left), self.column(hitbox.right - 1) + 1):
+            column = columns[index]
+            if not column:
+                self.used.append(index)
+            column.append(entry)
+
+    def query(self, rect):
+        """Return the objects sharing a column with rect, in insertion order
+
+        This is only the broad phase: callers still run the exact hitbox
+        test on each candidate.
+        """
+        if not self.count:
+            return []
+        first = self.column(rect.left)
+        last = self.column(rect.right - 1)
+        columns = self.columns
+        if first == last:
+            return [obj for _, obj in columns[first]]
+
+        # Objects spanning several columns appear once per column
+        entries = set()
+        for index in range(first, last + 1):
+            entries.update(columns[index])
+        return [obj for _, obj in sorted(entries, key=lambda entry: entry[0])]
+
+    def is_free(self, rect):
+        """Return whether no object's hitbox overlaps rect"""
+        for obj in self.query(rect):
+            if obj.hitbox.colliderect(rect):
+                return False
+        return True
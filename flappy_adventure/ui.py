@@ -5,6 +5,94 @@ This module defines UI elements like buttons and text.
 """
 
 import pygame
+from collections import OrderedDict
+import assets
+from render_queue import HUD, OVERLAY
+
+# Shared fonts keyed by (name, size)
+_fonts = {}
+
+# Rendered text surfaces keyed by (font, text, color, shadow color, shadow offset)
+_text_cache = OrderedDict()
+TEXT_CACHE_SIZE = 256
+
+# Single-character surfaces used to assemble numeric HUD strings
+_glyphs = {}
+
+def get_font(size, name='Arial'):
+    """Return a shared font, creating it on first use"""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+def render_text(size, text, color, shadow_color=None, shadow_offset=0, glyphs=False):
+    """Return a cached surface of text with its drop shadow already composited
+
+    With ``glyphs`` set, the string is assembled from cached per-character
+    surfaces instead of asking the font to render it (used for HUD values
+    that change often, like the score).
+    """
+    key = (size, text, color, shadow_color, shadow_offset, glyphs)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        return surface
+    
+    if glyphs:
+        surface = compose_glyphs(size, text, color)
+    else:
+        surface = get_font(size).render(text, True, color)
+    
+    if shadow_color is not None:
+        # Draw the shadow once underneath the text
+        if glyphs:
+            shadow = compose_glyphs(size, text, shadow_color)
+        else:
+            shadow = get_font(size).render(text, True, shadow_color)
+        width, height = surface.get_size()
+        composite = pygame.Surface((width + shadow_offset, height + shadow_offset), pygame.SRCALPHA)
+        composite.blit(shadow, (shadow_offset, shadow_offset))
+        composite.blit(surface, (0, 0))
+        surface = composite
+    
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
+
+def get_glyph(size, char, color):
+    """Return the cached surface of a single character"""
+    key = (size, char, color)
+    glyph = _glyphs.get(key)
+    if glyph is None:
+        glyph = get_font(size).render(char, True, color)
+        _glyphs[key] = glyph
+    return glyph
+
+def draw_glyphs(surface, size, text, color, pos):
+    """Blit a string straight from cached glyphs (for text that changes every frame)"""
+    x, y = pos
+    for char in text:
+        glyph = get_glyph(size, char, color)
+        surface.blit(glyph, (x, y))
+        x += glyph.get_width()
+
+def compose_glyphs(size, text, color):
+    """Assemble a string from cached single-character surfaces"""
+    font = get_font(size)
+    surfaces = [get_glyph(size, char, color) for char in text]
+    
+    width = sum(glyph.get_width() for glyph in surfaces)
+    height = max((glyph.get_height() for glyph in surfaces), default=font.get_height())
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    x = 0
+    for glyph in surfaces:
+        surface.blit(glyph, (x, 0))
+        x += glyph.get_width()
+    return surface
 
 class Button:
     """Button UI element"""
@@ -19,7 +107,7 @@ class Button:
         self.color = color
         self.hover_color = hover_color or self.lighten_color(color, 30)
         self.rect = pygame.Rect(x, y, width, height)
-        self.font = pygame.font.SysFont('Arial', 24)
+        self.font = get_font(24)
         
         # Pixel art styling
         self.border_width = 4
@@ -48,66 +136,140 @@ class Button:
         """Update button state based on mouse position"""
         self.is_hovered = self.rect.collidepoint(mouse_pos)
     
-    def draw(self, screen):
-        """Draw the button on the screen"""
-        # Draw button shadow (pixel art style)
-        shadow_rect = pygame.Rect(
-            self.x + self.shadow_offset, 
-            self.y + self.shadow_offset, 
-            self.width, 
-            self.height
+    def get_surface(self):
+        """Return the shared surface of the button in its current hover state"""
+        key = ('button', self.width, self.height, self.text, self.color, self.hover_color, self.is_hovered)
+        return assets.get_surface(key, self.bake_surface)
+    
+    def bake_surface(self):
+        """Draw the button and its shadow into a surface"""
+        surface = pygame.Surface(
+            (self.width + self.shadow_offset, self.height + self.shadow_offset), pygame.SRCALPHA
         )
-        pygame.draw.rect(screen, self.darken_color(self.color, 50), shadow_rect)
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        
+        # Draw button shadow (pixel art style)
+        shadow_rect = rect.move(self.shadow_offset, self.shadow_offset)
+        pygame.draw.rect(surface, self.darken_color(self.color, 50), shadow_rect)
         
         # Draw button background
         color = self.hover_color if self.is_hovered else self.color
-        pygame.draw.rect(screen, color, self.rect)
+        pygame.draw.rect(surface, color, rect)
         
         # Draw pixel art border
         border_color = self.lighten_color(color, 50)
-        pygame.draw.rect(screen, border_color, self.rect, self.border_width)
+        pygame.draw.rect(surface, border_color, rect, self.border_width)
         
         # Draw button text
-        text_surface = self.font.render(self.text, True, (255, 255, 255))
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
-        
-        # Update hover state based on mouse position
-        mouse_pos = pygame.mouse.get_pos()
-        self.update(mouse_pos)
+        text_surface = render_text(24, self.text, (255, 255, 255))
+        text_rect = text_surface.get_rect(center=rect.center)
+        surface.blit(text_surface, text_rect)
+        return surface
+    
+    def enqueue(self, queue):
+        """Queue the button for drawing"""
+        queue.push(self.get_surface(), (self.x, self.y), HUD)
 
 class Text:
     """Text UI element"""
     
-    def __init__(self, text, size, color, x, y):
+    def __init__(self, text, size, color, x, y, glyphs=False, layer=HUD):
         """Initialize the text"""
         self.text = text
         self.size = size
         self.color = color
         self.x = x
         self.y = y
-        self.font = pygame.font.SysFont('Arial', size)
-        self.surface = self.font.render(text, True, color)
-        self.rect = self.surface.get_rect(center=(x, y))
+        self.glyphs = glyphs  # Assemble from cached glyphs (for changing numbers)
+        self.layer = layer
+        self.font = get_font(size)
         
         # Pixel art styling
         self.shadow_offset = 2
         self.shadow_color = (0, 0, 0)
+        
+        self.render()
+    
+    def render(self):
+        """Fetch the text surface (with its shadow) from the cache"""
+        self.surface = render_text(
+            self.size, self.text, self.color,
+            self.shadow_color, self.shadow_offset, self.glyphs
+        )
+        # Position the text itself (not its shadow) around the center point
+        width, height = self.surface.get_size()
+        self.rect = pygame.Rect(0, 0, width - self.shadow_offset, height - self.shadow_offset)
+        self.rect.center = (self.x, self.y)
     
     def update_text(self, new_text):
         """Update the text content"""
+        if new_text == self.text:
+            return
         self.text = new_text
-        self.surface = self.font.render(new_text, True, self.color)
-        self.rect = self.surface.get_rect(center=(self.x, self.y))
-    
-    def draw(self, screen):
-        """Draw the text on the screen"""
-        # Draw text shadow for pixel art style
-        shadow_surface = self.font.render(self.text, True, self.shadow_color)
-        shadow_rect = shadow_surface.get_rect(
-            center=(self.x + self.shadow_offset, self.y + self.shadow_offset)
+        self.render()
+    
+    def enqueue(self, queue):
+        """Queue the text for drawing"""
+        # Text and shadow are pre-composited into one surface
+        queue.push(self.surface, self.rect.topleft, self.layer)
+
+def get_digit_sprites():
+    """Return the bitmap digits 0-9 (rendered text if the sprites are missing)"""
+    return [
+        assets.get_image(
+            f'{digit}.png',
+            fallback=lambda digit=digit: render_text(36, str(digit), (255, 255, 255), (0, 0, 0), 2)
         )
-        screen.blit(shadow_surface, shadow_rect)
+        for digit in range(10)
+    ]
+
+class BitmapNumber:
+    """Number drawn with the digit sprites, centered below a point"""
+    
+    def __init__(self, x, y, value=0):
+        """Initialize the number (the digits are loaded when it is first drawn)"""
+        self.x = x
+        self.y = y
+        self.value = value
+        self.rect = None
+        self.blits = []
+    
+    def update_value(self, value):
+        """Update the number shown"""
+        if value != self.value:
+            self.value = value
+            self.rect = None
+    
+    def layout(self):
+        """Place one digit sprite per decimal digit"""
+        digits = get_digit_sprites()
+        sprites = [digits[int(char)] for char in str(self.value)]
+        width = sum(sprite.get_width() for sprite in sprites)
+        height = max(sprite.get_height() for sprite in sprites)
+        self.rect = pygame.Rect(self.x - width // 2, self.y, width, height)
         
-        # Draw main text
-        screen.blit(self.surface, self.rect)
\ No newline at end of file
+        self.blits = []
+        x = self.rect.left
+        for sprite in sprites:
+            self.blits.append((sprite, (x, self.y)))
+            x += sprite.get_width()
+    
+    def enqueue(self, queue):
+        """Queue the digits for drawing"""
+        if self.rect is None:
+            self.layout()
+        queue.extend(self.blits, HUD)
+
+class Overlay:
+    """Full-screen translucent overlay UI element"""
+    
+    def __init__(self, width, height, color):
+        """Initialize the overlay"""
+        self.color = color
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.surface.fill(color)
+        self.rect = self.surface.get_rect()
+    
+    def enqueue(self, queue):
+        """Queue the overlay for drawing"""
+        queue.push(self.surface, self.rect.topleft, OVERLAY)